@@ -11,9 +11,24 @@ CHROME_CODE_CACHE = os.path.join(CHROME_CACHE_DIR, 'Default/Code Cache')
 CHROME_NETWORK = os.path.join(CHROME_CACHE_DIR, 'Default/Cache/Cache_Data')
 CHROME_COOKIES = os.path.join(CHROME_DIR, 'Cookies')
 
+# 缓存查找模式: 'hash' 通过条目索引和缓存key的hash直接定位条目文件，'scan' 遍历整个缓存目录
+CACHE_LOOKUP_MODE = os.getenv('CACHE_LOOKUP_MODE', 'hash')
+# 并行扫描配置：每个分片的文件数、I/O线程数、解析进程数
+CACHE_SCAN_SHARD_SIZE = 256
+CACHE_SCAN_IO_WORKERS = 8
+CACHE_SCAN_PROCESS_WORKERS = os.cpu_count() or 4
+# 缓存文件事件的安静期（秒），期间同一文件的重复事件会被合并
+CACHE_EVENT_QUIET_PERIOD = 0.5
+# 连续加入监视URL时等待合并的时间（秒），一批URL只触发一次定向查找
+SCAN_COALESCE_DELAY = 0.2
+
 # 应用程序相关路径
 APP_DIR = os.path.expanduser('~/Library/Application Support/ChromeHistoryViewer')
 TEMP_DIR = os.path.join(APP_DIR, 'temp')
+CACHE_INDEX_DB = os.path.join(APP_DIR, 'cache_index.db')  # 缓存条目索引
+VALIDATOR_DB = os.path.join(APP_DIR, 'validators.db')  # 直接请求页面的ETag/Last-Modified和正文
+HISTORY_STATE_FILE = os.path.join(APP_DIR, 'history_monitor_state.json')  # 历史记录监控的访问id水位
+URL_STORE_DB = os.path.join(APP_DIR, 'processed_urls.db')  # 已处理的URL
 DEFAULT_SAVE_DIR = os.path.join(Path.home(), 'Downloads/markdown_exports')
 
 # 创建必要的目录
@@ -24,6 +39,8 @@ os.makedirs(DEFAULT_SAVE_DIR, exist_ok=True)
 # UI配置
 WINDOW_SIZE_RATIO = 0.8  # 窗口大小占屏幕的比例
 DEFAULT_NUM_RECORDS = 100  # 默认显示的历史记录数量
+MAX_NUM_RECORDS = 1000000  # 最多显示的历史记录数量
+HISTORY_PAGE_SIZE = 500  # 后台加载历史记录时每批送回界面的记录数
 DEFAULT_CHECK_INTERVAL = 5  # 默认监控间隔（秒）
 BATCH_SIZE = 20  # 每批处理的URL数量
 
@@ -34,6 +51,40 @@ DEFAULT_HEADERS = {
     'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8'
 }
 
+# HTTP客户端配置：连接池缓存的主机数、每个主机保持的连接数、连接/读取超时（秒）
+HTTP_POOL_HOSTS = 32
+HTTP_POOL_MAXSIZE_PER_HOST = 8
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 15
+# 异步获取页面时同时进行的请求数上限：全局和每个主机
+FETCH_MAX_CONCURRENCY = 200
+FETCH_PER_HOST_CONCURRENCY = 4
+# 直接请求时正文大小上限（字节），超过时放弃下载
+FETCH_MAX_BODY_SIZE = 10 * 1024 * 1024
+# 字符集判断：在正文开头多少字节内查找<meta charset>，统计检测最多使用多少字节的样本
+CHARSET_META_SCAN_SIZE = 4096
+CHARSET_DETECT_SAMPLE_SIZE = 64 * 1024
+# 只读打开History数据库时等待锁的秒数，超时后改用不加锁的方式读取
+HISTORY_BUSY_TIMEOUT = 0.5
+# 发现History被锁住后，多少秒内不再尝试只读连接（直接走不加锁的方式），之后再试一次
+HISTORY_LOCK_RECHECK_INTERVAL = 30
+# History文件写入后等待多久再查询（秒），以及没有文件变化时的保底查询间隔（秒）
+HISTORY_DEBOUNCE = 0.3
+HISTORY_SAFETY_POLL_INTERVAL = 60
+# 已读取但URL还没有保存的访问最多保留多少条，超过时放弃最早的，持久化的水位不会因为一直失败的页面停住不动
+HISTORY_MAX_PENDING_VISITS = 5000
+# 已处理URL记录的有效期（秒，0表示永不过期），以及内存中布隆过滤器的初始容量和误判率
+URL_STORE_TTL = 0
+URL_STORE_BLOOM_CAPACITY = 100000
+URL_STORE_BLOOM_ERROR_RATE = 0.01
+# 失败请求的重试：最多重试次数、退避的初始/最大间隔（秒）、Retry-After最多等待的秒数
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+RETRY_AFTER_MAX = 300.0
+# 条件请求保存的正文大小上限（字节），更大的页面不保存验证器
+VALIDATOR_MAX_BODY_SIZE = 2 * 1024 * 1024
+
 # RAGFlow配置
 RAGFLOW_API_URL = os.getenv('RAGFLOW_API_URL', 'http://localhost:8000')  # RAGFlow API地址
 RAGFLOW_API_KEY = os.getenv('RAGFLOW_API_KEY', '')  # RAGFlow API密钥
@@ -0,0 +1,308 @@
+import asyncio
+import time
+import threading
+from concurrent.futures import Future, wait
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from ..config import (
+    DEFAULT_HEADERS, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+    FETCH_MAX_CONCURRENCY, FETCH_PER_HOST_CONCURRENCY, FETCH_MAX_BODY_SIZE
+)
+from ..core.cache_entry import BODY_CHUNK_SIZE, CHARSET_RE, HTML_CONTENT_TYPES
+from ..core.charset import decode_html
+from ..core.cookie_store import CookieStore, get_cookie_store
+from ..core.retry_scheduler import RetryScheduler, is_retryable, parse_retry_after
+from ..core.validator_store import ValidatorStore, get_validator_store
+
+class FetchResult:
+    """一次页面获取的结果，失败时text为None，error为错误信息"""
+
+    def __init__(self, url: str, status: int = 0, text: Optional[str] = None, error: str = '',
+                 timed_out: bool = False, retry_after: Optional[float] = None,
+                 not_modified: bool = False):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.error = error
+        self.timed_out = timed_out
+        self.retry_after = retry_after
+        self.not_modified = not_modified  # 服务器返回304，text是上次保存的正文
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and self.text is not None
+
+    @property
+    def retryable(self) -> bool:
+        """失败是否是暂时的（超时、5xx、429等）"""
+        return not self.ok and is_retryable(self.status, self.timed_out)
+
+def request_headers(url: str) -> Dict[str, str]:
+    """模拟浏览器导航请求的请求头"""
+    parts = urlsplit(url)
+    headers = DEFAULT_HEADERS.copy()  # 复制一份，避免修改原始对象
+    headers['Referer'] = f"{parts.scheme or 'https'}://{parts.netloc}/"
+    headers['Sec-Fetch-Dest'] = 'document'
+    headers['Sec-Fetch-Mode'] = 'navigate'
+    headers['Sec-Fetch-Site'] = 'same-origin'
+    return headers
+
+class AsyncFetcher:
+    """基于asyncio的并发页面获取器
+
+    事件循环运行在独立的后台线程中，submit()立即返回，结果通过回调在事件循环线程中交付；
+    fetch_all()等待一批URL完成，期间定期检查should_continue，返回False时取消未完成的请求。
+    同时进行的请求数受全局上限和每个主机的上限约束，慢主机不会占满所有并发。
+    请求过的页面带上保存的ETag/Last-Modified做条件请求，304时直接使用保存的正文。
+    cookie和验证器的读写会访问SQLite（cookie快照刷新时还会复制Cookies数据库），放在线程池中执行，不阻塞事件循环。
+    正文分块读取：根据响应头提前放弃不是HTML或声明过大的响应，读取中超过大小上限时也立即放弃。
+    """
+
+    def __init__(self, cookie_store: Optional[CookieStore] = None,
+                 max_concurrency: int = FETCH_MAX_CONCURRENCY,
+                 per_host_concurrency: int = FETCH_PER_HOST_CONCURRENCY,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT,
+                 validator_store: Optional[ValidatorStore] = None,
+                 max_body_size: int = FETCH_MAX_BODY_SIZE):
+        self.cookie_store = cookie_store or get_cookie_store()
+        self.validator_store = validator_store or get_validator_store()
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.max_body_size = max_body_size
+        self.timeout = aiohttp.ClientTimeout(total=None, connect=connect_timeout, sock_read=read_timeout)
+        self.lock = threading.Lock()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        # 以下对象只在事件循环线程中使用
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.global_limit: Optional[asyncio.Semaphore] = None
+        self.host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.in_flight = 0
+        self.counters = {'requests': 0, 'succeeded': 0, 'failed': 0, 'cancelled': 0,
+                         'not_modified': 0, 'aborted': 0, 'aborted_bytes': 0, 'bytes_read': 0,
+                         'max_in_flight': 0}
+
+    def ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """启动后台事件循环线程"""
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                # 会话和信号量绑定在创建它们的事件循环上，换了事件循环要重新创建
+                self.session = None
+                self.global_limit = None
+                self.host_limits = {}
+                self.thread = threading.Thread(target=self.loop.run_forever, name='async-fetcher', daemon=True)
+                self.thread.start()
+            return self.loop
+
+    def submit(self, url: str, on_result: Optional[Callable[[FetchResult], None]] = None) -> Future:
+        """提交一个URL，不等待结果"""
+        return asyncio.run_coroutine_threadsafe(self.fetch(url, on_result), self.ensure_loop())
+
+    def fetch_all(self, urls: Iterable[str],
+                  on_result: Optional[Callable[[FetchResult], None]] = None,
+                  should_continue: Callable[[], bool] = lambda: True,
+                  retries: Optional[RetryScheduler] = None) -> Dict[str, FetchResult]:
+        """并发获取一批URL并等待完成，on_result在调用线程中逐个回调
+
+        指定retries时，暂时性的失败按退避时间排队重试，其他URL的请求照常进行。
+        """
+        futures = {self.submit(url): url for url in dict.fromkeys(urls)}
+        results: Dict[str, FetchResult] = {}
+        pending = set(futures)
+        while pending or (retries is not None and len(retries)):
+            if not should_continue():
+                for future in pending:
+                    future.cancel()
+                break
+
+            if retries is not None:
+                for url in retries.pop_due():
+                    future = self.submit(url)
+                    futures[future] = url
+                    pending.add(future)
+            if not pending:
+                time.sleep(min(retries.next_delay() or 0.1, 0.1))
+                continue
+
+            done, pending = wait(pending, timeout=0.1)
+            for future in done:
+                if future.cancelled():
+                    continue
+                result = future.result()
+                url = futures.pop(future)
+                if retries is not None:
+                    if result.retryable:
+                        delay = retries.schedule(url, result.retry_after)
+                        if delay is not None:
+                            print(f"请求失败({result.status or result.error})，{delay:.1f}秒后重试: {url}")
+                            continue
+                    retries.forget(url)
+                results[url] = result
+                if on_result:
+                    on_result(result)
+        return results
+
+    def host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        limit = self.host_limits.get(host)
+        if limit is None:
+            limit = self.host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return limit
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """在事件循环线程中创建共享的会话，服务器设置的cookie不保存"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host_concurrency)
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout, cookie_jar=aiohttp.DummyCookieJar()
+            )
+            self.global_limit = asyncio.Semaphore(self.max_concurrency)
+            self.host_limits = {}
+        return self.session
+
+    def prepare_headers(self, url: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """在线程池中执行：生成请求头（包括cookie和条件请求的验证器），返回(请求头, 验证器)"""
+        headers = request_headers(url)
+        cookies = self.cookie_store.get_cookies(url)
+        if cookies:
+            headers['Cookie'] = '; '.join(f"{name}={value}" for name, value in cookies.items())
+        validators = self.validator_store.conditional_headers(url)
+        headers.update(validators)
+        return headers, validators
+
+    async def fetch(self, url: str, on_result: Optional[Callable[[FetchResult], None]] = None) -> FetchResult:
+        """获取一个页面，出错时返回带错误信息的结果"""
+        session = self.get_session()
+        loop = asyncio.get_running_loop()
+
+        try:
+            headers, validators = await loop.run_in_executor(None, self.prepare_headers, url)
+            async with self.global_limit, self.host_limit(url):
+                self.in_flight += 1
+                self.counters['requests'] += 1
+                self.counters['max_in_flight'] = max(self.counters['max_in_flight'], self.in_flight)
+                try:
+                    async with session.get(url, headers=headers, allow_redirects=True) as response:
+                        if response.status == 304 and validators:
+                            result = await loop.run_in_executor(None, self.not_modified_result, url)
+                            if result.not_modified:
+                                self.counters['not_modified'] += 1
+                        elif response.status != 200:
+                            # 失败响应的正文用不到，不读取
+                            result = FetchResult(url, response.status,
+                                                 retry_after=parse_retry_after(response.headers.get('Retry-After')))
+                        else:
+                            result = await self.read_html(url, response)
+                            if result.ok:
+                                await loop.run_in_executor(
+                                    None, self.validator_store.save, url, response.headers.get('ETag', ''),
+                                    response.headers.get('Last-Modified', ''), result.text)
+                finally:
+                    self.in_flight -= 1
+        except asyncio.CancelledError:
+            self.counters['cancelled'] += 1
+            raise
+        except asyncio.TimeoutError:
+            result = FetchResult(url, error='请求超时', timed_out=True)
+        except Exception as e:
+            result = FetchResult(url, error=str(e) or type(e).__name__)
+
+        self.counters['succeeded' if result.ok else 'failed'] += 1
+        if on_result:
+            try:
+                on_result(result)
+            except Exception as e:
+                print(f"处理获取结果时出错: {url}: {str(e)}")
+        return result
+
+    async def read_html(self, url: str, response: aiohttp.ClientResponse) -> FetchResult:
+        """分块读取HTML正文，不是HTML或超过大小上限时放弃剩余部分"""
+        content_type = response.headers.get('Content-Type', '')
+        mime_type = content_type.split(';', 1)[0].strip().lower()
+        declared = response.content_length
+        # 没有Content-Type时按可能是HTML处理
+        if mime_type and mime_type not in HTML_CONTENT_TYPES:
+            return self.abort(url, response, f"不是HTML页面: {mime_type}", declared or 0)
+        if declared is not None and declared > self.max_body_size:
+            return self.abort(url, response, f"页面太大: {declared}字节", declared)
+
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(BODY_CHUNK_SIZE):
+            size += len(chunk)
+            self.counters['bytes_read'] += len(chunk)
+            if size > self.max_body_size:
+                return self.abort(url, response, f"页面超过{self.max_body_size}字节", max(declared or 0, size))
+            chunks.append(chunk)
+
+        match = CHARSET_RE.search(content_type)
+        charset = match.group(1).strip('"\'') if match else ''
+        return FetchResult(url, response.status, decode_html(b''.join(chunks), charset))
+
+    def abort(self, url: str, response: aiohttp.ClientResponse, reason: str, size: int) -> FetchResult:
+        """放弃一个响应：直接关闭连接，不再读取剩余的正文"""
+        response.close()
+        self.counters['aborted'] += 1
+        self.counters['aborted_bytes'] += size
+        print(f"放弃下载({reason}): {url}")
+        return FetchResult(url, error=reason)
+
+    def not_modified_result(self, url: str) -> FetchResult:
+        """在线程池中执行：304响应使用保存的正文，读取失败时作为失败结果（下次请求不再带验证器）"""
+        text = self.validator_store.load_body(url)
+        if text is None:
+            self.validator_store.remove(url)
+            return FetchResult(url, 304, error='保存的正文不可用')
+        return FetchResult(url, 200, text, not_modified=True)
+
+    def stats(self) -> Dict[str, int]:
+        """请求统计：总数、成功、失败、取消、304复用、放弃的响应数和字节数、读取的字节数，以及同时进行的最大请求数"""
+        return dict(self.counters)
+
+    async def shutdown(self) -> None:
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def close(self) -> None:
+        """取消所有未完成的请求并停止事件循环"""
+        with self.lock:
+            loop, thread = self.loop, self.thread
+            self.loop = self.thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.shutdown(), loop).result(timeout=5)
+        except Exception as e:
+            print(f"关闭异步获取器时出错: {str(e)}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+_shared_fetcher: Optional[AsyncFetcher] = None
+_shared_lock = threading.Lock()
+
+def get_async_fetcher() -> AsyncFetcher:
+    """获取进程内共享的异步获取器，缓存监控和下载线程共用并发上限"""
+    global _shared_fetcher
+    with _shared_lock:
+        if _shared_fetcher is None:
+            _shared_fetcher = AsyncFetcher()
+        return _shared_fetcher
+
+def close_async_fetcher() -> None:
+    """程序退出时关闭共享的异步获取器，之后再调用get_async_fetcher()会重新创建"""
+    global _shared_fetcher
+    with _shared_lock:
+        fetcher, _shared_fetcher = _shared_fetcher, None
+    if fetcher is not None:
+        fetcher.close()
@@ -0,0 +1,302 @@
+import os
+import struct
+from typing import Iterator, List, Optional, Set, Tuple
+
+from ..core.cache_key import build_cache_keys
+from ..core.cache_entry import BODY_CHUNK_SIZE, CacheEntry
+
+# blockfile后端的目录布局:
+#   index      文件头 + hash表(每个桶是一个CacheAddr，指向条目链表的第一个EntryStore)
+#   data_0..N  按固定块大小划分的块文件，8KB文件头之后是数据块
+#   f_XXXXXX   放不进数据块的大数据流
+INDEX_MAGIC = 0xC103CAC3
+BLOCK_MAGIC = 0xC104CAC3
+
+INDEX_FILE_NAME = 'index'
+# IndexHeader(含LruData)的大小，hash表紧跟在后面
+INDEX_HEADER_SIZE = 368
+INDEX_TABLE_LEN_OFFSET = 28
+DEFAULT_TABLE_LEN = 0x10000
+# 块文件头(BlockFileHeader)的大小，数据块从这里开始
+BLOCK_HEADER_SIZE = 8192
+
+# CacheAddr的各个位
+ADDR_INITIALIZED = 0x80000000
+ADDR_FILE_TYPE_MASK = 0x70000000
+ADDR_FILE_TYPE_OFFSET = 28
+ADDR_FILE_NUMBER_MASK = 0x0FFFFFFF
+ADDR_NUM_BLOCKS_MASK = 0x03000000
+ADDR_NUM_BLOCKS_OFFSET = 24
+ADDR_FILE_SELECTOR_MASK = 0x00FF0000
+ADDR_FILE_SELECTOR_OFFSET = 16
+ADDR_START_BLOCK_MASK = 0x0000FFFF
+
+FILE_TYPE_EXTERNAL = 0
+FILE_TYPE_RANKINGS = 1
+# 各种块文件的块大小
+BLOCK_SIZES = {1: 36, 2: 256, 3: 1024, 4: 4096, 5: 8, 6: 104, 7: 48}
+
+# EntryStore: hash, next, rankings_node, reuse_count, refetch_count, state, creation_time,
+#             key_len, long_key, data_size[4], data_addr[4], flags, pad[4], self_hash, key[160]
+ENTRY_STRUCT = struct.Struct('<IIIiiiQiI4i4II16xI')
+ENTRY_KEY_OFFSET = 96
+ENTRY_BLOCK_SIZE = 256
+ENTRY_STATE_DOOMED = 2
+# RankingsNode: last_used, last_modified, next, prev, contents, dirty, self_hash
+RANKINGS_STRUCT = struct.Struct('<QQIIIiI')
+
+# 防止损坏的链表形成环
+MAX_CHAIN_LENGTH = 1024
+
+def super_fast_hash(data: bytes) -> int:
+    """Paul Hsieh的SuperFastHash，blockfile后端用它计算key的hash"""
+    length = len(data)
+    if length == 0:
+        return 0
+
+    mask = 0xFFFFFFFF
+    value = length
+    rem = length & 3
+    end = length - rem
+    for pos in range(0, end, 4):
+        value = (value + (data[pos] | data[pos + 1] << 8)) & mask
+        tmp = (((data[pos + 2] | data[pos + 3] << 8) << 11) ^ value) & mask
+        value = ((value << 16) ^ tmp) & mask
+        value = (value + (value >> 11)) & mask
+
+    # 剩余字节按有符号char处理，与Chrome的实现保持一致
+    if rem == 3:
+        value = (value + (data[end] | data[end + 1] << 8)) & mask
+        value ^= (value << 16) & mask
+        value ^= (_signed_byte(data[end + 2]) << 18) & mask
+        value = (value + (value >> 11)) & mask
+    elif rem == 2:
+        value = (value + (data[end] | data[end + 1] << 8)) & mask
+        value ^= (value << 11) & mask
+        value = (value + (value >> 17)) & mask
+    elif rem == 1:
+        value = (value + _signed_byte(data[end])) & mask
+        value ^= (value << 10) & mask
+        value = (value + (value >> 1)) & mask
+
+    value ^= (value << 3) & mask
+    value = (value + (value >> 5)) & mask
+    value ^= (value << 4) & mask
+    value = (value + (value >> 17)) & mask
+    value ^= (value << 25) & mask
+    value = (value + (value >> 6)) & mask
+    return value
+
+def _signed_byte(byte: int) -> int:
+    return byte - 256 if byte > 127 else byte
+
+def is_blockfile_cache(directory: str) -> bool:
+    """检查目录是否是blockfile后端的缓存（index文件以INDEX_MAGIC开头）"""
+    try:
+        with open(os.path.join(directory, INDEX_FILE_NAME), 'rb') as f:
+            head = f.read(4)
+    except OSError:
+        return False
+    return len(head) == 4 and struct.unpack('<I', head)[0] == INDEX_MAGIC
+
+class BlockfileCacheEntry(CacheEntry):
+    """blockfile后端的缓存条目，stream 0是响应头，stream 1是正文"""
+
+    def __init__(self, reader: 'BlockfileCacheReader', address: int, key: str,
+                 data_sizes: Tuple[int, ...], data_addrs: Tuple[int, ...], last_used: int = 0):
+        super().__init__()
+        self.reader = reader
+        self.address = address
+        self.key = key
+        self.data_sizes = data_sizes
+        self.data_addrs = data_addrs
+        self.last_used = last_used
+        self.path = reader.address_path(address)
+        self.stream1_size = data_sizes[1]
+
+    def read_stream0(self) -> bytes:
+        """读取stream 0（序列化的HTTP响应头）"""
+        return b''.join(self.reader.iter_stream(self.data_addrs[0], self.data_sizes[0]))
+
+    def iter_body(self, chunk_size: int = BODY_CHUNK_SIZE) -> Iterator[bytes]:
+        """分块读取stream 1，正文可能在数据块中，也可能在f_XXXXXX外部文件中"""
+        return self.reader.iter_stream(self.data_addrs[1], self.data_sizes[1], chunk_size)
+
+class BlockfileCacheReader:
+    """blockfile后端缓存目录的读取器
+
+    按key计算hash定位index中的桶，沿EntryStore链表找到条目，再通过条目中的CacheAddr
+    直接读取对应的数据块或外部文件，不需要扫描整个data_N文件。
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def address_path(self, address: int) -> str:
+        """CacheAddr所在的文件路径"""
+        file_type = (address & ADDR_FILE_TYPE_MASK) >> ADDR_FILE_TYPE_OFFSET
+        if file_type == FILE_TYPE_EXTERNAL:
+            return os.path.join(self.directory, f"f_{address & ADDR_FILE_NUMBER_MASK:06x}")
+        selector = (address & ADDR_FILE_SELECTOR_MASK) >> ADDR_FILE_SELECTOR_OFFSET
+        return os.path.join(self.directory, f"data_{selector}")
+
+    def resolve_address(self, address: int) -> Tuple[str, int, int]:
+        """把CacheAddr解析为(文件路径, 偏移, 可用长度)，外部文件的可用长度为-1（不限）"""
+        if not address & ADDR_INITIALIZED:
+            raise ValueError(f"未初始化的缓存地址: {address:#010x}")
+        file_type = (address & ADDR_FILE_TYPE_MASK) >> ADDR_FILE_TYPE_OFFSET
+        path = self.address_path(address)
+        if file_type == FILE_TYPE_EXTERNAL:
+            return path, 0, -1
+
+        block_size = BLOCK_SIZES.get(file_type)
+        if block_size is None:
+            raise ValueError(f"未知的块文件类型: {file_type}")
+        num_blocks = ((address & ADDR_NUM_BLOCKS_MASK) >> ADDR_NUM_BLOCKS_OFFSET) + 1
+        start_block = address & ADDR_START_BLOCK_MASK
+        return path, BLOCK_HEADER_SIZE + start_block * block_size, num_blocks * block_size
+
+    def read_address(self, address: int, size: int) -> bytes:
+        """读取CacheAddr指向的一段数据"""
+        path, offset, capacity = self.resolve_address(address)
+        if capacity >= 0:
+            size = min(size, capacity)
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            return f.read(size)
+
+    def iter_stream(self, address: int, size: int, chunk_size: int = BODY_CHUNK_SIZE) -> Iterator[bytes]:
+        """分块读取条目的一个数据流"""
+        if size <= 0 or not address & ADDR_INITIALIZED:
+            return
+        path, offset, capacity = self.resolve_address(address)
+        remaining = min(size, capacity) if capacity >= 0 else size
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def table_len(self) -> int:
+        """index中hash表的桶数"""
+        with open(os.path.join(self.directory, INDEX_FILE_NAME), 'rb') as f:
+            head = f.read(INDEX_TABLE_LEN_OFFSET + 4)
+        if len(head) < INDEX_TABLE_LEN_OFFSET + 4 or struct.unpack_from('<I', head)[0] != INDEX_MAGIC:
+            raise ValueError(f"不是blockfile缓存索引: {self.directory}")
+        table_len = struct.unpack_from('<i', head, INDEX_TABLE_LEN_OFFSET)[0]
+        return table_len if table_len > 0 else DEFAULT_TABLE_LEN
+
+    def read_bucket(self, bucket: int) -> int:
+        """读取hash表中一个桶的CacheAddr"""
+        with open(os.path.join(self.directory, INDEX_FILE_NAME), 'rb') as f:
+            f.seek(INDEX_HEADER_SIZE + bucket * 4)
+            data = f.read(4)
+        return struct.unpack('<I', data)[0] if len(data) == 4 else 0
+
+    def read_entry_store(self, address: int) -> Optional[Tuple]:
+        """读取EntryStore，返回(字段元组, 原始数据)，地址无效时返回None"""
+        try:
+            data = self.read_address(address, ENTRY_BLOCK_SIZE * 4)
+        except (OSError, ValueError):
+            return None
+        if len(data) < ENTRY_STRUCT.size:
+            return None
+        return ENTRY_STRUCT.unpack_from(data), data
+
+    def read_key(self, fields: Tuple, data: bytes) -> Optional[str]:
+        """读取条目的key，较长的key保存在long_key指向的块或外部文件中"""
+        key_len, long_key = fields[7], fields[8]
+        if key_len <= 0:
+            return None
+        if long_key & ADDR_INITIALIZED:
+            try:
+                raw = self.read_address(long_key, key_len)
+            except (OSError, ValueError):
+                return None
+        else:
+            raw = data[ENTRY_KEY_OFFSET:ENTRY_KEY_OFFSET + key_len]
+        if len(raw) != key_len:
+            return None
+        return raw.decode('utf-8', errors='replace')
+
+    def read_last_used(self, rankings_addr: int, address: int) -> Optional[int]:
+        """读取条目的rankings节点，节点不指回该条目时说明条目已失效，返回None"""
+        if not rankings_addr & ADDR_INITIALIZED:
+            return 0
+        try:
+            data = self.read_address(rankings_addr, RANKINGS_STRUCT.size)
+        except (OSError, ValueError):
+            return None
+        if len(data) < RANKINGS_STRUCT.size:
+            return None
+        last_used, _, _, _, contents, _, _ = RANKINGS_STRUCT.unpack(data)
+        return last_used if contents == address else None
+
+    def load_entry(self, address: int, fields: Tuple, data: bytes,
+                   key: Optional[str] = None) -> Optional[BlockfileCacheEntry]:
+        """由EntryStore生成条目对象"""
+        if fields[5] == ENTRY_STATE_DOOMED:
+            return None
+        if key is None:
+            key = self.read_key(fields, data)
+            if key is None:
+                return None
+        last_used = self.read_last_used(fields[2], address)
+        if last_used is None:
+            return None
+        return BlockfileCacheEntry(self, address, key, fields[9:13], fields[13:17], last_used)
+
+    def find_entry(self, key: str) -> Optional[BlockfileCacheEntry]:
+        """按key查找条目：只读取一个桶和链表上的EntryStore"""
+        key_bytes = key.encode('utf-8')
+        key_hash = super_fast_hash(key_bytes)
+        try:
+            address = self.read_bucket(key_hash & (self.table_len() - 1))
+        except (OSError, ValueError):
+            return None
+
+        for _ in range(MAX_CHAIN_LENGTH):
+            if not address & ADDR_INITIALIZED:
+                break
+            store = self.read_entry_store(address)
+            if store is None:
+                break
+            fields, data = store
+            if fields[0] == key_hash and fields[7] == len(key_bytes) and self.read_key(fields, data) == key:
+                return self.load_entry(address, fields, data, key)
+            address = fields[1]
+        return None
+
+    def find_entries(self, url: str) -> List[BlockfileCacheEntry]:
+        """查找URL可能对应的所有缓存key的条目"""
+        entries = []
+        for key in build_cache_keys(url):
+            entry = self.find_entry(key)
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
+    def iter_entries(self) -> Iterator[BlockfileCacheEntry]:
+        """遍历hash表中的所有条目"""
+        table_len = self.table_len()
+        with open(os.path.join(self.directory, INDEX_FILE_NAME), 'rb') as f:
+            f.seek(INDEX_HEADER_SIZE)
+            table = f.read(table_len * 4)
+
+        seen: Set[int] = set()
+        for (address,) in struct.iter_unpack('<I', table[:len(table) // 4 * 4]):
+            for _ in range(MAX_CHAIN_LENGTH):
+                if not address & ADDR_INITIALIZED or address in seen:
+                    break
+                seen.add(address)
+                store = self.read_entry_store(address)
+                if store is None:
+                    break
+                fields, data = store
+                entry = self.load_entry(address, fields, data)
+                if entry is not None:
+                    yield entry
+                address = fields[1]
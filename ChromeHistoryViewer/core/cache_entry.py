@@ -0,0 +1,104 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, Optional, Tuple
+
+from ..core.cache_key import url_from_cache_key
+from ..core.charset import decode_html
+from ..core.content_encoding import decode_body
+
+BODY_CHUNK_SIZE = 64 * 1024
+
+# 只有这些类型的正文才值得读取
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+CHARSET_RE = re.compile(r'charset=([^;\s]+)', re.IGNORECASE)
+
+class CacheEntry(ABC):
+    """缓存条目的公共接口，Simple Cache和blockfile两种后端的条目都继承它
+
+    子类需要提供path、key、stream1_size属性，并实现read_stream0()和iter_body()。
+    """
+
+    path: str
+    key: str
+    stream1_size: int
+
+    def __init__(self):
+        self._headers: Optional[Tuple[str, Dict[str, str]]] = None
+
+    @property
+    def url(self) -> str:
+        """条目对应的URL"""
+        return url_from_cache_key(self.key)
+
+    @abstractmethod
+    def read_stream0(self) -> bytes:
+        """读取stream 0（序列化的HTTP响应头）"""
+
+    @abstractmethod
+    def iter_body(self, chunk_size: int = BODY_CHUNK_SIZE) -> Iterator[bytes]:
+        """分块读取stream 1（响应正文）"""
+
+    def read_body(self) -> bytes:
+        """读取stream 1（响应正文）"""
+        return b''.join(self.iter_body())
+
+    def read_decoded_body(self) -> bytes:
+        """读取正文并按Content-Encoding流式解压"""
+        return decode_body(self.iter_body(), self.header('content-encoding'))
+
+    def read_text(self) -> str:
+        """读取解压后的正文并按声明或检测到的字符集解码"""
+        return decode_html(self.read_decoded_body(), self.charset())
+
+    def read_response_headers(self) -> Tuple[str, Dict[str, str]]:
+        """读取并解析stream 0中的HTTP响应头，返回(状态行, 头部字典)"""
+        if self._headers is None:
+            self._headers = parse_response_headers(self.read_stream0())
+        return self._headers
+
+    def header(self, name: str, default: str = '') -> str:
+        """获取单个响应头的值"""
+        return self.read_response_headers()[1].get(name.lower(), default)
+
+    def charset(self) -> str:
+        """从Content-Type中获取字符集，没有声明时返回空字符串"""
+        match = CHARSET_RE.search(self.header('content-type'))
+        return match.group(1).strip('"\'') if match else ''
+
+    def mime_type(self) -> str:
+        """Content-Type中的媒体类型部分（小写）"""
+        return self.header('content-type').split(';', 1)[0].strip().lower()
+
+    def is_html(self) -> bool:
+        """根据stream 0中的响应头判断正文是否是HTML，没有Content-Type时按可能是HTML处理"""
+        mime_type = self.mime_type()
+        return not mime_type or mime_type in HTML_CONTENT_TYPES
+
+    def status_code(self) -> int:
+        """获取响应状态码，无法解析时返回0"""
+        status_line = self.read_response_headers()[0]
+        try:
+            return int(status_line.split(' ')[1])
+        except (IndexError, ValueError):
+            return 0
+
+def parse_response_headers(stream0: bytes) -> Tuple[str, Dict[str, str]]:
+    """解析stream 0（序列化的HttpResponseInfo）中以\\0分隔的原始响应头"""
+    start = stream0.find(b'HTTP/')
+    if start < 0:
+        return '', {}
+    end = stream0.find(b'\0\0', start)
+    if end < 0:
+        end = len(stream0)
+
+    lines = stream0[start:end].decode('latin1').split('\0')
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if not sep:
+            continue
+        name = name.strip().lower()
+        value = value.strip()
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+    return lines[0], headers
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..config import CACHE_EVENT_QUIET_PERIOD
+
+class CoalescingEventQueue:
+    """合并缓存文件事件的队列
+
+    Chrome会分几步写完一个缓存条目，同一个文件会连续触发多次事件。队列按路径合并事件，
+    文件在安静期内没有新事件、并且大小和修改时间与最后一次事件时一致，才交给解析器处理一次。
+    """
+
+    def __init__(self, quiet_period: float = CACHE_EVENT_QUIET_PERIOD):
+        self.quiet_period = quiet_period
+        self.lock = threading.Lock()
+        # 路径 -> (最后一次事件的时间, 当时的(大小, 修改时间))
+        self.pending: Dict[str, Tuple[float, Optional[Tuple[int, int]]]] = {}
+        self.events_received = 0
+        self.events_coalesced = 0
+        self.files_unsettled = 0
+        self.files_processed = 0
+
+    def file_snapshot(self, path: str) -> Optional[Tuple[int, int]]:
+        """获取文件的(大小, 修改时间)，文件不存在时返回None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def put(self, path: str) -> None:
+        """记录一次文件创建或修改事件"""
+        snapshot = self.file_snapshot(path)
+        with self.lock:
+            self.events_received += 1
+            if path in self.pending:
+                self.events_coalesced += 1
+            self.pending[path] = (time.monotonic(), snapshot)
+
+    def discard(self, path: str) -> None:
+        """文件被删除，丢弃尚未处理的事件"""
+        with self.lock:
+            self.pending.pop(path, None)
+
+    def pop_ready(self) -> List[str]:
+        """取出已经过了安静期且写入完成的文件"""
+        now = time.monotonic()
+        with self.lock:
+            candidates = [
+                (path, pending) for path, pending in self.pending.items()
+                if now - pending[0] >= self.quiet_period
+            ]
+
+        ready = []
+        for path, pending in candidates:
+            snapshot = pending[1]
+            current = self.file_snapshot(path)
+            with self.lock:
+                if self.pending.get(path) != pending:
+                    # 检查期间又来了新事件，留到下一轮
+                    continue
+                if current is None:
+                    del self.pending[path]
+                elif current != snapshot:
+                    # 文件还在写入，重新开始计时
+                    self.files_unsettled += 1
+                    self.pending[path] = (now, current)
+                else:
+                    del self.pending[path]
+                    ready.append(path)
+
+        with self.lock:
+            self.files_processed += len(ready)
+        return ready
+
+    def stats(self) -> Dict[str, int]:
+        """事件统计：收到的事件数、合并掉的事件数、未写完重新计时的次数、实际处理的文件数"""
+        with self.lock:
+            return {
+                'events_received': self.events_received,
+                'events_coalesced': self.events_coalesced,
+                'files_unsettled': self.files_unsettled,
+                'files_processed': self.files_processed,
+                'pending': len(self.pending),
+            }
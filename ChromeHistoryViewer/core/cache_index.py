@@ -0,0 +1,167 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from ..config import CACHE_INDEX_DB
+from ..core.cache_key import normalize_cache_url
+from ..core.simple_cache import SimpleCacheEntry, parse_entry_file
+
+class CacheIndex:
+    """持久化的缓存条目索引: 缓存key -> 条目文件、stream偏移和响应头信息
+
+    每条记录用(inode, mtime, size)校验，文件没有变化时不会重新解析。
+    """
+
+    def __init__(self, db_path: str = CACHE_INDEX_DB):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                path TEXT PRIMARY KEY,
+                cache_key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                inode INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                stream0_offset INTEGER NOT NULL,
+                stream0_size INTEGER NOT NULL,
+                stream1_offset INTEGER NOT NULL,
+                stream1_size INTEGER NOT NULL,
+                status_code INTEGER NOT NULL,
+                content_type TEXT NOT NULL,
+                content_encoding TEXT NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_url ON entries(url)')
+        self.conn.commit()
+
+    def build_row(self, path: str, stat: os.stat_result) -> Tuple:
+        """解析条目文件并生成索引记录，不是Simple Cache条目的文件也记录下来，避免重复解析"""
+        entry = parse_entry_file(path)
+        if entry is None:
+            return (path, '', '', stat.st_ino, stat.st_mtime_ns, stat.st_size,
+                    0, 0, 0, 0, 0, '', '')
+        return (path, entry.key, entry.url, stat.st_ino, stat.st_mtime_ns, stat.st_size,
+                entry.stream0_offset, entry.stream0_size,
+                entry.stream1_offset, entry.stream1_size,
+                entry.status_code(), entry.header('content-type'),
+                entry.header('content-encoding'))
+
+    def upsert_rows(self, rows: List[Tuple]) -> None:
+        """写入索引记录"""
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO entries (
+                path, cache_key, url, inode, mtime_ns, size,
+                stream0_offset, stream0_size, stream1_offset, stream1_size,
+                status_code, content_type, content_encoding
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+    def refresh(self, directories: Iterable[str]) -> Tuple[int, int]:
+        """与缓存目录同步，只解析新增或变化的文件，返回(更新数, 删除数)"""
+        with self.lock:
+            known = {
+                path: (inode, mtime_ns, size)
+                for path, inode, mtime_ns, size in self.conn.execute(
+                    'SELECT path, inode, mtime_ns, size FROM entries'
+                )
+            }
+
+            rows = []
+            seen = set()
+            for directory in directories:
+                if not os.path.isdir(directory):
+                    continue
+                for root, _, files in os.walk(directory):
+                    for file in files:
+                        path = os.path.join(root, file)
+                        if path in seen:
+                            continue
+                        seen.add(path)
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                        if known.get(path) != (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+                            rows.append(self.build_row(path, stat))
+
+            removed = [(path,) for path in known if path not in seen]
+            self.upsert_rows(rows)
+            self.conn.executemany('DELETE FROM entries WHERE path = ?', removed)
+            self.conn.commit()
+            return len(rows), len(removed)
+
+    def update_path(self, path: str) -> None:
+        """文件被创建或修改后增量更新索引"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.remove_path(path)
+            return
+
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT inode, mtime_ns, size FROM entries WHERE path = ?', (path,)
+            ).fetchone()
+            if row == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+                return
+            self.upsert_rows([self.build_row(path, stat)])
+            self.conn.commit()
+
+    def remove_path(self, path: str) -> None:
+        """文件被删除后从索引中移除"""
+        with self.lock:
+            self.conn.execute('DELETE FROM entries WHERE path = ?', (path,))
+            self.conn.commit()
+
+    def lookup(self, urls: Iterable[str]) -> Dict[str, List[SimpleCacheEntry]]:
+        """一次查询找出一批URL对应的HTML缓存条目，已经失效的记录会被重新索引"""
+        cache_urls = list({normalize_cache_url(url) for url in urls})
+        if not cache_urls:
+            return {}
+
+        with self.lock:
+            placeholders = ','.join('?' * len(cache_urls))
+            rows = self.conn.execute(f'''
+                SELECT path, cache_key, url, inode, mtime_ns, size,
+                       stream0_offset, stream0_size, stream1_offset, stream1_size
+                FROM entries
+                WHERE url IN ({placeholders})
+                  AND (content_type = ''
+                       OR content_type LIKE 'text/html%'
+                       OR content_type LIKE 'application/xhtml+xml%')
+            ''', cache_urls).fetchall()
+
+        result: Dict[str, List[SimpleCacheEntry]] = {}
+        stale = []
+        for (path, key, url, inode, mtime_ns, size,
+             stream0_offset, stream0_size, stream1_offset, stream1_size) in rows:
+            if not self.is_current(path, inode, mtime_ns, size):
+                stale.append(path)
+                continue
+            result.setdefault(url, []).append(SimpleCacheEntry(
+                path, key, 0, size,
+                stream0_offset, stream0_size,
+                stream1_offset, stream1_size
+            ))
+
+        for path in stale:
+            self.update_path(path)
+        return result
+
+    def is_current(self, path: str, inode: int, mtime_ns: int, size: int) -> bool:
+        """检查索引记录对应的文件是否仍未变化"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) == (inode, mtime_ns, size)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
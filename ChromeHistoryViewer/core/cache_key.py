@@ -0,0 +1,78 @@
+import hashlib
+import ipaddress
+import re
+import struct
+from typing import List
+from urllib.parse import urlsplit, urlunsplit
+
+# HTTP缓存key格式: <凭据标记>/<上传数据ID>/[隔离key]<url>
+CACHE_KEY_PREFIX = '1/0/'
+# 分区缓存（split cache）的key以_dk_开头，后面是 "顶层站点 框架站点 " 再接URL
+DOUBLE_KEY_PREFIX = '_dk_'
+DOUBLE_KEY_SEPARATOR = ' '
+# 跨站主框架导航会在隔离key前额外加上该前缀
+CROSS_SITE_NAVIGATION_PREFIX = 'cn_'
+
+_KEY_PREFIX_RE = re.compile(r'^\d+/\d+/')
+
+def entry_hash(key: str) -> int:
+    """计算Simple Cache条目的hash（key的SHA-1前8字节，按小端解释）"""
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    return struct.unpack('<Q', digest[:8])[0]
+
+def entry_file_name(key: str, file_index: int = 0) -> str:
+    """根据缓存key得到条目文件名，例如 0123456789abcdef_0"""
+    return f"{entry_hash(key):016x}_{file_index}"
+
+def normalize_cache_url(url: str) -> str:
+    """去掉URL中不参与缓存key的片段(#fragment)"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, parts.query, ''))
+
+def site_candidates(url: str) -> List[str]:
+    """猜测URL的站点(scheme://eTLD+1)
+
+    没有公共后缀列表时无法精确得到eTLD+1，这里依次给出后两级、后三级域名和完整主机名，
+    多出来的候选只会多几次stat调用。
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or '').rstrip('.')
+    if not parts.scheme or not host:
+        return []
+
+    try:
+        ipaddress.ip_address(host)
+        return [f"{parts.scheme}://{host}"]
+    except ValueError:
+        pass
+
+    labels = host.split('.')
+    sites = []
+    for count in (2, 3, len(labels)):
+        if count > len(labels):
+            continue
+        site = f"{parts.scheme}://{'.'.join(labels[-count:])}"
+        if site not in sites:
+            sites.append(site)
+    return sites
+
+def build_cache_keys(url: str) -> List[str]:
+    """构造URL可能对应的所有缓存key（包括分区缓存的_dk_ key）"""
+    url = normalize_cache_url(url)
+    keys = [f"{CACHE_KEY_PREFIX}{url}", url]
+
+    for site in site_candidates(url):
+        isolation_key = f"{site}{DOUBLE_KEY_SEPARATOR}{site}{DOUBLE_KEY_SEPARATOR}"
+        keys.append(f"{CACHE_KEY_PREFIX}{DOUBLE_KEY_PREFIX}{isolation_key}{url}")
+        keys.append(f"{CACHE_KEY_PREFIX}{DOUBLE_KEY_PREFIX}{CROSS_SITE_NAVIGATION_PREFIX}{isolation_key}{url}")
+
+    return keys
+
+
+def url_from_cache_key(key: str) -> str:
+    """从缓存key中还原出URL"""
+    key = _KEY_PREFIX_RE.sub('', key, count=1)
+    if key.startswith(DOUBLE_KEY_PREFIX):
+        # 隔离key中的站点不含空格，URL是最后一段
+        key = key.rsplit(DOUBLE_KEY_SEPARATOR, 1)[-1]
+    return key
@@ -1,21 +1,35 @@
 import os
-import sqlite3
-import requests
-from typing import Dict, Set, Optional
-from PySide6.QtCore import QThread, Signal, QTimer
+import mmap
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Set, Optional
+from PySide6.QtCore import QThread, Signal
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import time
 
 from ..config import (
-    CHROME_DIR, CHROME_CACHE, CHROME_NETWORK,
-    CHROME_COOKIES, DEFAULT_HEADERS
+    CHROME_DIR, CHROME_CACHE, CHROME_NETWORK, CACHE_LOOKUP_MODE
 )
+from ..core.cache_key import normalize_cache_url
+from ..core.cache_entry import CacheEntry
+from ..core.simple_cache import SimpleCacheReader, parse_entry_file
+from ..core.blockfile_cache import BlockfileCacheReader, is_blockfile_cache
+from ..core.cache_index import CacheIndex
+from ..core.url_matcher import UrlMatcher
+from ..core.content_encoding import is_supported
+from ..core.charset import decode_html
+from ..core.cache_scanner import ParallelCacheScanner
+from ..core.cache_events import CoalescingEventQueue
+from ..core.scan_scheduler import ScanScheduler
+from ..core.async_fetcher import FetchResult, get_async_fetcher
+from ..core.retry_scheduler import RetryScheduler
 
 class CacheHandler(FileSystemEventHandler):
     """处理缓存文件变化的事件处理器"""
-    def __init__(self, callback):
+    def __init__(self, callback, delete_callback=None):
         self.callback = callback
+        self.delete_callback = delete_callback
         
     def on_created(self, event):
         if not event.is_directory:
@@ -24,6 +38,16 @@ class CacheHandler(FileSystemEventHandler):
     def on_modified(self, event):
         if not event.is_directory:
             self.callback(event.src_path)
+            
+    def on_deleted(self, event):
+        if not event.is_directory and self.delete_callback:
+            self.delete_callback(event.src_path)
+            
+    def on_moved(self, event):
+        if not event.is_directory:
+            if self.delete_callback:
+                self.delete_callback(event.src_path)
+            self.callback(event.dest_path)
 
 class ChromeCacheMonitor(QThread):
     """监控Chrome缓存的线程"""
@@ -34,6 +58,37 @@ class ChromeCacheMonitor(QThread):
         self.is_running = False
         self.observer = None
         self.url_patterns: Set[str] = set()
+        self.cache_urls: Dict[str, Set[str]] = {}  # 去掉片段后的URL -> 监视的URL
+        self.url_matcher: Optional[UrlMatcher] = None  # 监视列表变化时置空，下次使用时重建
+        
+        # 缓存条目正文的读取/跳过统计
+        self.stats_lock = threading.Lock()
+        self.content_stats: Dict[str, int] = {
+            'entries': 0, 'entries_skipped': 0,
+            'bytes_total': 0, 'bytes_read': 0, 'bytes_skipped': 0,
+        }
+        
+        self.scanner = ParallelCacheScanner()
+        # 每个缓存目录对应的读取器(Simple Cache或blockfile)
+        self.cache_readers: Dict[str, object] = {}
+        # 文件系统事件先进入合并队列，由监控线程统一处理
+        self.event_queue = CoalescingEventQueue()
+        # 缓存扫描在独立的调度线程中进行，连续加入的URL合并成一次定向查找
+        self.scan_scheduler = ScanScheduler(self.scan_existing_cache)
+        
+        # 缓存中没有的页面交给异步获取器并发请求；获取器与下载线程共用，这里只记录自己提交的请求
+        self.fetcher = get_async_fetcher()
+        self.fetch_lock = threading.Lock()
+        self.fetching: Dict[str, Optional[Future]] = {}  # 正在请求的URL -> 提交返回的Future
+        # 暂时性失败的请求在这里排队，到期后由监控线程重新提交
+        self.retry_scheduler = RetryScheduler()
+        
+        # 持久化的缓存条目索引，打开失败时退回到按hash查找
+        self.cache_index: Optional[CacheIndex] = None
+        try:
+            self.cache_index = CacheIndex()
+        except Exception as e:
+            print(f"打开缓存索引失败: {str(e)}")
         
         # 检查缓存目录是否存在
         if not os.path.exists(CHROME_CACHE):
@@ -41,211 +96,353 @@ class ChromeCacheMonitor(QThread):
         if not os.path.exists(CHROME_NETWORK):
             print(f"警告: Chrome网络缓存目录不存在: {CHROME_NETWORK}")
         
-    def get_cookies(self, domain: str) -> Dict[str, str]:
-        """获取指定域名的cookies"""
-        cookies = {}
-        temp_cookies = os.path.join(os.path.dirname(CHROME_COOKIES), 'temp_cookies')
+    def fetch_in_background(self, urls: Iterable[str]) -> None:
+        """把URL交给异步获取器直接请求，不阻塞当前线程，结果在on_fetch_result中处理"""
+        for url in urls:
+            with self.fetch_lock:
+                if url in self.fetching:
+                    continue
+                self.fetching[url] = None
+            print(f"直接获取URL: {url}")
+            future = self.fetcher.submit(url, self.on_fetch_result)
+            with self.fetch_lock:
+                # 请求可能已经完成并从记录中删除
+                if url in self.fetching:
+                    self.fetching[url] = future
+    
+    def on_fetch_result(self, result: FetchResult) -> None:
+        """直接请求完成的回调（在获取器的事件循环线程中）"""
+        with self.fetch_lock:
+            self.fetching.pop(result.url, None)
+        if not self.is_running or result.url not in self.url_patterns:
+            self.retry_scheduler.forget(result.url)
+            return
+        if not result.ok:
+            delay = self.retry_scheduler.schedule(result.url, result.retry_after) if result.retryable else None
+            if delay is not None:
+                print(f"请求失败({result.status or result.error})，{delay:.1f}秒后重试: {result.url}")
+            else:
+                self.retry_scheduler.forget(result.url)
+                print(f"无法获取URL内容: {result.url} ({result.status or result.error})")
+            return
+        self.retry_scheduler.forget(result.url)
+        # 304时text是上次保存的正文，与新下载的正文一样交给下载线程，是否需要转换由下载线程决定
+        if len(result.text) <= 1000:
+            print(f"获取的内容太短，不处理: {result.url}")
+            return
+        print(f"成功获取URL内容，长度: {len(result.text)}")
+        self.content_ready.emit(result.url, result.text)
+        self.remove_url_from_watch(result.url)
+    
+    def process_due_retries(self) -> None:
+        """重新提交已经到期的重试请求"""
+        due = [url for url in self.retry_scheduler.pop_due() if url in self.url_patterns]
+        if due:
+            self.fetch_in_background(due)
+    
+    def process_cache_file(self, cache_file: str) -> None:
+        """处理缓存文件"""
         try:
-            # 复制cookies文件
-            from ..core.utils import copy_file_safe
-            if not copy_file_safe(CHROME_COOKIES, temp_cookies):
-                print(f"无法复制Cookie文件: {CHROME_COOKIES}")
-                return cookies
+            if not os.path.exists(cache_file):
+                return
+                
+            if os.path.getsize(cache_file) < 100:  # 跳过太小的文件
+                return
             
-            # 连接数据库
-            conn = sqlite3.connect(temp_cookies)
-            cursor = conn.cursor()
+            # blockfile后端的条目分散在index和data_N中，按key查找监视的URL，不扫描整个文件
+            reader = self.get_cache_reader(os.path.dirname(cache_file))
+            if isinstance(reader, BlockfileCacheReader):
+                self.lookup_urls_in_reader(reader, list(self.url_patterns))
+                return
             
-            # 查询cookies
-            cursor.execute('''
-                SELECT name, value, host_key
-                FROM cookies
-                WHERE host_key LIKE ?
-            ''', ('%' + domain + '%',))
+            # 优先按Simple Cache条目解析，直接得到key和正文的位置
+            entry = parse_entry_file(cache_file)
+            if entry is not None:
+                self.process_cache_entry(entry)
+                return
+            
+            # 不是Simple Cache条目，退回到在整个文件中查找URL
+            self.process_raw_cache_file(cache_file)
             
-            for name, value, host in cursor.fetchall():
-                cookies[name] = value
-                
-            print(f"获取到 {len(cookies)} 个cookies，域名: {domain}")
-                
         except Exception as e:
-            print(f"读取cookies时出错: {str(e)}")
-        finally:
-            if 'conn' in locals():
-                conn.close()
-            if os.path.exists(temp_cookies):
-                os.remove(temp_cookies)
+            print(f"处理缓存文件时出错: {str(e)}")
+    
+    def record_entry(self, entry: CacheEntry, body_read: bool) -> None:
+        """记录条目正文是被读取还是被跳过"""
+        with self.stats_lock:
+            self.content_stats['entries'] += 1
+            self.content_stats['bytes_total'] += entry.stream1_size
+            if body_read:
+                self.content_stats['bytes_read'] += entry.stream1_size
+            else:
+                self.content_stats['entries_skipped'] += 1
+                self.content_stats['bytes_skipped'] += entry.stream1_size
+    
+    def get_scan_stats(self) -> Dict[str, float]:
+        """缓存条目统计，skip_ratio为未读取正文的字节占比"""
+        with self.stats_lock:
+            stats = dict(self.content_stats)
+        stats['skip_ratio'] = stats['bytes_skipped'] / stats['bytes_total'] if stats['bytes_total'] else 0.0
+        return stats
+    
+    def process_cache_entry(self, entry: CacheEntry) -> None:
+        """处理解析好的缓存条目（Simple Cache或blockfile）"""
+        urls = self.cache_urls.get(entry.url)
+        if not urls:
+            self.record_entry(entry, body_read=False)
+            return
         
-        return cookies
+        # 先只读stream 0中的响应头，图片、脚本、样式等非HTML条目不读取正文
+        if not entry.is_html():
+            print(f"跳过非HTML缓存条目: {entry.url} ({entry.mime_type()})")
+            self.record_entry(entry, body_read=False)
+            return
+            
+        print(f"在缓存条目中找到URL: {entry.url}")
+        print(f"缓存文件路径: {entry.path}")
+        print(f"正文大小: {entry.stream1_size} 字节")
         
-    def fetch_with_cookies(self, url: str) -> Optional[str]:
-        """使用cookies获取页面内容"""
-        max_retries = 2
-        retry_count = 0
+        html_content = None
+        status_line, headers = entry.read_response_headers()
+        content_encoding = headers.get('content-encoding', '')
+        if entry.status_code() == 200 and is_supported(content_encoding):
+            # 压缩过的正文按Content-Encoding流式解压，不需要重新请求
+            html_content = entry.read_text()
+            self.record_entry(entry, body_read=True)
+        else:
+            self.record_entry(entry, body_read=False)
+            print(f"缓存条目无法直接使用: {status_line}, Content-Encoding: {content_encoding}")
         
-        while retry_count <= max_retries:
-            try:
-                # 从URL中提取域名
-                domain = url.split('/')[2]
-                cookies = self.get_cookies(domain)
-                
-                print(f"尝试使用cookies获取页面: {url} (第{retry_count+1}次尝试)")
-                print(f"使用的cookies: {cookies if cookies else '无'}")
-                
-                headers = DEFAULT_HEADERS.copy()  # 复制一份，避免修改原始对象
-                
-                # 增加一些额外的headers，使请求更像浏览器
-                headers['Referer'] = f"https://{domain}/"
-                headers['Sec-Fetch-Dest'] = 'document'
-                headers['Sec-Fetch-Mode'] = 'navigate'
-                headers['Sec-Fetch-Site'] = 'same-origin'
-                
-                response = requests.get(
-                    url,
-                    headers=headers,
-                    cookies=cookies,
-                    timeout=15,
-                    allow_redirects=True  # 允许重定向
-                )
-                
-                if response.status_code != 200:
-                    print(f"请求返回非200状态码: {response.status_code}")
-                    if retry_count < max_retries:
-                        retry_count += 1
-                        print(f"将在1秒后重试...")
-                        time.sleep(1)
-                        continue
-                
-                # 尝试确定正确的编码
-                response.encoding = response.apparent_encoding or 'utf-8'
-                
-                content_length = len(response.text)
-                print(f"成功获取页面内容，长度: {content_length}")
-                
-                # 检查内容是否包含HTML结构
-                if '<html' in response.text or '<!DOCTYPE html' in response.text:
-                    print(f"内容包含HTML结构")
-                    return response.text
-                else:
-                    print(f"内容不包含HTML结构，可能不是HTML页面")
-                    if content_length > 5000:  # 如果内容较长，可能仍然有用
-                        print(f"内容较长，尝试使用")
-                        return response.text
-                    elif retry_count < max_retries:
-                        retry_count += 1
-                        print(f"将在1秒后重试...")
-                        time.sleep(1)
-                        continue
-                    return response.text
-                
-            except Exception as e:
-                print(f"使用cookies获取页面失败: {str(e)}")
-                if retry_count < max_retries:
-                    retry_count += 1
-                    print(f"将在1秒后重试...")
-                    time.sleep(1)
-                else:
-                    return None
+        if html_content and len(html_content) > 1000:
+            print(f"从缓存条目提取到正文，长度: {len(html_content)}")
+        else:
+            # 如果从缓存无法获取完整HTML，交给异步获取器直接请求
+            print(f"尝试直接获取URL内容: {entry.url}")
+            self.fetch_in_background(list(urls))
+            return
         
-        return None
+        for url in list(urls):
+            self.content_ready.emit(url, html_content)
+            self.remove_url_from_watch(url)
     
-    def process_cache_file(self, cache_file: str) -> None:
-        """处理缓存文件"""
+    def get_url_matcher(self) -> UrlMatcher:
+        """获取监视URL的多模式匹配器，监视列表变化后才重新构建"""
+        matcher = self.url_matcher
+        if matcher is None:
+            matcher = self.url_matcher = UrlMatcher(list(self.url_patterns))
+        return matcher
+    
+    def process_raw_cache_file(self, cache_file: str) -> None:
+        """在非Simple Cache格式的缓存文件中查找URL"""
         try:
-            if not os.path.exists(cache_file):
-                return
-                
-            if os.path.getsize(cache_file) < 100:  # 跳过太小的文件
-                return
-                
-            with open(cache_file, 'rb') as f:
-                content = f.read()
-                
-            # 尝试以不同编码解码内容
-            for encoding in ['utf-8', 'latin1', 'gbk', 'gb2312']:
-                try:
-                    content_str = content.decode(encoding, errors='ignore')
-                    
-                    # 检查是否包含我们要找的URL
-                    for url in self.url_patterns:
-                        if url in content_str:
-                            print(f"在缓存文件中找到URL: {url}")
-                            print(f"缓存文件路径: {cache_file}")
-                            print(f"缓存文件大小: {os.path.getsize(cache_file)} 字节")
-                            
-                            # 首先尝试从缓存提取HTML
-                            html_start = content_str.find('<html')
-                            if html_start < 0:
-                                html_start = content_str.find('<!DOCTYPE html')
-                            html_end = content_str.rfind('</html>')
-                            
-                            # 如果找到完整的HTML标签
-                            if html_start >= 0 and html_end >= 0 and html_end > html_start:
-                                html_content = content_str[html_start:html_end + 7]
-                                if len(html_content) > 1000:  # 确保内容足够长
-                                    print(f"从缓存提取到HTML内容，长度: {len(html_content)}")
-                                    self.content_ready.emit(url, html_content)
-                                    self.remove_url_from_watch(url)
-                                    return
-                                else:
-                                    print(f"提取的HTML内容太短: {len(html_content)}")
-                            
-                            # 尝试查找更松散的HTML标记
-                            body_start = content_str.find('<body')
-                            body_end = content_str.rfind('</body>')
-                            
-                            if body_start >= 0 and body_end >= 0 and body_end > body_start:
-                                body_content = content_str[body_start:body_end + 7]
-                                if len(body_content) > 1000:
-                                    print(f"从缓存提取到BODY内容，长度: {len(body_content)}")
-                                    # 构造完整的HTML
-                                    html_content = f"<html><head><title>{url}</title></head>{body_content}</html>"
-                                    self.content_ready.emit(url, html_content)
-                                    self.remove_url_from_watch(url)
-                                    return
-                                else:
-                                    print(f"提取的BODY内容太短: {len(body_content)}")
-                            
-                            # 如果找到了一些HTML结构但不完整
-                            if (html_start >= 0 or body_start >= 0) and len(content_str) > 5000:
-                                print(f"找到部分HTML结构，尝试使用整个内容，长度: {len(content_str)}")
-                                self.content_ready.emit(url, content_str)
-                                self.remove_url_from_watch(url)
-                                return
-                                
-                            # 打印缓存文件的前200个字符，帮助调试
-                            print(f"缓存文件内容前200个字符: {content_str[:200]}")
-                            
-                            # 如果从缓存无法获取完整HTML，尝试使用cookies重新获取
-                            print(f"尝试直接获取URL内容: {url}")
-                            html_content = self.fetch_with_cookies(url)
-                            if html_content and len(html_content) > 1000:
-                                print(f"成功直接获取URL内容，长度: {len(html_content)}")
-                                self.content_ready.emit(url, html_content)
-                                self.remove_url_from_watch(url)
-                            else:
-                                print(f"直接获取URL内容失败或内容太短")
-                            break
-                except Exception as e:
-                    print(f"使用编码 {encoding} 解析缓存文件时出错: {str(e)}")
-                    continue
+            # 用mmap直接在文件上按字节匹配，不把整个文件读进内存，也不做整体解码
+            with open(cache_file, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                # 一次扫描找出文件中出现的所有监视URL
+                matched_urls = self.get_url_matcher().search(content)
+                for url in matched_urls:
+                    if url in self.url_patterns:
+                        self.extract_html_from_raw(url, cache_file, content)
                     
         except Exception as e:
             print(f"处理缓存文件时出错: {str(e)}")
+    
+    def extract_html_from_raw(self, url: str, cache_file: str, content: mmap.mmap) -> None:
+        """从原始缓存文件中提取URL对应的HTML，只解码提取出来的那一段"""
+        print(f"在缓存文件中找到URL: {url}")
+        print(f"缓存文件路径: {cache_file}")
+        print(f"缓存文件大小: {len(content)} 字节")
+        
+        # 首先尝试从缓存提取HTML
+        html_start = content.find(b'<html')
+        if html_start < 0:
+            html_start = content.find(b'<!DOCTYPE html')
+        html_end = content.rfind(b'</html>')
+        
+        # 如果找到完整的HTML标签
+        if html_start >= 0 and html_end >= 0 and html_end > html_start:
+            html_content = decode_html(content[html_start:html_end + 7])
+            if len(html_content) > 1000:  # 确保内容足够长
+                print(f"从缓存提取到HTML内容，长度: {len(html_content)}")
+                self.content_ready.emit(url, html_content)
+                self.remove_url_from_watch(url)
+                return
+            else:
+                print(f"提取的HTML内容太短: {len(html_content)}")
+        
+        # 尝试查找更松散的HTML标记
+        body_start = content.find(b'<body')
+        body_end = content.rfind(b'</body>')
+        
+        if body_start >= 0 and body_end >= 0 and body_end > body_start:
+            body_content = decode_html(content[body_start:body_end + 7])
+            if len(body_content) > 1000:
+                print(f"从缓存提取到BODY内容，长度: {len(body_content)}")
+                # 构造完整的HTML
+                html_content = f"<html><head><title>{url}</title></head>{body_content}</html>"
+                self.content_ready.emit(url, html_content)
+                self.remove_url_from_watch(url)
+                return
+            else:
+                print(f"提取的BODY内容太短: {len(body_content)}")
+        
+        # 如果找到了一些HTML结构但不完整
+        if (html_start >= 0 or body_start >= 0) and len(content) > 5000:
+            content_str = decode_html(content[:])
+            print(f"找到部分HTML结构，尝试使用整个内容，长度: {len(content_str)}")
+            self.content_ready.emit(url, content_str)
+            self.remove_url_from_watch(url)
+            return
+            
+        # 打印缓存文件的前200个字节，帮助调试
+        print(f"缓存文件内容前200个字节: {content[:200]!r}")
+        
+        # 如果从缓存无法获取完整HTML，交给异步获取器直接请求
+        print(f"尝试直接获取URL内容: {url}")
+        self.fetch_in_background([url])
+
+    def cache_directories(self) -> List[str]:
+        """需要监控的缓存目录，去掉嵌套在其他目录中的子目录"""
+        directories = [d for d in [CHROME_CACHE, CHROME_NETWORK] if os.path.isdir(d)]
+        return [
+            d for d in directories
+            if not any(d != other and d.startswith(other + os.sep) for other in directories)
+        ]
+    
+    def on_cache_file_event(self, cache_file: str) -> None:
+        """文件系统事件回调（在watchdog线程中），只把路径放进合并队列"""
+        self.event_queue.put(cache_file)
+    
+    def process_pending_events(self) -> None:
+        """处理合并队列中已经写入完成的文件"""
+        for cache_file in self.event_queue.pop_ready():
+            if not self.is_running:
+                return
+            self.on_cache_file_changed(cache_file)
+    
+    def get_event_stats(self) -> Dict[str, int]:
+        """缓存事件统计：收到的事件数与实际处理的文件数"""
+        return self.event_queue.stats()
+    
+    def on_cache_file_changed(self, cache_file: str) -> None:
+        """缓存文件被创建或修改：更新索引后处理该文件"""
+        if self.cache_index:
+            try:
+                self.cache_index.update_path(cache_file)
+            except Exception as e:
+                print(f"更新缓存索引时出错: {str(e)}")
+        self.process_cache_file(cache_file)
+    
+    def on_cache_file_deleted(self, cache_file: str) -> None:
+        """缓存文件被删除：丢弃未处理的事件并从索引中移除"""
+        self.event_queue.discard(cache_file)
+        if self.cache_index:
+            try:
+                self.cache_index.remove_path(cache_file)
+            except Exception as e:
+                print(f"更新缓存索引时出错: {str(e)}")
+    
+    def refresh_cache_index(self) -> None:
+        """与缓存目录同步索引，只解析新增或变化的文件"""
+        if not self.cache_index:
+            return
+        try:
+            start = time.time()
+            updated, removed = self.cache_index.refresh(self.cache_directories())
+            print(f"缓存索引已同步: 更新 {updated} 个条目，删除 {removed} 个条目，耗时 {time.time() - start:.2f} 秒")
+        except Exception as e:
+            print(f"同步缓存索引时出错: {str(e)}")
+    
+    def lookup_urls_in_index(self, urls: List[str]) -> int:
+        """通过索引一次查出一批URL对应的缓存条目，返回命中的URL数"""
+        if not self.cache_index or not urls:
+            return 0
+        try:
+            entries = self.cache_index.lookup(urls)
+        except Exception as e:
+            print(f"查询缓存索引时出错: {str(e)}")
+            return 0
+        
+        found_count = 0
+        for cache_url, url_entries in entries.items():
+            for entry in url_entries:
+                print(f"通过索引定位到缓存条目: {entry.path}")
+                self.process_cache_entry(entry)
+                if cache_url not in self.cache_urls:
+                    found_count += 1
+                    break
+        return found_count
+    
+    def on_scan_match(self, cache_file: str, url: str) -> None:
+        """并行扫描找到匹配的文件后，在当前线程中提取内容"""
+        if url in self.url_patterns:
+            self.process_cache_file(cache_file)
+    
+    def get_cache_reader(self, directory: str):
+        """获取缓存目录的读取器，根据index文件判断是blockfile还是Simple Cache后端"""
+        reader = self.cache_readers.get(directory)
+        if reader is None:
+            if is_blockfile_cache(directory):
+                print(f"缓存目录使用blockfile后端: {directory}")
+                reader = BlockfileCacheReader(directory)
+            else:
+                reader = SimpleCacheReader(directory)
+            self.cache_readers[directory] = reader
+        return reader
+    
+    def lookup_url_in_cache(self, url: str) -> bool:
+        """根据缓存key的hash直接定位URL对应的条目，只读取候选条目"""
+        for directory in [CHROME_NETWORK, CHROME_CACHE]:
+            if not os.path.isdir(directory):
+                continue
+            for entry in self.get_cache_reader(directory).find_entries(url):
+                print(f"按hash定位到缓存条目: {entry.path}")
+                self.process_cache_entry(entry)
+                if url not in self.url_patterns:
+                    return True
+        return False
+    
+    def lookup_urls_in_reader(self, reader, urls: Iterable[str]) -> int:
+        """在一个缓存目录中按key查找一批URL，返回命中的URL数"""
+        found_count = 0
+        for url in urls:
+            if not self.is_running:
+                break
+            if url not in self.url_patterns:
+                continue
+            for entry in reader.find_entries(url):
+                self.process_cache_entry(entry)
+                if url not in self.url_patterns:
+                    found_count += 1
+                    break
+        return found_count
 
     def add_url_to_watch(self, url: str) -> None:
         """添加要监视的URL"""
         print(f"添加URL到监视列表: {url}")
         self.url_patterns.add(url)
+        self.url_matcher = None
+        self.cache_urls.setdefault(normalize_cache_url(url), set()).add(url)
         
-        # 每添加一个URL，就扫描一次现有缓存
-        # 为避免频繁扫描，可以使用一个计数器或定时器来控制扫描频率
-        # 这里简单起见，直接调用scan_existing_cache方法
-        QTimer.singleShot(0, self.scan_existing_cache)
+        # 交给扫描调度线程，一批连续加入的URL只触发一次定向查找
+        self.scan_scheduler.request([url])
+    
+    def request_scan(self) -> None:
+        """请求扫描当前所有监视的URL"""
+        self.scan_scheduler.request(list(self.url_patterns))
     
     def remove_url_from_watch(self, url: str) -> None:
         """移除监视的URL"""
-        self.url_patterns.discard(url)
+        self.retry_scheduler.forget(url)
+        if url in self.url_patterns:
+            self.url_patterns.discard(url)
+            self.url_matcher = None
+        cache_url = normalize_cache_url(url)
+        urls = self.cache_urls.get(cache_url)
+        if urls is not None:
+            urls.discard(url)
+            if not urls:
+                del self.cache_urls[cache_url]
     
     def run(self) -> None:
         """运行缓存监控"""
@@ -254,7 +451,7 @@ class ChromeCacheMonitor(QThread):
             
             # 创建文件系统观察者
             self.observer = Observer()
-            handler = CacheHandler(self.process_cache_file)
+            handler = CacheHandler(self.on_cache_file_event, self.on_cache_file_deleted)
             
             # 监控Cache目录
             if os.path.exists(CHROME_CACHE):
@@ -268,12 +465,19 @@ class ChromeCacheMonitor(QThread):
             
             self.observer.start()
             
-            # 首次扫描现有缓存
-            self.scan_existing_cache()
+            # 同步缓存索引，之后由文件系统事件增量更新
+            if CACHE_LOOKUP_MODE == 'hash':
+                self.refresh_cache_index()
+            
+            # 启动扫描调度线程，并首次扫描现有缓存
+            self.scan_scheduler.start()
+            self.request_scan()
             
-            # 保持线程运行，但每秒检查是否需要停止
+            # 保持线程运行，处理合并后的缓存事件，并检查是否需要停止
             while self.is_running:
-                self.msleep(1000)  # 使用QThread的msleep而不是time.sleep
+                self.process_pending_events()
+                self.process_due_retries()
+                self.msleep(100)  # 使用QThread的msleep而不是time.sleep
                 
         except Exception as e:
             print(f"缓存监控线程出错: {str(e)}")
@@ -282,68 +486,89 @@ class ChromeCacheMonitor(QThread):
                 self.observer.stop()
                 self.observer.join()
             self.is_running = False
+            print(f"缓存事件统计: {self.get_event_stats()}")
+            print(f"缓存条目统计: {self.get_scan_stats()}")
+            print(f"直接请求统计: {self.fetcher.stats()}")
+            print(f"重试统计: {self.retry_scheduler.stats()}")
+    
+    def lookup_urls(self, urls: Set[str]) -> int:
+        """定向查找一批URL：先用索引一次查出，索引中没有的再按hash直接定位"""
+        found_count = self.lookup_urls_in_index(list(urls))
+        for url in list(urls):
+            if not self.is_running:
+                break
+            if url in self.url_patterns and self.lookup_url_in_cache(url):
+                found_count += 1
+        return found_count
     
-    def scan_existing_cache(self) -> None:
-        """扫描现有的缓存文件"""
+    def scan_existing_cache(self, urls: Optional[Iterable[str]] = None) -> None:
+        """扫描现有的缓存文件，urls为空时扫描所有监视的URL"""
         print("开始扫描现有缓存文件...")
         
+        urls = set(self.url_patterns if urls is None else urls) & self.url_patterns
+        
         # 如果没有URL需要监视，直接返回
-        if not self.url_patterns:
+        if not urls:
             print("没有需要监视的URL，跳过缓存扫描")
             return
             
-        print(f"需要监视的URL: {self.url_patterns}")
-        cache_files_count = 0
+        print(f"需要监视的URL: {urls}")
         
-        for directory in [CHROME_CACHE, CHROME_NETWORK]:
-            if not os.path.exists(directory):
-                print(f"缓存目录不存在: {directory}")
-                continue
-                
-            print(f"扫描缓存目录: {directory}")
-            for root, _, files in os.walk(directory):
-                for file in files:
-                    if not self.is_running:
-                        return
-                    cache_files_count += 1
-                    if cache_files_count % 100 == 0:
-                        print(f"已扫描 {cache_files_count} 个缓存文件...")
-                    self.process_cache_file(os.path.join(root, file))
-                    
-        print(f"缓存扫描完成，共扫描 {cache_files_count} 个文件")
-        
-        # 如果还有未处理的URL，尝试直接获取
-        if self.url_patterns:
-            print(f"缓存扫描后仍有 {len(self.url_patterns)} 个未处理的URL")
-            print(f"尝试直接获取这些URL的内容...")
-            urls_to_fetch = list(self.url_patterns)  # 创建副本，因为在循环中会修改self.url_patterns
-            
-            for url in urls_to_fetch:
-                if not self.is_running:
-                    return
-                    
-                print(f"直接获取URL: {url}")
-                html_content = self.fetch_with_cookies(url)
-                
-                if html_content:
-                    content_length = len(html_content)
-                    print(f"成功获取URL内容，长度: {content_length}")
-                    
-                    if content_length > 1000:
-                        self.content_ready.emit(url, html_content)
-                        self.remove_url_from_watch(url)
-                        print(f"成功处理URL: {url}")
-                    else:
-                        print(f"获取的内容太短，不处理: {url}")
+        if CACHE_LOOKUP_MODE == 'hash':
+            found_count = self.lookup_urls(urls)
+            print(f"按索引和hash查找缓存完成，命中 {found_count} 个URL")
+        else:
+            # blockfile目录按key查找，不需要扫描大的data_N文件
+            directories = []
+            for directory in self.cache_directories():
+                reader = self.get_cache_reader(directory)
+                if isinstance(reader, BlockfileCacheReader):
+                    found_count = self.lookup_urls_in_reader(reader, list(urls))
+                    print(f"按key查找blockfile缓存完成，命中 {found_count} 个URL")
                 else:
-                    print(f"无法获取URL内容: {url}")
+                    directories.append(directory)
+            
+            # 全量扫描：分片后由线程池读取、进程池解析匹配，匹配结果回到当前线程处理
+            print(f"并行扫描缓存目录: {directories}")
+            stats = self.scanner.scan(
+                directories, [url for url in urls if url in self.url_patterns],
+                self.on_scan_match, lambda: self.is_running
+            )
+            print(f"缓存扫描完成: {stats.summary()}")
+        if not self.is_running:
+            return
         
+        # 扫描期间新加入的URL并入本次扫描，只做定向查找，不重新开始扫描
+        absorbed = self.scan_scheduler.absorb()
+        while absorbed and self.is_running:
+            print(f"本次扫描吸收新加入的 {len(absorbed)} 个URL")
+            urls |= absorbed
+            self.lookup_urls(absorbed)
+            absorbed = self.scan_scheduler.absorb()
+        
+        # 如果还有未处理的URL，并发直接请求，结果到达后再发出content_ready
+        urls_to_fetch = [url for url in urls if url in self.url_patterns]
+        if urls_to_fetch:
+            print(f"缓存扫描后仍有 {len(urls_to_fetch)} 个未处理的URL，交给异步获取器直接请求")
+            self.fetch_in_background(urls_to_fetch)
+        
+    def cancel_fetches(self) -> None:
+        """取消这个监控器提交的直接请求；获取器由下载线程共用，在程序退出时才关闭"""
+        with self.fetch_lock:
+            futures = [future for future in self.fetching.values() if future is not None]
+            self.fetching.clear()
+        for future in futures:
+            future.cancel()
+
     def stop(self) -> None:
         """停止监控"""
         self.is_running = False
+        self.scan_scheduler.stop()
         if self.observer:
             self.observer.stop()
             self.observer.join()
+        self.scanner.close()
+        self.cancel_fetches()
         self.wait(1000)  # 最多等待1秒
         if self.isRunning():
             self.terminate()  # 强制终止
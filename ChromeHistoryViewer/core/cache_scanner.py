@@ -0,0 +1,207 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ..config import CACHE_SCAN_SHARD_SIZE, CACHE_SCAN_IO_WORKERS, CACHE_SCAN_PROCESS_WORKERS
+from ..core.cache_key import normalize_cache_url, url_from_cache_key
+from ..core.simple_cache import parse_entry_key
+from ..core.url_matcher import UrlMatcher
+
+# I/O线程只读取文件开头的这部分数据（文件头 + key）
+HEAD_READ_SIZE = 8192
+# 小于该大小的文件直接跳过
+MIN_FILE_SIZE = 100
+
+# 子进程中缓存的匹配器，同一次扫描的所有分片共用
+_worker_matcher: Tuple[int, Optional[UrlMatcher], Dict[str, List[str]]] = (0, None, {})
+
+class ScanStats:
+    """一次扫描的统计信息"""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes_read = 0
+        self.matches = 0
+        self.started = time.time()
+        self.elapsed = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"扫描 {self.files} 个文件，读取 {self.bytes_read} 字节，匹配 {self.matches} 次，"
+                f"耗时 {self.elapsed:.2f} 秒 ({self.files_per_second:.0f} 文件/秒)")
+
+def read_heads(shard: List[Tuple[str, int]]) -> List[Tuple[str, bytes]]:
+    """在I/O线程中读取一个分片中每个文件的开头"""
+    heads = []
+    for path, _ in shard:
+        try:
+            with open(path, 'rb') as f:
+                heads.append((path, f.read(HEAD_READ_SIZE)))
+        except OSError:
+            continue
+    return heads
+
+def _get_worker_matcher(generation: int, urls: List[str]) -> Tuple[UrlMatcher, Dict[str, List[str]]]:
+    """获取子进程中的匹配器，扫描代数变化时重新构建"""
+    global _worker_matcher
+    if _worker_matcher[0] != generation or _worker_matcher[1] is None:
+        cache_urls: Dict[str, List[str]] = {}
+        for url in urls:
+            cache_urls.setdefault(normalize_cache_url(url), []).append(url)
+        _worker_matcher = (generation, UrlMatcher(urls), cache_urls)
+    return _worker_matcher[1], _worker_matcher[2]
+
+def match_shard(generation: int, urls: List[str], heads: List[Tuple[str, bytes]]) -> List[Tuple[str, str]]:
+    """在子进程中解析一个分片的条目头并匹配监视URL，返回(文件路径, URL)列表"""
+    matcher, cache_urls = _get_worker_matcher(generation, urls)
+    matches = []
+    for path, head in heads:
+        key = parse_entry_key(head)
+        if key is not None:
+            for url in cache_urls.get(url_from_cache_key(key), ()):
+                matches.append((path, url))
+            continue
+
+        # 不是Simple Cache条目（或key超出了读取范围），通过mmap在整个文件中查找
+        try:
+            found = matcher.search_file(path)
+        except (OSError, ValueError):
+            continue
+        for url in found:
+            matches.append((path, url))
+    return matches
+
+class ParallelCacheScanner:
+    """并行缓存扫描引擎
+
+    缓存目录按CACHE_SCAN_SHARD_SIZE个文件切成分片，线程池负责读取文件，
+    进程池负责解析条目头和匹配URL，匹配结果一边产生一边回调给调用方。
+    """
+
+    def __init__(self, shard_size: int = CACHE_SCAN_SHARD_SIZE,
+                 io_workers: int = CACHE_SCAN_IO_WORKERS,
+                 process_workers: int = CACHE_SCAN_PROCESS_WORKERS):
+        self.shard_size = shard_size
+        self.io_workers = io_workers
+        self.process_workers = process_workers
+        self.io_pool: Optional[ThreadPoolExecutor] = None
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        self.generation = 0
+        self.last_stats: Optional[ScanStats] = None
+
+    def iter_shards(self, directories: Iterable[str]) -> Iterator[List[Tuple[str, int]]]:
+        """遍历缓存目录，按分片产出(路径, 大小)"""
+        shard = []
+        pending = [d for d in directories if os.path.isdir(d)]
+        seen: Set[str] = set()
+        while pending:
+            directory = pending.pop()
+            if directory in seen:
+                continue
+            seen.add(directory)
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                            continue
+                        try:
+                            size = entry.stat().st_size
+                        except OSError:
+                            continue
+                        if size < MIN_FILE_SIZE:
+                            continue
+                        shard.append((entry.path, size))
+                        if len(shard) >= self.shard_size:
+                            yield shard
+                            shard = []
+            except OSError as e:
+                print(f"读取缓存目录失败: {directory}: {str(e)}")
+        if shard:
+            yield shard
+
+    def submit_match(self, urls: List[str], heads: List[Tuple[str, bytes]]) -> Future:
+        """把分片交给进程池，进程池不可用时退回到线程池"""
+        if self.process_pool is None and self.process_workers > 0:
+            try:
+                self.process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            except (OSError, NotImplementedError) as e:
+                print(f"无法创建解析进程池，改用线程池: {str(e)}")
+                self.process_workers = 0
+        if self.process_pool is not None:
+            try:
+                return self.process_pool.submit(match_shard, self.generation, urls, heads)
+            except RuntimeError as e:
+                print(f"解析进程池不可用，改用线程池: {str(e)}")
+                self.process_pool = None
+                self.process_workers = 0
+        return self.io_pool.submit(match_shard, self.generation, urls, heads)
+
+    def scan(self, directories: Iterable[str], urls: Iterable[str],
+             on_match: Callable[[str, str], None],
+             should_continue: Callable[[], bool] = lambda: True) -> ScanStats:
+        """扫描缓存目录，每找到一个匹配就调用on_match(文件路径, URL)"""
+        stats = ScanStats()
+        urls = list(urls)
+        self.generation += 1
+        if self.io_pool is None:
+            self.io_pool = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix='cache-scan-io')
+
+        # 限制同时在途的分片数量，避免把整个缓存读进内存
+        max_in_flight = self.io_workers + max(self.process_workers, 1) * 2
+        shards = self.iter_shards(directories)
+        exhausted = False
+        io_futures: Set[Future] = set()
+        match_futures: Set[Future] = set()
+
+        while True:
+            if not should_continue():
+                for future in io_futures | match_futures:
+                    future.cancel()
+                break
+
+            while not exhausted and len(io_futures) + len(match_futures) < max_in_flight:
+                shard = next(shards, None)
+                if shard is None:
+                    exhausted = True
+                    break
+                io_futures.add(self.io_pool.submit(read_heads, shard))
+
+            if not io_futures and not match_futures:
+                break
+
+            done, _ = wait(io_futures | match_futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in io_futures:
+                    io_futures.discard(future)
+                    heads = future.result()
+                    stats.files += len(heads)
+                    stats.bytes_read += sum(len(head) for _, head in heads)
+                    match_futures.add(self.submit_match(urls, heads))
+                else:
+                    match_futures.discard(future)
+                    try:
+                        matches = future.result()
+                    except Exception as e:
+                        print(f"解析缓存分片时出错: {str(e)}")
+                        continue
+                    for path, url in matches:
+                        stats.matches += 1
+                        on_match(path, url)
+
+        stats.elapsed = time.time() - stats.started
+        self.last_stats = stats
+        return stats
+
+    def close(self) -> None:
+        """关闭线程池和进程池"""
+        if self.io_pool is not None:
+            self.io_pool.shutdown(wait=False, cancel_futures=True)
+            self.io_pool = None
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+            self.process_pool = None
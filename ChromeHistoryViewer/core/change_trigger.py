@@ -0,0 +1,68 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from ..config import HISTORY_DEBOUNCE, HISTORY_SAFETY_POLL_INTERVAL
+
+class ChangeTrigger:
+    """决定什么时候重新查询：文件变化后等待一小段去抖时间，没有变化时只做低频的保底查询
+
+    去抖时间从第一次未处理的变化算起，持续写入也不会无限推迟查询；等待期间线程阻塞在事件上，
+    空闲时不会周期性唤醒。
+    """
+
+    def __init__(self, debounce: float = HISTORY_DEBOUNCE,
+                 safety_interval: float = HISTORY_SAFETY_POLL_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.debounce = debounce
+        self.safety_interval = safety_interval
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.changed_at: Optional[float] = None  # 第一次未处理的变化的时间
+        self.last_poll = clock()
+        self.stopped = False
+        self.counters = {'events': 0, 'change_polls': 0, 'safety_polls': 0}
+
+    def notify(self) -> None:
+        """记录一次文件变化（在文件监控线程中调用）"""
+        with self.lock:
+            self.counters['events'] += 1
+            if self.changed_at is None:
+                self.changed_at = self.clock()
+        self.wakeup.set()
+
+    def next_delay(self) -> float:
+        """距离下一次应当查询还有多少秒"""
+        now = self.clock()
+        with self.lock:
+            if self.changed_at is not None:
+                return max(self.changed_at + self.debounce - now, 0.0)
+            return max(self.last_poll + self.safety_interval - now, 0.0)
+
+    def wait(self) -> bool:
+        """阻塞到应当查询为止，返回False表示已经停止"""
+        while not self.stopped:
+            delay = self.next_delay()
+            if delay <= 0:
+                return True
+            self.wakeup.wait(delay)
+            self.wakeup.clear()
+        return False
+
+    def begin_poll(self) -> None:
+        """在查询开始前调用：清除已记录的变化，查询期间发生的变化会触发下一次查询"""
+        with self.lock:
+            self.counters['change_polls' if self.changed_at is not None else 'safety_polls'] += 1
+            self.changed_at = None
+            self.last_poll = self.clock()
+
+    def stop(self) -> None:
+        """唤醒并结束wait()"""
+        self.stopped = True
+        self.wakeup.set()
+
+    def stats(self) -> Dict[str, int]:
+        """统计：收到的变化事件数、因变化触发的查询数、保底查询数"""
+        with self.lock:
+            return dict(self.counters)
@@ -0,0 +1,89 @@
+import codecs
+import re
+from typing import Optional, Tuple
+
+from ..config import CHARSET_META_SCAN_SIZE, CHARSET_DETECT_SAMPLE_SIZE
+
+# 统计检测是可选依赖（requests自带charset_normalizer），都没有安装时未声明字符集的非utf-8页面按utf-8解码
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+try:
+    import chardet
+except ImportError:
+    chardet = None
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+# <meta charset="..."> 和 <meta http-equiv="Content-Type" content="text/html; charset=...">
+META_CHARSET_RE = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
+
+# 按HTML标准，这些声明实际按超集解码
+CHARSET_ALIASES = {
+    'iso8859-1': 'cp1252',
+    'ascii': 'cp1252',
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+    'euc_kr': 'cp949',
+}
+
+def normalize_charset(name: str) -> str:
+    """把字符集名称规范化为Python编解码器名称，无法识别时返回空字符串"""
+    try:
+        codec = codecs.lookup(name.strip().strip('"\'')).name
+    except (LookupError, ValueError):
+        return ''
+    return CHARSET_ALIASES.get(codec, codec)
+
+def bom_charset(data: bytes) -> Tuple[str, int]:
+    """根据BOM判断编码，返回(编码, BOM长度)，没有BOM时返回('', 0)"""
+    for bom, charset in BOMS:
+        if data.startswith(bom):
+            return charset, len(bom)
+    return '', 0
+
+def meta_charset(data: bytes) -> str:
+    """在正文开头查找<meta>中声明的字符集"""
+    match = META_CHARSET_RE.search(data[:CHARSET_META_SCAN_SIZE])
+    if not match:
+        return ''
+    charset = normalize_charset(match.group(1).decode('ascii', errors='ignore'))
+    # 能被ASCII方式的<meta>声明读到，说明实际不是utf-16
+    return 'utf-8' if charset.startswith('utf-16') else charset
+
+def detect_charset(data: bytes) -> str:
+    """对正文开头的一段样本做统计检测，只在没有任何声明时使用"""
+    sample = data[:CHARSET_DETECT_SAMPLE_SIZE]
+    try:
+        # 大多数页面是utf-8，先严格解码一次；样本末尾可能截断在多字节字符中间
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=len(sample) == len(data))
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    detected: Optional[str] = None
+    if charset_normalizer is not None:
+        best = charset_normalizer.from_bytes(sample).best()
+        detected = best.encoding if best else None
+    elif chardet is not None:
+        detected = chardet.detect(sample).get('encoding')
+    return normalize_charset(detected) if detected else ''
+
+def resolve_charset(data: bytes, declared: str = '') -> str:
+    """确定正文的字符集：BOM、响应头声明、<meta>声明，最后才做有限长度的统计检测，都失败时使用utf-8"""
+    charset, _ = bom_charset(data)
+    if not charset and declared:
+        charset = normalize_charset(declared)
+    return charset or meta_charset(data) or detect_charset(data) or 'utf-8'
+
+def decode_html(data: bytes, declared: str = '') -> str:
+    """按resolve_charset()确定的字符集解码HTML正文"""
+    charset, bom_length = bom_charset(data)
+    if not charset:
+        charset = resolve_charset(data, declared)
+    return data[bom_length:].decode(charset, errors='replace')
@@ -0,0 +1,129 @@
+import zlib
+from typing import Iterable, Iterator, List
+
+# brotli和zstd是可选依赖，没有安装时对应编码的缓存条目会退回到网络获取
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class UnsupportedEncodingError(Exception):
+    """无法解码的Content-Encoding"""
+
+class DeflateDecompressor:
+    """deflate解压器，兼容带zlib头和不带头(raw deflate)两种格式"""
+
+    def __init__(self):
+        self.decompressor = None
+        self.head = b''  # 判断格式之前收到的数据，前一级解压器可能先送来空的或很短的块
+
+    def decompress(self, chunk: bytes) -> bytes:
+        if self.decompressor is None:
+            self.head += chunk
+            if len(self.head) < 2:
+                return b''
+            chunk, self.head = self.head, b''
+            self.start(chunk)
+        return self.decompressor.decompress(chunk)
+
+    def start(self, head: bytes) -> None:
+        # 根据前两个字节判断是否带zlib头(CMF低4位为8且CMF*256+FLG是31的倍数)
+        has_header = len(head) >= 2 and head[0] & 0x0f == 8 and (head[0] << 8 | head[1]) % 31 == 0
+        wbits = zlib.MAX_WBITS if has_header else -zlib.MAX_WBITS
+        self.decompressor = zlib.decompressobj(wbits)
+
+    def flush(self) -> bytes:
+        if self.decompressor is None:
+            if not self.head:
+                return b''
+            # 整个正文不到两个字节，只能是不带头的格式
+            self.start(self.head)
+            data, self.head = self.decompressor.decompress(self.head), b''
+            return data + self.decompressor.flush()
+        return self.decompressor.flush()
+
+class BrotliDecompressor:
+    """brotli解压器"""
+
+    def __init__(self):
+        self.decompressor = brotli.Decompressor()
+
+    def decompress(self, chunk: bytes) -> bytes:
+        if hasattr(self.decompressor, 'process'):
+            return self.decompressor.process(chunk)
+        return self.decompressor.decompress(chunk)
+
+    def flush(self) -> bytes:
+        return b''
+
+class ZstdDecompressor:
+    """zstd解压器"""
+
+    def __init__(self):
+        self.decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, chunk: bytes) -> bytes:
+        return self.decompressor.decompress(chunk)
+
+    def flush(self) -> bytes:
+        return b''
+
+def parse_content_encoding(value: str) -> List[str]:
+    """解析Content-Encoding，返回按应用顺序排列的编码列表（去掉identity）"""
+    return [
+        coding.strip().lower() for coding in value.split(',')
+        if coding.strip() and coding.strip().lower() != 'identity'
+    ]
+
+def create_decompressor(coding: str):
+    """根据编码名创建流式解压器"""
+    if coding in ('gzip', 'x-gzip'):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if coding == 'deflate':
+        return DeflateDecompressor()
+    if coding == 'br':
+        if brotli is None:
+            raise UnsupportedEncodingError("未安装brotli，无法解码br")
+        return BrotliDecompressor()
+    if coding == 'zstd':
+        if zstandard is None:
+            raise UnsupportedEncodingError("未安装zstandard，无法解码zstd")
+        return ZstdDecompressor()
+    raise UnsupportedEncodingError(f"不支持的Content-Encoding: {coding}")
+
+def is_supported(content_encoding: str) -> bool:
+    """检查Content-Encoding是否可以解码"""
+    try:
+        for coding in parse_content_encoding(content_encoding):
+            create_decompressor(coding)
+        return True
+    except UnsupportedEncodingError:
+        return False
+
+def decode_stream(chunks: Iterable[bytes], content_encoding: str) -> Iterator[bytes]:
+    """流式解码响应正文，多个编码按相反顺序依次解开"""
+    codings = parse_content_encoding(content_encoding)
+    decompressors = [create_decompressor(coding) for coding in reversed(codings)]
+
+    for chunk in chunks:
+        for decompressor in decompressors:
+            chunk = decompressor.decompress(chunk)
+        if chunk:
+            yield chunk
+
+    # 依次冲刷各级解压器，前一级剩余的数据还要交给后面几级
+    for index, decompressor in enumerate(decompressors):
+        tail = decompressor.flush()
+        for next_decompressor in decompressors[index + 1:]:
+            tail = next_decompressor.decompress(tail)
+        if tail:
+            yield tail
+
+def decode_body(chunks: Iterable[bytes], content_encoding: str) -> bytes:
+    """解码完整的响应正文"""
+    return b''.join(decode_stream(chunks, content_encoding))
@@ -0,0 +1,168 @@
+import os
+import time
+import sqlite3
+import ipaddress
+import threading
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from ..config import CHROME_COOKIES, TEMP_DIR
+from ..core.utils import copy_file_safe
+
+# 每个cookie在内存中保存为 (name, value, path, is_secure, expires_utc)
+Cookie = Tuple[str, str, str, bool, int]
+
+# Chrome时间戳（1601年起的微秒数）与Unix时间戳之间相差的秒数
+CHROME_EPOCH_OFFSET = 11644473600
+
+def chrome_now() -> int:
+    """当前时间的Chrome时间戳"""
+    return int((time.time() + CHROME_EPOCH_OFFSET) * 1000000)
+
+def is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip('[]'))
+        return True
+    except ValueError:
+        return False
+
+def path_matches(request_path: str, cookie_path: str) -> bool:
+    """RFC 6265 5.1.4 路径匹配"""
+    if request_path == cookie_path:
+        return True
+    if not request_path.startswith(cookie_path):
+        return False
+    return cookie_path.endswith('/') or request_path[len(cookie_path)] == '/'
+
+class CookieStore:
+    """Chrome Cookie数据库的内存快照
+
+    第一次使用时把Cookies数据库复制出来读入内存，按去掉前导点的host_key建立后缀索引；之后只有
+    源文件的修改时间或大小变化时才重新加载，所有获取页面的路径共用同一个快照。
+    查询时把请求主机名按标签从右往左逐级取后缀查索引，只访问可能匹配的域名，再按
+    RFC 6265检查host-only、路径、secure和过期时间。
+    """
+
+    def __init__(self, cookies_path: str = CHROME_COOKIES):
+        self.cookies_path = cookies_path
+        self.lock = threading.Lock()
+        # 域名(不含前导点) -> [(是否host-only, cookie)]
+        self.domains: Dict[str, List[Tuple[bool, Cookie]]] = {}
+        self.snapshot: Optional[Tuple[Tuple[int, int], ...]] = None
+        self.loads = 0
+        self.lookups = 0
+
+    def source_snapshot(self) -> Optional[Tuple[Tuple[int, int], ...]]:
+        """数据库文件及其日志文件的(修改时间, 大小)，数据库不存在时返回None"""
+        snapshot = []
+        for suffix in ('', '-journal', '-wal'):
+            try:
+                stat = os.stat(self.cookies_path + suffix)
+            except OSError:
+                if not suffix:
+                    return None
+                stat = None
+            snapshot.append((stat.st_mtime_ns, stat.st_size) if stat else (0, 0))
+        return tuple(snapshot)
+
+    def load(self) -> Dict[str, List[Tuple[bool, Cookie]]]:
+        """复制Cookies数据库并读取所有cookie，按域名建立索引"""
+        temp_cookies = os.path.join(TEMP_DIR, 'cookie_store_snapshot')
+        domains: Dict[str, List[Tuple[bool, Cookie]]] = {}
+        if not copy_file_safe(self.cookies_path, temp_cookies):
+            print(f"无法复制Cookie文件: {self.cookies_path}")
+            return domains
+
+        conn = None
+        try:
+            conn = sqlite3.connect(temp_cookies)
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(cookies)')}
+            # 旧版本Chrome的列名是secure，新版本是is_secure
+            secure_column = 'is_secure' if 'is_secure' in columns else 'secure'
+            cursor = conn.execute(f'''
+                SELECT host_key, name, value, path, {secure_column}, expires_utc
+                FROM cookies
+            ''')
+            for host_key, name, value, path, is_secure, expires_utc in cursor:
+                # 以点开头的是域cookie，可以发给子域名；否则只发给完全相同的主机
+                host_only = not host_key.startswith('.')
+                domain = host_key.lstrip('.').lower()
+                domains.setdefault(domain, []).append(
+                    (host_only, (name, value or '', path or '/', bool(is_secure), expires_utc or 0))
+                )
+        finally:
+            if conn is not None:
+                conn.close()
+            if os.path.exists(temp_cookies):
+                os.remove(temp_cookies)
+        return domains
+
+    def refresh(self) -> bool:
+        """源文件变化时重新加载，返回是否重新加载了"""
+        snapshot = self.source_snapshot()
+        with self.lock:
+            if snapshot is not None and snapshot == self.snapshot:
+                return False
+            if snapshot is None:
+                self.domains = {}
+            else:
+                try:
+                    self.domains = self.load()
+                except Exception as e:
+                    print(f"读取cookies时出错: {str(e)}")
+                    return False
+                self.loads += 1
+                print(f"已加载Cookie快照: {sum(len(c) for c in self.domains.values())} 个cookies，"
+                      f"{len(self.domains)} 个域名 (第{self.loads}次加载)")
+            self.snapshot = snapshot
+            return True
+
+    def get_cookies(self, url: str) -> Dict[str, str]:
+        """获取请求URL时浏览器会发送的cookies"""
+        self.refresh()
+        with self.lock:
+            self.lookups += 1
+            domains = self.domains
+
+        parts = urlsplit(url)
+        host = (parts.hostname or '').rstrip('.').lower()
+        if not host:
+            return {}
+        request_path = parts.path or '/'
+        secure = parts.scheme in ('https', 'wss')
+        now = chrome_now()
+
+        # IP地址没有父域名，只查完整主机名
+        labels = [host] if is_ip_address(host) else host.split('.')
+        matched: List[Cookie] = []
+        for i in range(len(labels)):
+            for host_only, cookie in domains.get('.'.join(labels[i:]), ()):
+                if host_only and i > 0:
+                    continue
+                _, _, cookie_path, is_secure, expires_utc = cookie
+                if is_secure and not secure:
+                    continue
+                if expires_utc and expires_utc <= now:
+                    continue
+                if path_matches(request_path, cookie_path):
+                    matched.append(cookie)
+
+        # 同名cookie以路径更具体的为准
+        matched.sort(key=lambda cookie: len(cookie[2]))
+        return {name: value for name, value, _, _, _ in matched}
+
+    def stats(self) -> Dict[str, int]:
+        """快照统计：加载次数、查询次数、域名数"""
+        with self.lock:
+            return {'loads': self.loads, 'lookups': self.lookups, 'domains': len(self.domains)}
+
+_shared_store: Optional[CookieStore] = None
+_shared_lock = threading.Lock()
+
+def get_cookie_store() -> CookieStore:
+    """获取进程内共享的Cookie快照"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = CookieStore()
+        return _shared_store
@@ -0,0 +1,69 @@
+import os
+from typing import List, Tuple
+from PySide6.QtCore import QThread, Signal
+
+from ..config import CHROME_HISTORY, TEMP_DIR, HISTORY_PAGE_SIZE
+from ..core.utils import check_chrome_access
+from ..core.history_reader import HistoryReader
+
+class HistoryLoader(QThread):
+    """在后台线程中检查访问权限并分页读取全部历史记录，界面线程不再等待数据库
+
+    启动后用一条按访问时间排序的查询读取最新的limit条记录，每取出page_size条通过page_loaded信号送回，
+    所以转换不依赖视图滚动到了哪里。urls表的last_visit_time上没有索引，按页查询时每一页都要扫描并排序整个表，
+    所以只查询一次，从同一个游标中分批取出。每次加载使用单独的HistoryReader，取消时可以中止正在执行的查询，
+    不影响监控线程共用的读取器。信号中带有加载编号，界面据此忽略已取消的加载送回的结果。
+    """
+    page_loaded = Signal(int, list)  # 加载编号, [(标题, URL, 最后访问时间, 访问次数)]
+    access_denied = Signal(int, str)  # 加载编号, 错误信息
+    load_failed = Signal(int, str)  # 加载编号, 错误信息
+
+    def __init__(self, load_id: int, limit: int, history_path: str = CHROME_HISTORY,
+                 page_size: int = HISTORY_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.load_id = load_id
+        self.is_running = False
+        self.reader = HistoryReader(history_path,
+                                    snapshot_path=os.path.join(TEMP_DIR, f'history_snapshot_load{load_id}'))
+        self.limit = limit
+        self.page_size = page_size
+        self.cancelled = False
+
+    def run(self) -> None:
+        """检查访问权限，之后分批送回最新的limit条记录"""
+        try:
+            self.is_running = True
+            can_access, message = check_chrome_access(self.reader)
+            if self.cancelled:
+                return
+            if not can_access:
+                self.access_denied.emit(self.load_id, message)
+                return
+
+            self.reader.query_pages('''
+                SELECT title, url, last_visit_time, visit_count
+                FROM urls
+                ORDER BY last_visit_time DESC, id DESC
+                LIMIT ?
+            ''', (self.limit,), self.page_size, self.emit_page)
+
+        except Exception as e:
+            # 取消时被中止的查询也会抛出异常，不需要报告
+            if not self.cancelled:
+                print(f"加载历史记录线程出错: {str(e)}")
+                self.load_failed.emit(self.load_id, str(e))
+        finally:
+            self.reader.close()
+            self.is_running = False
+
+    def emit_page(self, records: List[Tuple[str, str, int, int]]) -> bool:
+        """送回一批记录，返回是否继续读取"""
+        if self.cancelled:
+            return False
+        self.page_loaded.emit(self.load_id, records)
+        return True
+
+    def stop(self) -> None:
+        """取消加载：中止正在执行的查询并让线程尽快结束，不等待线程退出"""
+        self.cancelled = True
+        self.reader.interrupt()
@@ -1,81 +1,106 @@
 import os
-import sqlite3
-import shutil
-from typing import List, Set, Tuple, Optional
+from typing import Callable, List, Set, Tuple
 from PySide6.QtCore import QThread, Signal
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
 import time
 import logging
 
-from ..config import CHROME_HISTORY, TEMP_DIR
-from ..core.utils import chrome_timestamp_to_datetime, copy_file_safe
+from ..core.utils import chrome_timestamp_to_datetime
+from ..core.history_reader import get_history_reader
+from ..core.visit_poller import VisitPoller
+from ..core.change_trigger import ChangeTrigger
+from ..core.url_store import get_url_store
+
+class HistoryFileHandler(FileSystemEventHandler):
+    """只关心History数据库及其日志文件的写入，配置目录中其他文件的变化忽略"""
+    def __init__(self, history_path: str, callback: Callable[[], None]):
+        # 文件系统事件中的路径可能是解析过符号链接的真实路径
+        paths = {history_path, os.path.realpath(history_path)}
+        self.watched = {path + suffix for path in paths for suffix in ('', '-journal', '-wal')}
+        self.callback = callback
+        
+    def on_created(self, event):
+        if not event.is_directory and event.src_path in self.watched:
+            self.callback()
+            
+    def on_modified(self, event):
+        if not event.is_directory and event.src_path in self.watched:
+            self.callback()
+            
+    def on_moved(self, event):
+        if not event.is_directory and event.dest_path in self.watched:
+            self.callback()
 
 class HistoryMonitor(QThread):
-    """监控Chrome历史记录更新的线程"""
+    """监控Chrome历史记录更新的线程
+
+    History及其日志文件有写入时，经过短暂去抖后查询新访问；没有变化时只做低频的保底查询。
+    无法监控文件变化时退回到按check_interval定期查询。
+    """
     new_records = Signal(list)  # 发送新记录的信号
     
     def __init__(self, check_interval: int = 5):
         super().__init__()
-        self.check_interval = check_interval  # 检查间隔（秒）
-        self.last_check_time: Optional[int] = None
+        self.check_interval = check_interval  # 无法监控文件变化时的检查间隔（秒）
         self.is_running = False
-        self.processed_urls: Set[str] = set()  # 记录已处理的URL
+        self.url_store = get_url_store()  # 已处理的URL，与界面和下载线程共用
+        self.reader = get_history_reader()
+        self.poller = VisitPoller(self.reader)
+        self.trigger = ChangeTrigger()
+        self.observer = None
         
     def get_new_records(self) -> List[Tuple[str, str, int, int]]:
         """获取新的历史记录"""
-        temp_history = os.path.join(TEMP_DIR, 'temp_history_monitor')
-        
         try:
-            # 复制历史记录文件
-            if not copy_file_safe(CHROME_HISTORY, temp_history):
-                return []
-            
-            # 连接数据库
-            conn = sqlite3.connect(temp_history)
-            cursor = conn.cursor()
-            
-            # 获取上次检查时间之后的新记录
-            if self.last_check_time is None:
-                # 首次运行，获取最近的时间作为起点
-                cursor.execute('SELECT MAX(last_visit_time) FROM urls')
-                max_time = cursor.fetchone()[0]
-                if max_time:
-                    self.last_check_time = max_time - 1  # 减1以确保不会漏掉记录
-                return []
-            
-            # 查询新记录，排除已处理的URL
-            cursor.execute('''
-                SELECT title, url, last_visit_time, visit_count 
-                FROM urls 
-                WHERE last_visit_time > ?
-                ORDER BY last_visit_time DESC
-            ''', (self.last_check_time,))
-            
+            # 读取上次水位之后的新访问，排除已处理的URL和这一批中重复的URL
             new_records = []
-            for record in cursor.fetchall():
-                if record[1] not in self.processed_urls:  # 检查URL是否已处理
+            seen: Set[str] = set()
+            for record in self.poller.poll():
+                if record[1] not in seen and record[1] not in self.url_store:  # 检查URL是否已处理
                     new_records.append(record)
-                    self.processed_urls.add(record[1])
-            
-            # 更新最后检查时间
-            if new_records:
-                self.last_check_time = max(record[2] for record in new_records)
+                    seen.add(record[1])
             
+            # 保存的水位只越过URL已经保存的访问，还没转换的访问重启后会重新读取
+            self.poller.commit(lambda url: url in self.url_store)
             return new_records
             
         except Exception as e:
             print(f"监控历史记录时出错: {str(e)}")
             return []
         finally:
-            if 'conn' in locals():
-                conn.close()
-            if os.path.exists(temp_history):
-                os.remove(temp_history)
+            copied = self.reader.stats()['last_bytes_copied']
+            if copied:
+                print(f"历史记录被锁定，本次复制了 {copied} 字节的快照")
+
+    def start_watching(self) -> bool:
+        """监控History所在目录，返回是否成功"""
+        history_dir = os.path.dirname(self.reader.history_path)
+        if not os.path.isdir(history_dir):
+            return False
+        try:
+            self.observer = Observer()
+            self.observer.schedule(HistoryFileHandler(self.reader.history_path, self.trigger.notify),
+                                   history_dir, recursive=False)
+            self.observer.start()
+        except Exception as e:
+            print(f"无法监控历史记录文件变化，改为每{self.check_interval}秒检查一次: {str(e)}")
+            self.observer = None
+            return False
+        print(f"开始监控历史记录文件: {self.reader.history_path}")
+        return True
 
     def run(self) -> None:
         """运行监控线程"""
         try:
             self.is_running = True
+            if not self.start_watching():
+                # 无法监控文件变化，按固定间隔查询
+                self.trigger.safety_interval = self.check_interval
+            
+            # 启动时查询一次，之后等待文件变化或保底查询
             while self.is_running:
+                self.trigger.begin_poll()
                 try:
                     new_records = self.get_new_records()
                     if new_records:
@@ -85,20 +110,23 @@ class HistoryMonitor(QThread):
                     self.msleep(1000)  # 出错时等待1秒再重试
                     continue
                 
-                # 等待下次检查，但每秒检查是否需要停止
-                for _ in range(self.check_interval):
-                    if not self.is_running:
-                        break
-                    self.msleep(1000)
+                if not self.trigger.wait():
+                    break
                     
         except Exception as e:
             print(f"历史记录监控线程出错: {str(e)}")
         finally:
+            if self.observer:
+                self.observer.stop()
+                self.observer.join()
             self.is_running = False
+            print(f"历史记录变化统计: {self.trigger.stats()}")
+            print(f"历史记录读取统计: {self.reader.stats()}")
     
     def stop(self) -> None:
         """停止监控线程"""
         self.is_running = False
+        self.trigger.stop()
         self.wait(1000)  # 最多等待1秒
         if self.isRunning():
             self.terminate()  # 强制终止
@@ -106,35 +134,19 @@ class HistoryMonitor(QThread):
 
     def get_history_records(self, limit: int = 100) -> List[Tuple[str, str, str, int]]:
         """获取历史记录"""
-        temp_history = os.path.join(TEMP_DIR, 'temp_history')
         records = []
         
         try:
-            # 尝试复制历史记录文件
-            try:
-                shutil.copy2(CHROME_HISTORY, temp_history)
-            except (IOError, PermissionError):
-                # 如果直接复制失败，尝试使用sqlite3复制
-                conn = sqlite3.connect(CHROME_HISTORY)
-                backup_conn = sqlite3.connect(temp_history)
-                conn.backup(backup_conn)
-                conn.close()
-                backup_conn.close()
-            
-            # 连接数据库
-            conn = sqlite3.connect(temp_history)
-            cursor = conn.cursor()
-            
             # 查询历史记录
-            cursor.execute(f'''
+            rows = self.reader.query('''
                 SELECT title, url, last_visit_time, visit_count 
                 FROM urls 
                 ORDER BY last_visit_time DESC 
-                LIMIT {limit}
-            ''')
+                LIMIT ?
+            ''', (limit,))
             
             # 处理结果
-            for record in cursor.fetchall():
+            for record in rows:
                 title = record[0] or 'No Title'
                 url = record[1]
                 visit_time = chrome_timestamp_to_datetime(record[2])
@@ -146,13 +158,5 @@ class HistoryMonitor(QThread):
         except Exception as e:
             logging.error(f"读取历史记录失败: {str(e)}")
             raise
-        finally:
-            if 'conn' in locals():
-                conn.close()
-            if os.path.exists(temp_history):
-                try:
-                    os.remove(temp_history)
-                except:
-                    pass
                 
         return records 
\ No newline at end of file
@@ -0,0 +1,211 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+from ..config import (
+    CHROME_HISTORY, TEMP_DIR, HISTORY_BUSY_TIMEOUT, HISTORY_LOCK_RECHECK_INTERVAL
+)
+from ..core.utils import copy_file_safe
+
+# 有效的回滚日志以这8个字节开头
+JOURNAL_MAGIC = bytes([0xd9, 0xd5, 0x05, 0xf9, 0x20, 0xa1, 0x63, 0xd7])
+
+def is_locked_error(error: sqlite3.Error) -> bool:
+    """Chrome运行时以独占方式打开History，其他连接读取时会报database is locked"""
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+def is_interrupted_error(error: sqlite3.Error) -> bool:
+    """查询被interrupt()中止"""
+    return 'interrupted' in str(error).lower()
+
+class HistoryReader:
+    """直接在原位置只读访问Chrome的History数据库，不再每次复制整个文件
+
+    优先使用长期保持的mode=ro连接；数据库被Chrome锁住时，没有未合并的写入就以immutable=1方式打开（不加锁），
+    每次查询重新打开以免读到旧的页缓存；WAL中有数据（immutable读不到）、回滚日志有效（正在提交）
+    或immutable读取失败时，才复制一份快照查询。
+    发现被锁住后记住这个状态，lock_recheck_interval秒内的查询直接走不加锁的方式，不再每次等待busy_timeout。
+    """
+
+    def __init__(self, history_path: str = CHROME_HISTORY, busy_timeout: float = HISTORY_BUSY_TIMEOUT,
+                 snapshot_path: Optional[str] = None,
+                 lock_recheck_interval: float = HISTORY_LOCK_RECHECK_INTERVAL):
+        self.history_path = history_path
+        self.busy_timeout = busy_timeout
+        self.lock_recheck_interval = lock_recheck_interval
+        self.locked_until = 0.0  # 在这个时间(time.monotonic)之前认为数据库仍被锁住
+        self.snapshot_path = snapshot_path or os.path.join(TEMP_DIR, 'history_snapshot')
+        self.lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+        self.active: Optional[sqlite3.Connection] = None  # 正在执行查询的连接
+        self.counters = {'queries': 0, 'live': 0, 'locked': 0, 'immutable': 0, 'snapshots': 0,
+                         'bytes_copied': 0, 'last_bytes_copied': 0}
+
+    def uri(self, immutable: bool = False) -> str:
+        uri = f"file:{quote(os.path.abspath(self.history_path))}?mode=ro"
+        return uri + '&immutable=1' if immutable else uri
+
+    def has_pending_writes(self) -> bool:
+        """WAL文件中有还没合并进主文件的数据，或者回滚日志有效（事务正在提交，主文件可能只写了一半）"""
+        try:
+            if os.path.getsize(self.history_path + '-wal') > 0:
+                return True
+        except OSError:
+            pass
+        # 独占锁模式下提交后日志文件不会删除，只把文件头清零，所以要看文件头而不是文件大小
+        try:
+            with open(self.history_path + '-journal', 'rb') as f:
+                return f.read(len(JOURNAL_MAGIC)) == JOURNAL_MAGIC
+        except OSError:
+            return False
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        """执行一条只读查询并返回所有结果"""
+        return self.run(sql, params, lambda cursor: cursor.fetchall())
+
+    def query_pages(self, sql: str, params: Sequence[Any], page_size: int,
+                    on_page: Callable[[List[tuple]], bool]) -> int:
+        """执行一条只读查询，每取出page_size条结果调用一次on_page（没有结果时以空列表调用一次），
+        on_page返回False时停止，返回取出的总条数
+
+        整个结果只查询和排序一次，适合一次读取大量记录；读取期间一直占用这个读取器。
+        """
+        def fetch_pages(cursor: sqlite3.Cursor) -> int:
+            total = 0
+            while True:
+                rows = cursor.fetchmany(page_size)
+                if not rows and total:
+                    return total
+                total += len(rows)
+                if not on_page(rows) or len(rows) < page_size:
+                    return total
+
+        return self.run(sql, params, fetch_pages)
+
+    def run(self, sql: str, params: Sequence[Any], fetch: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """选择读取方式执行查询，fetch从游标中取出结果"""
+        with self.lock:
+            self.counters['queries'] += 1
+            self.counters['last_bytes_copied'] = 0
+            if time.monotonic() >= self.locked_until:
+                try:
+                    result = self.query_live(sql, params, fetch)
+                    self.counters['live'] += 1
+                    self.locked_until = 0.0
+                    return result
+                except sqlite3.OperationalError as e:
+                    if not is_locked_error(e):
+                        raise
+                    self.counters['locked'] += 1
+                    self.locked_until = time.monotonic() + self.lock_recheck_interval
+
+            if not self.has_pending_writes():
+                try:
+                    result = self.query_immutable(sql, params, fetch)
+                    self.counters['immutable'] += 1
+                    return result
+                except sqlite3.DatabaseError as e:
+                    if is_interrupted_error(e):
+                        raise
+                    # Chrome正在写入时可能读到不完整的页
+                    print(f"以immutable方式读取历史记录失败，改用快照: {str(e)}")
+
+            return self.query_snapshot(sql, params, fetch)
+
+    def query_live(self, sql: str, params: Sequence[Any], fetch: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """用长期保持的只读连接查询，被锁住时保留连接，其他错误时关闭，下次重新打开"""
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.uri(), uri=True, timeout=self.busy_timeout, check_same_thread=False)
+        try:
+            return self.execute(self.conn, sql, params, fetch)
+        except sqlite3.Error as e:
+            if not (isinstance(e, sqlite3.OperationalError) and is_locked_error(e)):
+                self.close_connection()
+            raise
+
+    def query_immutable(self, sql: str, params: Sequence[Any], fetch: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """不加锁读取主文件"""
+        conn = sqlite3.connect(self.uri(immutable=True), uri=True)
+        try:
+            return self.execute(conn, sql, params, fetch)
+        finally:
+            conn.close()
+
+    def query_snapshot(self, sql: str, params: Sequence[Any], fetch: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """复制主文件和WAL文件（或回滚日志，打开快照时会回滚未完成的事务）后查询快照，记录复制的字节数"""
+        copied = 0
+        try:
+            for suffix in ('', '-wal', '-journal'):
+                source = self.history_path + suffix
+                if suffix and not os.path.exists(source):
+                    continue
+                if not copy_file_safe(source, self.snapshot_path + suffix):
+                    raise sqlite3.OperationalError(f"无法复制历史记录文件: {source}")
+                copied += os.path.getsize(self.snapshot_path + suffix)
+            self.counters['snapshots'] += 1
+            self.counters['bytes_copied'] += copied
+            self.counters['last_bytes_copied'] = copied
+
+            conn = sqlite3.connect(self.snapshot_path)
+            try:
+                return self.execute(conn, sql, params, fetch)
+            finally:
+                conn.close()
+        finally:
+            for suffix in ('', '-wal', '-shm', '-journal'):
+                if os.path.exists(self.snapshot_path + suffix):
+                    os.remove(self.snapshot_path + suffix)
+
+    def execute(self, conn: sqlite3.Connection, sql: str, params: Sequence[Any],
+                fetch: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """执行查询并取出结果，执行期间可以被interrupt()中止"""
+        self.active = conn
+        try:
+            return fetch(conn.execute(sql, params))
+        finally:
+            self.active = None
+
+    def interrupt(self) -> None:
+        """中止正在执行的查询（在其他线程中调用），被中止的查询抛出sqlite3.OperationalError"""
+        conn = self.active
+        if conn is not None:
+            try:
+                conn.interrupt()
+            except sqlite3.Error:
+                pass
+
+    def check_access(self) -> None:
+        """确认可以读取历史记录，失败时抛出异常"""
+        self.query('SELECT 1 FROM urls LIMIT 1')
+
+    def stats(self) -> Dict[str, int]:
+        """读取统计：查询次数、各方式读取的次数、发现被锁住的次数、复制的总字节数和上一次查询复制的字节数"""
+        with self.lock:
+            return dict(self.counters)
+
+    def close_connection(self) -> None:
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            finally:
+                self.conn = None
+
+    def close(self) -> None:
+        """关闭只读连接"""
+        with self.lock:
+            self.close_connection()
+
+_shared_reader: Optional[HistoryReader] = None
+_shared_lock = threading.Lock()
+
+def get_history_reader() -> HistoryReader:
+    """获取进程内共享的历史记录读取器，界面和监控线程共用同一个只读连接"""
+    global _shared_reader
+    with _shared_lock:
+        if _shared_reader is None:
+            _shared_reader = HistoryReader()
+        return _shared_reader
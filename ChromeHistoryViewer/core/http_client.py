@@ -0,0 +1,101 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import (
+    HTTP_POOL_HOSTS, HTTP_POOL_MAXSIZE_PER_HOST,
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+)
+
+class NoStoreCookiePolicy(DefaultCookiePolicy):
+    """不在会话中保存服务器设置的cookie，每次请求的cookies由调用方从Chrome快照中传入"""
+
+    def set_ok(self, cookie, request) -> bool:
+        return False
+
+class PoolStatsAdapter(HTTPAdapter):
+    """记录连接复用情况的适配器，按主机淘汰的连接池的计数也会保留下来"""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.retired_connections = 0
+        self.retired_requests = 0
+        pools = self.poolmanager.pools
+        dispose = pools.dispose_func
+
+        def retire(pool) -> None:
+            self.retired_connections += pool.num_connections
+            self.retired_requests += pool.num_requests
+            dispose(pool)
+
+        pools.dispose_func = retire
+
+    def pool_stats(self) -> Dict[str, int]:
+        """统计所有主机的新建连接数和请求数"""
+        pools = self.poolmanager.pools
+        # 直接读取容器，避免按key访问时改变LRU顺序
+        with pools.lock:
+            active = list(pools._container.values())
+        connections = self.retired_connections + sum(pool.num_connections for pool in active)
+        requests_made = self.retired_requests + sum(pool.num_requests for pool in active)
+        return {
+            'hosts': len(active),
+            'connections': connections,
+            'requests': requests_made,
+            'reused': max(requests_made - connections, 0),
+        }
+
+class HttpClient:
+    """共享的HTTP客户端
+
+    所有线程共用一个按主机划分的keep-alive连接池，同一主机的请求复用已经建立的TCP/TLS连接。
+    每个线程使用自己的Session（Session本身不是线程安全的），各Session挂载同一个适配器。
+    """
+
+    def __init__(self, pool_hosts: int = HTTP_POOL_HOSTS,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE_PER_HOST,
+                 timeout: Tuple[float, float] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)):
+        self.timeout = timeout
+        self.adapter = PoolStatsAdapter(pool_connections=pool_hosts, pool_maxsize=pool_maxsize)
+        self.local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        """当前线程的Session"""
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.cookies.set_policy(NoStoreCookiePolicy())
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            self.local.session = session
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """发送请求，没有指定timeout时使用配置的连接/读取超时"""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        """连接复用统计：reused是复用已有连接、省掉握手的请求数"""
+        return self.adapter.pool_stats()
+
+_shared_client: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+def get_http_client() -> HttpClient:
+    """获取进程内共享的HTTP客户端"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
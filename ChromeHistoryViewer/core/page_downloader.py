@@ -1,19 +1,22 @@
 import os
 import html2text
-import requests
 from typing import List, Tuple, Dict
 from PySide6.QtCore import QThread, Signal
 
-from ..config import DEFAULT_SAVE_DIR, BATCH_SIZE, DEFAULT_HEADERS
+from ..config import DEFAULT_SAVE_DIR, BATCH_SIZE
 from ..core.utils import get_safe_title, ensure_dir
+from ..core.async_fetcher import get_async_fetcher
+from ..core.retry_scheduler import RetryScheduler
+from ..core.url_store import get_url_store
 
 class WebPageDownloader(QThread):
     """网页下载和转换线程"""
     progress = Signal(int, str)  # 进度百分比, 状态信息
-    page_finished = Signal(int, bool, str)  # 行号, 是否成功, 消息
+    page_finished = Signal(int, bool, str)  # 表格行id, 是否成功, 消息
     finished = Signal(bool)  # 是否正常完成
     
-    def __init__(self, urls: List[Tuple[int, str, str]], save_dir: str = DEFAULT_SAVE_DIR, cache_monitor=None):
+    def __init__(self, urls: List[Tuple[int, str, str]], save_dir: str = DEFAULT_SAVE_DIR, cache_monitor=None,
+                 url_store=None):
         super().__init__()
         self.urls = urls
         self.save_dir = save_dir
@@ -21,7 +24,10 @@ class WebPageDownloader(QThread):
         self.configure_converter()
         self.is_running = False
         self.cache_monitor = cache_monitor
-        self.pending_urls: Dict[int, Tuple[str, str]] = {}  # row -> (title, url)
+        self.pending_urls: Dict[int, Tuple[str, str]] = {}  # 表格行id -> (title, url)
+        self.fetcher = get_async_fetcher()
+        self.retry_scheduler = RetryScheduler()
+        self.url_store = url_store if url_store is not None else get_url_store()  # 保存成功的URL记录在这里
         
         # 确保保存目录存在
         ensure_dir(self.save_dir)
@@ -38,15 +44,18 @@ class WebPageDownloader(QThread):
         
     def run(self) -> None:
         """运行下载线程"""
+        self.download_all()
+
+    def download_all(self) -> None:
+        """按批次等待缓存内容或直接请求，并保存为Markdown"""
         self.is_running = True
         total = len(self.urls)
         completed = 0
         
-        # 先扫描一遍缓存目录
+        # 先请求扫描一遍缓存，扫描在缓存监控的调度线程中进行
         if self.cache_monitor:
-            print("开始扫描现有缓存...")
-            self.cache_monitor.scan_existing_cache()
-            print("缓存扫描完成")
+            print("请求扫描现有缓存...")
+            self.cache_monitor.request_scan()
         
         # 按批次处理URL
         for i in range(0, len(self.urls), BATCH_SIZE):
@@ -67,6 +76,19 @@ class WebPageDownloader(QThread):
             print(f"等待缓存内容 (批次 {i//BATCH_SIZE + 1}/{(len(self.urls)-1)//BATCH_SIZE + 1})...")
             self.msleep(15000)  # 增加到15秒
             
+            # 没有从缓存获取到内容的URL并发直接请求，停止下载时取消未完成的请求
+            fetch_urls = [
+                url for row, title, url in batch
+                if row in self.pending_urls
+                and not os.path.exists(os.path.join(self.save_dir, f"{get_safe_title(title, url)}.md"))
+            ]
+            fetched = {}
+            if fetch_urls:
+                print(f"未从缓存获取到内容，并发直接请求 {len(fetch_urls)} 个URL")
+                fetched = self.fetcher.fetch_all(
+                    fetch_urls, should_continue=lambda: self.is_running, retries=self.retry_scheduler
+                )
+            
             # 处理这一批的URL
             for row, title, url in batch:
                 if not self.is_running:
@@ -78,29 +100,26 @@ class WebPageDownloader(QThread):
                     
                     # 如果文件已存在，跳过
                     if os.path.exists(file_path):
+                        self.mark_saved(url)
                         self.page_finished.emit(row, True, "已存在")
                         completed += 1
                         continue
                     
-                    # 如果还在待处理列表中，说明没有从缓存获取到内容，尝试直接获取
+                    # 如果还在待处理列表中，说明没有从缓存获取到内容，使用直接请求的结果
                     if row in self.pending_urls:
-                        print(f"未从缓存获取到内容，尝试直接请求: {url}")
-                        try:
-                            # 直接发起HTTP请求获取内容
-                            response = requests.get(url, headers=DEFAULT_HEADERS, timeout=15)
-                            response.raise_for_status()
-                            response.encoding = response.apparent_encoding
-                            
-                            if len(response.text) > 1000:  # 确保内容足够长
-                                print(f"成功直接获取内容，长度: {len(response.text)}")
-                                self.save_as_markdown(row, title, url, response.text, "直接请求")
+                        result = fetched.get(url)
+                        if result is not None and result.ok:
+                            if len(result.text) > 1000:  # 确保内容足够长
+                                print(f"成功直接获取内容，长度: {len(result.text)}")
+                                source = "直接请求(未修改)" if result.not_modified else "直接请求"
+                                self.save_as_markdown(row, title, url, result.text, source)
                                 del self.pending_urls[row]
                                 completed += 1
                                 continue
                             else:
-                                print(f"获取的内容太短: {len(response.text)}")
-                        except Exception as e:
-                            print(f"直接请求失败: {str(e)}")
+                                print(f"获取的内容太短: {len(result.text)}")
+                        elif result is not None:
+                            print(f"直接请求失败: {result.status or result.error}")
                             
                         self.page_finished.emit(row, False, "未缓存且请求失败")
                         print(f"未找到缓存且直接请求失败: {url}")
@@ -123,6 +142,7 @@ class WebPageDownloader(QThread):
             self.progress.emit(int(completed * 100 / total), f"已完成: {completed}/{total}")
         
         self.is_running = False
+        print(f"直接请求统计: {self.fetcher.stats()}")
         self.finished.emit(True)
 
     def save_as_markdown(self, row: int, title: str, url: str, html_content: str, source: str) -> None:
@@ -137,6 +157,7 @@ class WebPageDownloader(QThread):
             # 保存文件
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(markdown_content)
+            self.mark_saved(url)
             
             self.page_finished.emit(row, True, f"完成({source})")
             print(f"已保存: {title} - {source}")
@@ -144,6 +165,10 @@ class WebPageDownloader(QThread):
         except Exception as e:
             raise Exception(f"保存Markdown失败: {str(e)}")
 
+    def mark_saved(self, url: str) -> None:
+        """保存成功（或文件已存在）后才记录为已处理，以后不再重复转换"""
+        self.url_store.add(url)
+
     def handle_cache_content(self, url: str, content: str) -> None:
         """处理从缓存获取的内容"""
         print(f"收到缓存内容: {url[:50]}...")
@@ -1,11 +1,12 @@
 import os
 import json
 import logging
-import requests
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
+from ..core.http_client import get_http_client
+
 class RAGFlowManager:
     """RAGFlow知识库管理器"""
     
@@ -16,6 +17,7 @@ class RAGFlowManager:
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json'
         }
+        self.http = get_http_client()  # 共享连接池，同一个RAGFlow服务的请求复用连接
         self.knowledge_base_id = None
         self.processed_files = set()  # 记录已处理的文件
         
@@ -56,7 +58,7 @@ class RAGFlowManager:
             
         try:
             # 创建知识库
-            response = requests.post(
+            response = self.http.post(
                 f"{self.api_url}/api/v1/knowledge-bases",
                 headers=self.headers,
                 json={'name': name}
@@ -65,7 +67,7 @@ class RAGFlowManager:
             self.knowledge_base_id = response.json()['id']
             
             # 配置知识库
-            config_response = requests.post(
+            config_response = self.http.post(
                 f"{self.api_url}/api/v1/knowledge-bases/{self.knowledge_base_id}/config",
                 headers=self.headers,
                 json={
@@ -95,7 +97,7 @@ class RAGFlowManager:
             # 上传文件
             with open(file_path, 'rb') as f:
                 files = {'file': (os.path.basename(file_path), f, 'text/markdown')}
-                response = requests.post(
+                response = self.http.post(
                     f"{self.api_url}/api/v1/knowledge-bases/{kb_id}/files",
                     headers={'Authorization': f'Bearer {self.api_key}'},
                     files=files
@@ -106,7 +108,7 @@ class RAGFlowManager:
             file_id = response.json()['id']
             
             # 开始解析
-            parse_response = requests.post(
+            parse_response = self.http.post(
                 f"{self.api_url}/api/v1/knowledge-bases/{kb_id}/files/{file_id}/parse",
                 headers=self.headers
             )
@@ -137,7 +139,7 @@ class RAGFlowManager:
         """检查文件处理状态"""
         try:
             kb_id = self.ensure_knowledge_base()
-            response = requests.get(
+            response = self.http.get(
                 f"{self.api_url}/api/v1/knowledge-bases/{kb_id}/files/{file_id}",
                 headers=self.headers
             )
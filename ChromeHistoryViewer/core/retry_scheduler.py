@@ -0,0 +1,126 @@
+import heapq
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..config import RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_AFTER_MAX
+
+# 服务器暂时不可用或要求稍后再试的状态码
+RETRYABLE_STATUS = {408, 429}
+# 页面已经不存在，重试没有意义
+TERMINAL_STATUS = {404, 410}
+
+def is_retryable(status: int, timed_out: bool = False) -> bool:
+    """判断一次失败的请求是否值得重试：超时、408/429和5xx可以重试，其他失败（包括404/410）不再重试"""
+    if timed_out:
+        return True
+    if status in TERMINAL_STATUS:
+        return False
+    return status in RETRYABLE_STATUS or 500 <= status < 600
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析Retry-After响应头（秒数或HTTP日期），返回需要等待的秒数"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+class RetryScheduler:
+    """失败请求的重试调度器
+
+    需要重试的URL按到期时间放进最小堆，由调用方定期取出到期的URL重新请求，等待期间不占用任何线程。
+    重试间隔按指数退避增长并加入随机抖动，避免一批失败的请求同时重试；服务器给出Retry-After时以它为准。
+    """
+
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS,
+                 base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.heap: List[Tuple[float, int, str]] = []
+        self.sequence = 0
+        self.due: Dict[str, float] = {}  # 当前排队中的URL -> 到期时间，堆中过期的记录会被跳过
+        self.attempts: Dict[str, int] = {}
+        self.counters = {'scheduled': 0, 'exhausted': 0}
+
+    def backoff(self, attempt: int) -> float:
+        """第attempt次重试前的等待时间：指数增长，取一半固定、一半随机"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def schedule(self, url: str, retry_after: Optional[float] = None) -> Optional[float]:
+        """安排一次重试，返回等待的秒数；重试次数用完时返回None"""
+        with self.lock:
+            attempt = self.attempts.get(url, 0) + 1
+            if attempt > self.max_attempts:
+                self.attempts.pop(url, None)
+                self.due.pop(url, None)
+                self.counters['exhausted'] += 1
+                return None
+            if retry_after is not None:
+                delay = min(retry_after, RETRY_AFTER_MAX)
+            else:
+                delay = self.backoff(attempt)
+            due = self.clock() + delay
+            self.attempts[url] = attempt
+            self.due[url] = due
+            self.sequence += 1
+            heapq.heappush(self.heap, (due, self.sequence, url))
+            self.counters['scheduled'] += 1
+            return delay
+
+    def pop_due(self) -> List[str]:
+        """取出所有已经到期的URL"""
+        now = self.clock()
+        ready = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                due, _, url = heapq.heappop(self.heap)
+                if self.due.get(url) == due:
+                    del self.due[url]
+                    ready.append(url)
+        return ready
+
+    def next_delay(self) -> Optional[float]:
+        """距离下一个到期的重试还有多少秒，没有排队的重试时返回None"""
+        with self.lock:
+            while self.heap and self.due.get(self.heap[0][2]) != self.heap[0][0]:
+                heapq.heappop(self.heap)
+            if not self.heap:
+                return None
+            return max(self.heap[0][0] - self.clock(), 0.0)
+
+    def forget(self, url: str) -> None:
+        """URL已经成功或不再需要，清除重试记录"""
+        with self.lock:
+            self.attempts.pop(url, None)
+            self.due.pop(url, None)
+
+    def attempt(self, url: str) -> int:
+        """URL已经安排过的重试次数"""
+        with self.lock:
+            return self.attempts.get(url, 0)
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.due)
+
+    def stats(self) -> Dict[str, int]:
+        """重试统计：安排的重试次数、用完重试次数的URL数、正在排队的URL数"""
+        with self.lock:
+            return dict(self.counters, pending=len(self.due))
@@ -0,0 +1,81 @@
+import threading
+import time
+from typing import Callable, Iterable, Set
+from PySide6.QtCore import QThread
+
+from ..config import SCAN_COALESCE_DELAY
+
+class ScanScheduler(QThread):
+    """缓存扫描调度线程
+
+    新加入的URL先进入待扫描集合，短暂等待把一批URL合并后启动一次定向查找，每次查找是一代(generation)。
+    扫描进行中加入的URL由正在运行的扫描通过absorb()接收，不会触发新的扫描。
+    """
+
+    def __init__(self, scan_func: Callable[[Set[str]], None], coalesce_delay: float = SCAN_COALESCE_DELAY):
+        super().__init__()
+        self.scan_func = scan_func
+        self.coalesce_delay = coalesce_delay
+        self.condition = threading.Condition()
+        self.pending: Set[str] = set()
+        self.is_running = False
+        self.scanning = False
+        self.generation = 0  # 最近一次开始的扫描代数
+        self.requests_received = 0
+        self.urls_absorbed = 0
+
+    def request(self, urls: Iterable[str]) -> None:
+        """请求扫描一批URL"""
+        with self.condition:
+            self.pending.update(urls)
+            self.requests_received += 1
+            self.condition.notify()
+
+    def absorb(self) -> Set[str]:
+        """正在运行的扫描调用，取走扫描期间新加入的URL"""
+        with self.condition:
+            urls, self.pending = self.pending, set()
+            self.urls_absorbed += len(urls)
+            return urls
+
+    def run(self) -> None:
+        """等待扫描请求并逐代执行"""
+        self.is_running = True
+        try:
+            while self.is_running:
+                with self.condition:
+                    while self.is_running and not self.pending:
+                        self.condition.wait(1.0)
+                    if not self.is_running:
+                        break
+
+                # 等待一小段时间，把一批连续加入的URL合并成一次扫描
+                time.sleep(self.coalesce_delay)
+
+                with self.condition:
+                    urls, self.pending = self.pending, set()
+                    self.generation += 1
+                    generation = self.generation
+                    self.scanning = True
+
+                print(f"开始第 {generation} 代缓存扫描，共 {len(urls)} 个URL "
+                      f"(累计请求 {self.requests_received} 次，扫描中吸收 {self.urls_absorbed} 个URL)")
+                try:
+                    self.scan_func(urls)
+                except Exception as e:
+                    print(f"第 {generation} 代缓存扫描出错: {str(e)}")
+                finally:
+                    with self.condition:
+                        self.scanning = False
+        finally:
+            self.is_running = False
+
+    def stop(self) -> None:
+        """停止调度线程"""
+        with self.condition:
+            self.is_running = False
+            self.condition.notify()
+        self.wait(1000)  # 最多等待1秒
+        if self.isRunning():
+            self.terminate()  # 强制终止
+            self.wait()
@@ -0,0 +1,147 @@
+import os
+import struct
+from typing import Iterator, List, Optional
+
+from ..core.cache_key import build_cache_keys, entry_file_name
+from ..core.cache_entry import BODY_CHUNK_SIZE, CacheEntry
+
+# Simple Cache条目文件(<hash>_0)的布局:
+#   SimpleFileHeader | key | stream 1(正文) | EOF(stream 1) | stream 0(HTTP响应头) | [key的SHA-256] | EOF(stream 0)
+SIMPLE_INITIAL_MAGIC = 0xfcfb6d1ba7725c30
+SIMPLE_FINAL_MAGIC = 0xf4fa6f45970d41d8
+
+# magic, version, key_length, key_hash + 4字节对齐填充
+HEADER_STRUCT = struct.Struct('<QIII4x')
+# final_magic, flags, data_crc32, stream_size + 4字节对齐填充
+EOF_STRUCT = struct.Struct('<QIII4x')
+
+FLAG_HAS_CRC32 = 1
+FLAG_HAS_KEY_SHA256 = 2
+KEY_SHA256_SIZE = 32
+
+class SimpleCacheEntry(CacheEntry):
+    """Simple Cache条目，只记录key和各个stream的偏移，按需读取内容"""
+
+    def __init__(self, path: str, key: str, version: int, file_size: int,
+                 stream0_offset: int, stream0_size: int,
+                 stream1_offset: int, stream1_size: int):
+        super().__init__()
+        self.path = path
+        self.key = key
+        self.version = version
+        self.file_size = file_size
+        self.stream0_offset = stream0_offset
+        self.stream0_size = stream0_size
+        self.stream1_offset = stream1_offset
+        self.stream1_size = stream1_size
+
+    def read_stream(self, offset: int, size: int) -> bytes:
+        """读取文件中的一段数据"""
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return f.read(size)
+
+    def read_stream0(self) -> bytes:
+        """读取stream 0（序列化的HTTP响应头）"""
+        return self.read_stream(self.stream0_offset, self.stream0_size)
+
+    def read_body(self) -> bytes:
+        """读取stream 1（响应正文）"""
+        return self.read_stream(self.stream1_offset, self.stream1_size)
+
+    def iter_body(self, chunk_size: int = BODY_CHUNK_SIZE) -> Iterator[bytes]:
+        """分块读取stream 1，不需要一次把正文读进内存"""
+        with open(self.path, 'rb') as f:
+            f.seek(self.stream1_offset)
+            remaining = self.stream1_size
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+def parse_entry_key(head: bytes) -> Optional[str]:
+    """从条目文件开头的数据中取出缓存key，不是条目或key不完整时返回None"""
+    if len(head) < HEADER_STRUCT.size:
+        return None
+    magic, _, key_length, _ = HEADER_STRUCT.unpack_from(head)
+    if magic != SIMPLE_INITIAL_MAGIC or HEADER_STRUCT.size + key_length > len(head):
+        return None
+    return head[HEADER_STRUCT.size:HEADER_STRUCT.size + key_length].decode('utf-8', errors='replace')
+
+def parse_entry_file(path: str) -> Optional[SimpleCacheEntry]:
+    """解析Simple Cache条目文件，不是合法条目时返回None
+
+    只读取文件头、key和两个EOF记录，不会读取正文。
+    """
+    try:
+        file_size = os.path.getsize(path)
+        if file_size < HEADER_STRUCT.size + 2 * EOF_STRUCT.size:
+            return None
+
+        with open(path, 'rb') as f:
+            magic, version, key_length, _ = HEADER_STRUCT.unpack(f.read(HEADER_STRUCT.size))
+            if magic != SIMPLE_INITIAL_MAGIC:
+                return None
+            if HEADER_STRUCT.size + key_length + 2 * EOF_STRUCT.size > file_size:
+                return None
+            key = f.read(key_length).decode('utf-8', errors='replace')
+
+            # stream 0的EOF记录位于文件末尾
+            eof0_offset = file_size - EOF_STRUCT.size
+            f.seek(eof0_offset)
+            final_magic, flags, _, stream0_size = EOF_STRUCT.unpack(f.read(EOF_STRUCT.size))
+            if final_magic != SIMPLE_FINAL_MAGIC:
+                return None
+
+            stream0_end = eof0_offset
+            if flags & FLAG_HAS_KEY_SHA256:
+                stream0_end -= KEY_SHA256_SIZE
+            stream0_offset = stream0_end - stream0_size
+
+            # stream 1的EOF记录紧挨在stream 0之前
+            eof1_offset = stream0_offset - EOF_STRUCT.size
+            stream1_offset = HEADER_STRUCT.size + key_length
+            if eof1_offset < stream1_offset:
+                return None
+            f.seek(eof1_offset)
+            final_magic, _, _, _ = EOF_STRUCT.unpack(f.read(EOF_STRUCT.size))
+            if final_magic != SIMPLE_FINAL_MAGIC:
+                return None
+
+        return SimpleCacheEntry(
+            path, key, version, file_size,
+            stream0_offset, stream0_size,
+            stream1_offset, eof1_offset - stream1_offset
+        )
+    except (OSError, struct.error):
+        return None
+
+class SimpleCacheReader:
+    """Simple Cache目录的读取器，每个条目是一个<hash>_0文件"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def find_entries(self, url: str) -> List[SimpleCacheEntry]:
+        """根据缓存key的hash直接定位URL对应的条目文件，只打开候选文件"""
+        entries = []
+        for key in build_cache_keys(url):
+            entry = parse_entry_file(os.path.join(self.directory, entry_file_name(key)))
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
+    def iter_entries(self) -> Iterator[SimpleCacheEntry]:
+        """遍历目录中的所有条目"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith('_0'):
+                continue
+            entry = parse_entry_file(os.path.join(self.directory, name))
+            if entry is not None:
+                yield entry
@@ -0,0 +1,96 @@
+import mmap
+import os
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+# 用于快速跳过的锚点长度：所有匹配都必须以某个模式的前ANCHOR_LENGTH个字节开头
+ANCHOR_LENGTH = 4
+
+class UrlMatcher:
+    """基于Aho-Corasick自动机的多模式URL匹配器，一次扫描即可找出所有出现的URL
+
+    自动机处于根状态时没有正在进行的部分匹配，此时用正则在C层直接跳到下一个锚点
+    （各模式的前几个字节，通常只有b'http'），避免在Python中逐字节推进。
+    """
+
+    def __init__(self, urls: Iterable[str]):
+        self.goto: List[Dict[int, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[str]] = [[]]
+
+        anchors = set()
+        for url in urls:
+            pattern = url.encode('utf-8')
+            if not pattern:
+                continue
+            self.add_pattern(pattern, url)
+            anchors.add(pattern[:ANCHOR_LENGTH])
+
+        self.build_failure_links()
+        self.anchor_re = None
+        if anchors:
+            alternatives = sorted(anchors, key=len, reverse=True)
+            self.anchor_re = re.compile(b'|'.join(re.escape(a) for a in alternatives))
+
+    def add_pattern(self, pattern: bytes, url: str) -> None:
+        """把一个模式加入trie"""
+        state = 0
+        for byte in pattern:
+            next_state = self.goto[state].get(byte)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][byte] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append(url)
+
+    def build_failure_links(self) -> None:
+        """按广度优先顺序计算失败指针，并合并输出"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for byte, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and byte not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(byte, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state].extend(self.output[self.fail[next_state]])
+
+    def search(self, data: bytes) -> Set[str]:
+        """返回数据中出现过的所有URL，data可以是bytes、bytearray或mmap"""
+        found: Set[str] = set()
+        if self.anchor_re is None:
+            return found
+
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        pos = 0
+        length = len(data)
+        while pos < length:
+            if state == 0:
+                match = self.anchor_re.search(data, pos)
+                if match is None:
+                    break
+                pos = match.start()
+
+            byte = data[pos]
+            while state and byte not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(byte, 0)
+            if output[state]:
+                found.update(output[state])
+            pos += 1
+        return found
+
+    def search_file(self, path: str) -> Set[str]:
+        """用mmap在文件中查找，内存占用与文件大小无关"""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return set()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                return self.search(content)
@@ -0,0 +1,137 @@
+import math
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Iterable, Optional
+
+from ..config import URL_STORE_DB, URL_STORE_TTL, URL_STORE_BLOOM_CAPACITY, URL_STORE_BLOOM_ERROR_RATE
+
+class BloomFilter:
+    """固定大小的布隆过滤器，判断不存在时一定不存在，判断存在时有一定误判率"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.num_bits = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.num_hashes = max(int(round(self.num_bits / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def positions(self, key: str) -> Iterable[int]:
+        """双重散列：由一个128位摘要导出k个位置"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: str) -> None:
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(key))
+
+class ProcessedUrlStore:
+    """已处理URL的持久化去重存储，界面、历史记录监控和下载线程共用
+
+    URL保存在SQLite中，内存中只保留一个布隆过滤器：过滤器判断不存在的URL直接返回，
+    判断存在时再按主键查询数据库确认。设置了ttl时，超过ttl秒的记录视为过期，会被清理并重新处理。
+    """
+
+    def __init__(self, db_path: str = URL_STORE_DB, ttl: float = URL_STORE_TTL,
+                 capacity: int = URL_STORE_BLOOM_CAPACITY, error_rate: float = URL_STORE_BLOOM_ERROR_RATE):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS processed_urls (
+                url TEXT PRIMARY KEY,
+                processed_at REAL NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_processed_at ON processed_urls (processed_at)')
+        self.conn.commit()
+        self.counters = {'lookups': 0, 'filtered': 0, 'db_hits': 0, 'false_positives': 0, 'evicted': 0}
+        with self.lock:
+            self.evict_expired_locked()
+            self.rebuild_filter_locked(capacity)
+
+    def expiry_cutoff(self) -> Optional[float]:
+        return time.time() - self.ttl if self.ttl else None
+
+    def evict_expired_locked(self) -> int:
+        cutoff = self.expiry_cutoff()
+        if cutoff is None:
+            return 0
+        evicted = self.conn.execute('DELETE FROM processed_urls WHERE processed_at < ?', (cutoff,)).rowcount
+        self.conn.commit()
+        self.counters['evicted'] += evicted
+        return evicted
+
+    def rebuild_filter_locked(self, capacity: int) -> None:
+        """按数据库中的URL重建过滤器，逐行读取，不在内存中保留URL列表"""
+        count = self.conn.execute('SELECT COUNT(*) FROM processed_urls').fetchone()[0]
+        self.bloom = BloomFilter(max(capacity, count * 2), self.error_rate)
+        for (url,) in self.conn.execute('SELECT url FROM processed_urls'):
+            self.bloom.add(url)
+
+    def __contains__(self, url: str) -> bool:
+        with self.lock:
+            self.counters['lookups'] += 1
+            if url not in self.bloom:
+                self.counters['filtered'] += 1
+                return False
+            row = self.conn.execute('SELECT processed_at FROM processed_urls WHERE url = ?', (url,)).fetchone()
+            cutoff = self.expiry_cutoff()
+            if row is None or (cutoff is not None and row[0] < cutoff):
+                self.counters['false_positives' if row is None else 'evicted'] += 1
+                return False
+            self.counters['db_hits'] += 1
+            return True
+
+    def add(self, url: str) -> None:
+        """记录一个已处理的URL"""
+        with self.lock:
+            self.conn.execute('INSERT OR REPLACE INTO processed_urls (url, processed_at) VALUES (?, ?)',
+                              (url, time.time()))
+            self.conn.commit()
+            self.bloom.add(url)
+            if self.bloom.count > self.bloom.capacity:
+                # 过滤器装满后误判率上升，按两倍容量重建
+                self.rebuild_filter_locked(self.bloom.capacity * 2)
+
+    def evict_expired(self) -> int:
+        """清理过期的记录，返回清理的条数"""
+        with self.lock:
+            return self.evict_expired_locked()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM processed_urls').fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """统计：查询次数、被过滤器直接排除的次数、数据库确认存在的次数、过滤器误判次数、过期清理的条数"""
+        with self.lock:
+            return dict(self.counters)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
+
+_shared_store: Optional[ProcessedUrlStore] = None
+_shared_lock = threading.Lock()
+
+def get_url_store() -> ProcessedUrlStore:
+    """获取进程内共享的已处理URL存储"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = ProcessedUrlStore()
+        return _shared_store
@@ -65,42 +65,28 @@ def ensure_dir(directory: str) -> bool:
         print(f"创建目录失败: {str(e)}")
         return False
 
-def check_chrome_access() -> Tuple[bool, str]:
-    """检查Chrome相关文件的访问权限"""
-    from ..config import CHROME_HISTORY, CHROME_CACHE, CHROME_COOKIES
+def check_chrome_access(reader=None) -> Tuple[bool, str]:
+    """检查Chrome相关文件的访问权限，reader为读取历史记录的HistoryReader，默认使用共享的读取器"""
+    from ..core.history_reader import get_history_reader
+    if reader is None:
+        reader = get_history_reader()
+    history_path = reader.history_path
     
     # 检查Chrome目录是否存在
-    chrome_dir = os.path.dirname(CHROME_HISTORY)
+    chrome_dir = os.path.dirname(history_path)
     if not os.path.exists(chrome_dir):
         return False, f"Chrome配置目录不存在: {chrome_dir}\n请确保已安装Chrome浏览器。"
         
     # 检查历史记录文件
-    if not os.path.exists(CHROME_HISTORY):
+    if not os.path.exists(history_path):
         return False, "Chrome历史记录文件不存在。\n请确保已安装Chrome浏览器并有浏览历史。"
         
-    if not os.access(CHROME_HISTORY, os.R_OK):
+    if not os.access(history_path, os.R_OK):
         return False, "没有读取Chrome历史记录的权限。\n请在系统偏好设置中授予完全磁盘访问权限。"
         
-    # 尝试复制历史记录文件
+    # 尝试以只读方式打开历史记录数据库
     try:
-        temp_dir = os.path.expanduser('~/Library/Application Support/ChromeHistoryViewer/temp')
-        os.makedirs(temp_dir, exist_ok=True)
-        temp_history = os.path.join(temp_dir, 'test_history')
-        
-        import shutil
-        try:
-            shutil.copy2(CHROME_HISTORY, temp_history)
-            os.remove(temp_history)
-        except (IOError, PermissionError):
-            # 如果直接复制失败，尝试使用sqlite3复制
-            import sqlite3
-            conn = sqlite3.connect(CHROME_HISTORY)
-            backup_conn = sqlite3.connect(temp_history)
-            conn.backup(backup_conn)
-            conn.close()
-            backup_conn.close()
-            os.remove(temp_history)
-            
+        reader.check_access()
     except Exception as e:
         return False, f"无法访问Chrome历史记录文件: {str(e)}\n请确保已授予磁盘访问权限。"
         
@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+from ..config import VALIDATOR_DB, VALIDATOR_MAX_BODY_SIZE
+from ..core.cache_key import normalize_cache_url
+
+class ValidatorStore:
+    """直接请求过的页面的HTTP验证器(ETag / Last-Modified)和正文
+
+    再次请求同一URL时带上If-None-Match / If-Modified-Since，服务器返回304时直接使用保存的正文，
+    不需要重新下载。正文用zlib压缩后保存。
+    """
+
+    def __init__(self, db_path: str = VALIDATOR_DB, max_body_size: int = VALIDATOR_MAX_BODY_SIZE):
+        self.db_path = db_path
+        self.max_body_size = max_body_size
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT NOT NULL,
+                last_modified TEXT NOT NULL,
+                body BLOB NOT NULL,
+                body_size INTEGER NOT NULL,
+                stored_at REAL NOT NULL
+            )
+        ''')
+        self.conn.commit()
+        self.counters = {'stored': 0, 'revalidated': 0, 'bytes_saved': 0}
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """生成条件请求头，没有保存过验证器时返回空字典"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT etag, last_modified FROM validators WHERE url = ?', (normalize_cache_url(url),)
+            ).fetchone()
+        headers = {}
+        if row:
+            etag, last_modified = row
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def save(self, url: str, etag: str, last_modified: str, text: str) -> bool:
+        """保存验证器和正文，响应没有验证器或正文太大时不保存"""
+        if not etag and not last_modified:
+            return False
+        body = text.encode('utf-8')
+        if len(body) > self.max_body_size:
+            return False
+        with self.lock:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO validators (url, etag, last_modified, body, body_size, stored_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (normalize_cache_url(url), etag or '', last_modified or '',
+                  zlib.compress(body), len(body), time.time()))
+            self.conn.commit()
+            self.counters['stored'] += 1
+        return True
+
+    def load_body(self, url: str) -> Optional[str]:
+        """服务器返回304后读取保存的正文"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT body, body_size FROM validators WHERE url = ?', (normalize_cache_url(url),)
+            ).fetchone()
+        if not row:
+            return None
+        try:
+            body = zlib.decompress(row[0])
+        except zlib.error:
+            self.remove(url)
+            return None
+        with self.lock:
+            self.counters['revalidated'] += 1
+            self.counters['bytes_saved'] += row[1]
+        return body.decode('utf-8', errors='replace')
+
+    def remove(self, url: str) -> None:
+        """删除URL的记录（页面已不存在或保存的数据损坏）"""
+        with self.lock:
+            self.conn.execute('DELETE FROM validators WHERE url = ?', (normalize_cache_url(url),))
+            self.conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """统计：保存的页面数、304复用次数、因此省下的正文字节数"""
+        with self.lock:
+            return dict(self.counters)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
+
+_shared_store: Optional[ValidatorStore] = None
+_shared_lock = threading.Lock()
+
+def get_validator_store() -> ValidatorStore:
+    """获取进程内共享的验证器存储"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = ValidatorStore()
+        return _shared_store
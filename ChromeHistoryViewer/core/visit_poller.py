@@ -0,0 +1,95 @@
+import os
+import json
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+from ..config import HISTORY_STATE_FILE, HISTORY_MAX_PENDING_VISITS
+from ..core.history_reader import HistoryReader, get_history_reader
+
+class VisitPoller:
+    """按visits.id增量读取新的访问记录
+
+    visits.id单调递增，每次只按主键范围读取上次水位之后的新行并关联urls表，
+    不会漏掉时间戳相同的访问。读取的位置只在内存中推进；保存到状态文件的水位由commit()推进，
+    只越过URL已经保存的访问，排队、被丢弃或退出时还没转换的访问在重启后会重新读取。
+    """
+
+    def __init__(self, reader: Optional[HistoryReader] = None, state_path: str = HISTORY_STATE_FILE,
+                 max_pending: int = HISTORY_MAX_PENDING_VISITS):
+        self.reader = reader or get_history_reader()
+        self.state_path = state_path
+        self.max_pending = max_pending
+        self.saved_visit_id: Optional[int] = self.load_state()  # 状态文件中的水位
+        self.last_visit_id = self.saved_visit_id  # 已经读取到的位置
+        self.pending: Deque[Tuple[int, str]] = deque()  # 已读取、URL还没有保存的访问 (visits.id, URL)
+
+    def load_state(self) -> Optional[int]:
+        """读取保存的水位，没有状态文件或文件损坏时返回None"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('history_path') != self.reader.history_path:
+                return None
+            return int(state['last_visit_id'])
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"历史记录监控状态文件无效，重新开始: {str(e)}")
+            return None
+
+    def save_state(self) -> None:
+        """先写临时文件再替换，避免中途退出留下不完整的状态文件"""
+        temp_path = self.state_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'history_path': self.reader.history_path, 'last_visit_id': self.saved_visit_id}, f)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            print(f"保存历史记录监控状态失败: {str(e)}")
+
+    def max_visit_id(self) -> int:
+        return self.reader.query('SELECT MAX(id) FROM visits')[0][0] or 0
+
+    def poll(self) -> List[Tuple[str, str, int, int]]:
+        """返回上次水位之后的新访问，按访问顺序排列，每条为(标题, URL, 访问时间, 访问次数)"""
+        if self.last_visit_id is None:
+            # 首次运行，以当前最新的访问作为起点
+            self.last_visit_id = self.saved_visit_id = self.max_visit_id()
+            self.save_state()
+            return []
+
+        rows = self.reader.query('''
+            SELECT visits.id, urls.title, urls.url, visits.visit_time, urls.visit_count
+            FROM visits JOIN urls ON urls.id = visits.url
+            WHERE visits.id > ?
+            ORDER BY visits.id
+        ''', (self.last_visit_id,))
+
+        if not rows:
+            # 历史记录被清除后id可能从更小的值重新开始，水位随之回退
+            max_id = self.max_visit_id()
+            if max_id < self.last_visit_id:
+                print(f"历史记录的访问id回退到 {max_id}，重新设置水位")
+                self.last_visit_id = self.saved_visit_id = max_id
+                self.pending.clear()
+                self.save_state()
+            return []
+
+        self.last_visit_id = rows[-1][0]
+        self.pending.extend((row[0], row[2]) for row in rows)
+        return [row[1:] for row in rows]
+
+    def commit(self, is_saved: Callable[[str], bool]) -> None:
+        """把保存的水位推进到最早一个URL还没保存的访问之前"""
+        committed = self.saved_visit_id
+        while self.pending and is_saved(self.pending[0][1]):
+            committed = self.pending.popleft()[0]
+        if len(self.pending) > self.max_pending:
+            print(f"有 {len(self.pending)} 条访问一直没有保存，放弃最早的 {len(self.pending) - self.max_pending} 条")
+            while len(self.pending) > self.max_pending:
+                committed = self.pending.popleft()[0]
+        if not self.pending:
+            committed = self.last_visit_id
+        if committed != self.saved_visit_id:
+            self.saved_visit_id = committed
+            self.save_state()
@@ -0,0 +1,172 @@
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+from PySide6.QtGui import QColor
+
+from ..core.utils import chrome_timestamp_to_datetime
+
+# 状态列的取值
+STATUS_PENDING = 0  # 准备中
+STATUS_QUEUED = 1  # 监控到的新记录，等待转换
+STATUS_EXISTS = 2  # 之前已经处理过
+STATUS_DONE = 3
+STATUS_FAILED = 4
+
+STATUS_TEXT = {
+    STATUS_PENDING: "准备中",
+    STATUS_QUEUED: "准备中",
+    STATUS_EXISTS: "已存在",
+    STATUS_DONE: "完成",
+    STATUS_FAILED: "失败",
+}
+
+STATUS_COLORS = {
+    STATUS_QUEUED: QColor(Qt.yellow),
+    STATUS_EXISTS: QColor(Qt.green),
+    STATUS_DONE: QColor(Qt.green),
+    STATUS_FAILED: QColor(Qt.red),
+}
+
+class RecordColumns:
+    """按列存储的一段记录：字符串放在列表中，数值放在紧凑的array中"""
+
+    def __init__(self):
+        self.titles: List[str] = []
+        self.urls: List[str] = []
+        self.visit_times = array('q')
+        self.visit_counts = array('l')
+        self.statuses = array('b')
+
+    def append(self, title: Optional[str], url: str, visit_time: int, visit_count: int, status: int) -> None:
+        self.titles.append(title or 'No Title')
+        self.urls.append(url)
+        self.visit_times.append(visit_time or 0)
+        self.visit_counts.append(visit_count or 0)
+        self.statuses.append(status)
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+class HistoryTableModel(QAbstractTableModel):
+    """历史记录表格的数据模型
+
+    HistoryLoader在后台线程分批读取的记录通过append_records追加在末尾；监控到的新记录插入在顶部。
+    每条记录有一个稳定的行id，插入新记录后行号会变化，行id不变：
+    顶部插入的记录依次取-1、-2……，分批读取的记录依次取0、1、2……，当前行号 = 行id + 顶部记录数。
+    """
+    HEADERS = ['状态', 'Title', 'URL', 'Visit Time', 'Visit Count']
+    rows_fetched = Signal(list)  # 追加的新记录 [(行id, 标题, URL, 是否已处理)]
+
+    def __init__(self, url_store, parent=None):
+        super().__init__(parent)
+        self.url_store = url_store
+        self.head = RecordColumns()  # 顶部插入的记录，最新的在末尾
+        self.body = RecordColumns()  # 分批读取的记录
+        self.messages: Dict[int, str] = {}  # 行id -> 状态列的自定义文字，只有处理过的行才有
+
+    def reset(self) -> None:
+        """清空表格，准备接收新一次加载的记录"""
+        self.beginResetModel()
+        self.head = RecordColumns()
+        self.body = RecordColumns()
+        self.messages = {}
+        self.endResetModel()
+
+    def locate(self, row: int) -> Tuple[RecordColumns, int]:
+        """行号 -> (所在的列存储, 下标)"""
+        head_count = len(self.head)
+        if row < head_count:
+            return self.head, head_count - 1 - row
+        return self.body, row - head_count
+
+    def row_id(self, row: int) -> int:
+        return row - len(self.head)
+
+    def row_of(self, row_id: int) -> int:
+        return row_id + len(self.head)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.head) + len(self.body)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        columns, i = self.locate(index.row())
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                status = columns.statuses[i]
+                return self.messages.get(self.row_id(index.row()), STATUS_TEXT[status])
+            if column == 1:
+                return columns.titles[i]
+            if column == 2:
+                return columns.urls[i]
+            if column == 3:
+                # 时间只在显示时才格式化
+                return chrome_timestamp_to_datetime(columns.visit_times[i]).strftime('%Y-%m-%d %H:%M:%S')
+            if column == 4:
+                return str(columns.visit_counts[i])
+        elif role == Qt.BackgroundRole and column == 0:
+            return STATUS_COLORS.get(columns.statuses[i])
+        elif role == Qt.ToolTipRole and column in (1, 2):
+            return columns.titles[i] if column == 1 else columns.urls[i]
+        return None
+
+    def append_records(self, records: Iterable[Tuple[str, str, int, int]]) -> None:
+        """在末尾追加一批记录，并通知有哪些新记录"""
+        records = list(records)
+        if not records:
+            return
+        first = self.rowCount()
+        first_id = len(self.body)
+        fetched = []
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        for offset, (title, url, visit_time, visit_count) in enumerate(records):
+            processed = url in self.url_store
+            self.body.append(title, url, visit_time, visit_count, STATUS_EXISTS if processed else STATUS_PENDING)
+            fetched.append((first_id + offset, title or 'No Title', url, processed))
+        self.endInsertRows()
+        self.rows_fetched.emit(fetched)
+
+    def prepend_record(self, title: str, url: str, visit_time: int, visit_count: int) -> int:
+        """在顶部插入一条监控到的新记录，返回它的行id"""
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.head.append(title, url, visit_time, visit_count, STATUS_QUEUED)
+        self.endInsertRows()
+        return -len(self.head)
+
+    def set_status(self, row_id: int, success: bool, message: str) -> None:
+        """更新一行的状态，只刷新状态这一个单元格"""
+        row = self.row_of(row_id)
+        if not 0 <= row < self.rowCount():
+            return
+        columns, i = self.locate(row)
+        columns.statuses[i] = STATUS_DONE if success else STATUS_FAILED
+        self.messages[row_id] = message
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.BackgroundRole])
+
+    def record(self, row_id: int) -> Optional[Tuple[str, str]]:
+        """行id对应的(标题, URL)"""
+        row = self.row_of(row_id)
+        if not 0 <= row < self.rowCount():
+            return None
+        columns, i = self.locate(row)
+        return columns.titles[i], columns.urls[i]
+
+    def find_url(self, url: str) -> Optional[int]:
+        """查找URL所在行的行id"""
+        for columns, to_id in ((self.head, lambda i: -1 - i), (self.body, lambda i: i)):
+            try:
+                return to_id(columns.urls.index(url))
+            except ValueError:
+                continue
+        return None
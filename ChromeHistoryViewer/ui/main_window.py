@@ -1,26 +1,31 @@
 import os
+import sys
 import signal
 import logging
 import traceback
-from typing import Set, List, Tuple
+from typing import List, Optional, Tuple
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QSpinBox, QCheckBox,
-    QMessageBox, QProgressBar, QTableWidget,
-    QTableWidgetItem, QApplication
+    QMessageBox, QProgressBar, QTableView,
+    QHeaderView, QApplication
 )
-from PySide6.QtCore import Qt, QTimer, QUrl
+from PySide6.QtCore import Qt, QTimer, QUrl, QObject, QThread, SIGNAL
 from PySide6.QtGui import QDesktopServices
 
 from ..config import (
-    DEFAULT_NUM_RECORDS, DEFAULT_CHECK_INTERVAL,
+    DEFAULT_NUM_RECORDS, MAX_NUM_RECORDS, DEFAULT_CHECK_INTERVAL,
     DEFAULT_SAVE_DIR, WINDOW_SIZE_RATIO,
     RAGFLOW_ENABLED, RAGFLOW_API_URL, RAGFLOW_API_KEY
 )
-from ..core.utils import check_chrome_access, ensure_dir
+from ..core.utils import ensure_dir, get_safe_title
 from ..core.cache_monitor import ChromeCacheMonitor
 from ..core.history_monitor import HistoryMonitor
 from ..core.page_downloader import WebPageDownloader
+from ..core.async_fetcher import close_async_fetcher
+from ..core.url_store import get_url_store
+from ..core.history_loader import HistoryLoader
+from ..ui.history_model import HistoryTableModel
 
 class ChromeHistoryViewer(QMainWindow):
     """Chrome历史记录查看器主窗口"""
@@ -44,7 +49,10 @@ class ChromeHistoryViewer(QMainWindow):
             self.save_dir = DEFAULT_SAVE_DIR
             self.downloader = None
             self.monitor = None
-            self.processed_urls: Set[str] = set()
+            self.history_loader = None
+            self.load_id = 0  # 每次加载历史记录的编号，用于忽略已取消的加载送回的结果
+            self.url_store = get_url_store()  # 已处理的URL，与监控和下载线程共用
+            self.conversion_queue: List[Tuple[int, str, str]] = []  # 等待转换的(行id, 标题, URL)
             self._shutting_down = False
             
             # 初始化RAGFlow管理器
@@ -137,7 +145,7 @@ class ChromeHistoryViewer(QMainWindow):
         
         # 添加记录数量选择器
         self.records_spinbox = QSpinBox()
-        self.records_spinbox.setRange(1, 1000)
+        self.records_spinbox.setRange(1, MAX_NUM_RECORDS)
         self.records_spinbox.setValue(self.num_records)
         self.records_spinbox.setSuffix(" 条记录")
         self.records_spinbox.valueChanged.connect(self.load_history)
@@ -201,10 +209,18 @@ class ChromeHistoryViewer(QMainWindow):
         layout.addLayout(monitor_layout)
         
     def create_table(self, layout: QVBoxLayout) -> None:
-        """创建表格"""
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(['状态', 'Title', 'URL', 'Visit Time', 'Visit Count'])
+        """创建表格，数据由模型按需提供，滚动到底部时才读取更多记录"""
+        self.model = HistoryTableModel(self.url_store, self)
+        self.model.rows_fetched.connect(self.queue_fetched_rows)
+        
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        # 固定列宽和行高，不需要按内容逐行计算尺寸
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        for column, width in enumerate((100, 320, 480, 150, 90)):
+            header.resizeSection(column, width)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         layout.addWidget(self.table)
         
     def signal_handler(self, signum: int, frame) -> None:
@@ -216,11 +232,21 @@ class ChromeHistoryViewer(QMainWindow):
     def force_cleanup(self) -> None:
         """强制清理所有资源"""
         try:
-            # 停止下载器
+            # 停止加载历史记录的线程，包括已取消但还没退出的
+            self.cancel_history_load()
+            for loader in self.findChildren(HistoryLoader):
+                loader.stop()
+                loader.wait(1000)
+            
+            # 停止下载器，包括已断开但还没退出的
             if hasattr(self, 'downloader') and self.downloader:
                 self.downloader.is_running = False
                 self.downloader.stop()
                 self.downloader = None
+            self.drop_conversion_queue()
+            for downloader in self.findChildren(WebPageDownloader):
+                downloader.is_running = False
+                downloader.wait(1000)
             
             # 停止监控器
             if hasattr(self, 'monitor') and self.monitor:
@@ -234,6 +260,9 @@ class ChromeHistoryViewer(QMainWindow):
                 self.cache_monitor.stop()
                 self.cache_monitor = None
             
+            # 下载线程和缓存监控器都停止后再关闭它们共用的异步获取器
+            close_async_fetcher()
+            
             # 强制处理所有待处理的事件
             QApplication.processEvents()
             
@@ -268,31 +297,22 @@ class ChromeHistoryViewer(QMainWindow):
     def stop_conversion(self) -> None:
         """停止转换进程"""
         try:
-            if self.downloader and self.downloader.is_running:
+            if self.downloader and self.downloader.isRunning():
                 self.stop_button.setEnabled(False)
                 self.progress_label.setText("正在停止转换...")
                 self.downloader.stop()
                 self.downloader = None
+                self.drop_conversion_queue("已取消")
                 
                 # 强制刷新UI
                 self.repaint()
         except Exception as e:
             print(f"停止转换时出错: {str(e)}")
             
-    def update_page_status(self, row: int, success: bool, message: str) -> None:
+    def update_page_status(self, row_id: int, success: bool, message: str) -> None:
         """更新单个页面的状态"""
         try:
-            status_item = QTableWidgetItem(message)
-            if success:
-                status_item.setBackground(Qt.green)
-            else:
-                status_item.setBackground(Qt.red)
-            self.table.setItem(row, 0, status_item)
-            
-            # 减少UI更新频率
-            if row % 5 == 0:
-                self.table.viewport().update()
-                
+            self.model.set_status(row_id, success, message)
         except Exception as e:
             print(f"更新页面状态时出错: {str(e)}")
             
@@ -311,81 +331,122 @@ class ChromeHistoryViewer(QMainWindow):
             print(f"更新总进度时出错: {str(e)}")
             
     def load_history(self) -> None:
-        """加载历史记录并自动开始转换"""
+        """在后台线程加载历史记录，读取到的记录自动开始转换"""
         try:
             # 获取用户设置的记录数量
             self.num_records = self.records_spinbox.value()
             
+            # 取消还没完成的加载
+            self.cancel_history_load()
+            
+            # 表格中的行id重新编号，正在进行的转换不再对应表格中的行
+            self.detach_downloader()
+            self.drop_conversion_queue()
+            
             # 更新UI状态
             self.progress_label.setText("正在加载历史记录...")
             self.total_progress_bar.setValue(0)
-            QApplication.processEvents()
             
-            # 检查访问权限
-            can_access, message = check_chrome_access()
-            if not can_access:
-                self.progress_label.setText(f"错误: {message}")
-                QMessageBox.warning(self, "访问错误", message)
-                return
-                
-            # 获取历史记录
-            history = HistoryMonitor()
-            records = history.get_history_records(self.num_records)
-            
-            if not records:
-                self.progress_label.setText("未找到历史记录")
-                QMessageBox.information(self, "提示", "未找到任何历史记录。\n请确保Chrome中有浏览历史。")
-                return
-            
-            # 清空现有表格
-            self.table.clearContents()
-            self.table.setRowCount(len(records))
-            
-            # 填充表格
-            urls_to_process = []
-            for row, (title, url, visit_time, visit_count) in enumerate(records):
-                # 设置初始状态
-                status_item = QTableWidgetItem("准备中")
-                self.table.setItem(row, 0, status_item)
-                
-                self.table.setItem(row, 1, QTableWidgetItem(title))
-                self.table.setItem(row, 2, QTableWidgetItem(url))
-                self.table.setItem(row, 3, QTableWidgetItem(visit_time))
-                self.table.setItem(row, 4, QTableWidgetItem(str(visit_count)))
-                
-                # 检查URL是否已经处理过
-                if url not in self.processed_urls:
-                    urls_to_process.append((row, title, url))
-                else:
-                    status_item = QTableWidgetItem("已存在")
-                    status_item.setBackground(Qt.green)
-                    self.table.setItem(row, 0, status_item)
-                
-                # 每10行更新一次UI
-                if row % 10 == 0:
-                    QApplication.processEvents()
+            # 访问检查和全部记录都在后台线程分批读取，每读到一批就追加到表格并开始转换，不依赖视图滚动
+            self.load_id += 1
+            self.history_loader = HistoryLoader(self.load_id, self.num_records, parent=self)
+            self.history_loader.page_loaded.connect(self.history_page_loaded)
+            self.history_loader.access_denied.connect(self.history_access_denied)
+            self.history_loader.load_failed.connect(self.history_load_failed)
+            self.history_loader.finished.connect(self.history_loader.deleteLater)
+            self.model.reset()
+            self.history_loader.start()
             
-            # 调整列宽
-            self.table.resizeColumnsToContents()
+        except Exception as e:
+            self.history_load_failed(self.load_id, str(e))
             
-            self.progress_label.setText(f"已加载 {len(records)} 条历史记录，准备开始转换...")
+    def cancel_history_load(self) -> None:
+        """取消正在进行的加载，不等待线程退出"""
+        if self.history_loader:
+            self.history_loader.stop()
+            self.history_loader = None
             
-            # 启动一个短暂的延时，然后开始转换
-            if urls_to_process:
-                QTimer.singleShot(500, lambda: self.start_conversion(urls_to_process))
+    def history_page_loaded(self, load_id: int, records: List[Tuple[str, str, int, int]]) -> None:
+        """后台线程读取到一页历史记录"""
+        if load_id != self.load_id:
+            return
+        # 监控到的新记录可能先插入在顶部，只看分批读取的记录
+        first_page = len(self.model.body) == 0
+        self.model.append_records(records)
+        if first_page and len(self.model.body) == 0:
+            self.progress_label.setText("未找到历史记录")
+            QMessageBox.information(self, "提示", "未找到任何历史记录。\n请确保Chrome中有浏览历史。")
+            return
+        
+        self.progress_label.setText(f"已加载 {len(self.model.body)} 条历史记录，准备开始转换...")
             
-        except Exception as e:
-            error_msg = f"读取历史记录失败: {str(e)}\n\n可能的原因：\n1. Chrome正在运行\n2. 没有足够的文件访问权限\n\n解决方案：\n1. 关闭Chrome浏览器后重试\n2. 在系统偏好设置中授予磁盘访问权限"
-            self.progress_label.setText("错误: 读取历史记录失败")
-            QMessageBox.warning(self, "错误", error_msg)
+    def history_access_denied(self, load_id: int, message: str) -> None:
+        """无法访问历史记录文件"""
+        if load_id != self.load_id:
+            return
+        self.progress_label.setText(f"错误: {message}")
+        QMessageBox.warning(self, "访问错误", message)
+        
+    def history_load_failed(self, load_id: int, message: str) -> None:
+        """读取历史记录失败"""
+        if load_id != self.load_id:
+            return
+        error_msg = f"读取历史记录失败: {message}\n\n可能的原因：\n1. Chrome正在运行\n2. 没有足够的文件访问权限\n\n解决方案：\n1. 关闭Chrome浏览器后重试\n2. 在系统偏好设置中授予磁盘访问权限"
+        self.progress_label.setText("错误: 读取历史记录失败")
+        QMessageBox.warning(self, "错误", error_msg)
+            
+    def queue_fetched_rows(self, rows: List[Tuple[int, str, str, bool]]) -> None:
+        """新读取到的记录中没有处理过的加入转换队列"""
+        urls_to_process = [(row_id, title, url) for row_id, title, url, processed in rows if not processed]
+        if urls_to_process:
+            self.start_conversion(urls_to_process)
+            
+    def detach_downloader(self) -> None:
+        """让正在运行的下载线程尽快结束，并断开它与表格的连接"""
+        if self.downloader:
+            self.downloader.is_running = False
+            for signal_ in (self.downloader.progress, self.downloader.page_finished, self.downloader.finished):
+                signal_.disconnect()
+            self.release_when_finished(self.downloader)
+            self.downloader = None
+            self.stop_button.setEnabled(False)
+            
+    def release_when_finished(self, thread: QThread) -> None:
+        """线程可能还在运行，交给窗口持有，线程真正退出后再释放"""
+        thread.setParent(self)
+        # WebPageDownloader的finished(bool)覆盖了QThread自己的finished信号，按签名连接
+        QObject.connect(thread, SIGNAL("finished()"), thread.deleteLater)
+        if thread.isFinished():
+            thread.deleteLater()
+            
+    def is_converting(self, url: str) -> bool:
+        """URL是否在排队或在当前的下载线程中"""
+        if any(queued_url == url for _, _, queued_url in self.conversion_queue):
+            return True
+        return bool(self.downloader) and any(pending_url == url for _, _, pending_url in self.downloader.urls)
+            
+    def drop_conversion_queue(self, message: Optional[str] = None) -> None:
+        """丢弃排队的记录，给出message时把它们在表格中标记为未完成
+
+        排队的URL还没有保存，不在已处理记录中，之后会被重新读取和转换。
+        """
+        dropped, self.conversion_queue = self.conversion_queue, []
+        if message:
+            for row_id, _, _ in dropped:
+                self.model.set_status(row_id, False, message)
             
     def start_conversion(self, urls_to_process: List[Tuple[int, str, str]]) -> None:
-        """开始转换所有记录"""
-        if self.downloader and self.downloader.is_running:
+        """开始转换记录，已有转换在进行时排队等待"""
+        self.conversion_queue.extend(urls_to_process)
+        # is_running要等线程真正开始运行后才会设置，刚启动的下载线程也要算作正在运行
+        if self.downloader and self.downloader.isRunning():
+            return
+        if not self.conversion_queue:
             return
+        urls_to_process, self.conversion_queue = self.conversion_queue, []
             
         # 创建并启动下载线程
-        self.downloader = WebPageDownloader(urls_to_process, self.save_dir, self.cache_monitor)
+        self.downloader = WebPageDownloader(urls_to_process, self.save_dir, self.cache_monitor, self.url_store)
         self.downloader.progress.connect(self.update_total_progress)
         self.downloader.page_finished.connect(self.update_page_status)
         self.downloader.finished.connect(self.conversion_finished)
@@ -398,17 +459,25 @@ class ChromeHistoryViewer(QMainWindow):
         """转换完成的处理"""
         try:
             if self.downloader:
-                if normal_completion:
+                self.stop_button.setEnabled(False)
+                # 这个信号在线程退出前发出
+                self.release_when_finished(self.downloader)
+                self.downloader = None
+                
+                # 先继续转换排队中的记录，中断时排队的记录也不再转换
+                if normal_completion and not self._shutting_down:
+                    if self.conversion_queue:
+                        self.start_conversion([])
+                        return
                     self.progress_label.setText("所有页面处理完成！")
+                    self.repaint()
                     QMessageBox.information(self, "完成", "所有页面都已处理完成！")
                 else:
+                    self.drop_conversion_queue("已取消")
                     self.progress_label.setText("转换已中断")
-                
-                self.stop_button.setEnabled(False)
-                self.downloader = None
-                
-                # 强制刷新UI
-                self.repaint()
+                    
+                    # 强制刷新UI
+                    self.repaint()
                 
         except Exception as e:
             print(f"转换完成处理时出错: {str(e)}")
@@ -418,7 +487,6 @@ class ChromeHistoryViewer(QMainWindow):
         if state == Qt.Checked:
             # 启动监控
             self.monitor = HistoryMonitor(self.interval_spinbox.value())
-            self.monitor.processed_urls = self.processed_urls.copy()
             self.monitor.new_records.connect(self.process_new_records)
             self.monitor.start()
             self.interval_spinbox.setEnabled(False)
@@ -438,43 +506,21 @@ class ChromeHistoryViewer(QMainWindow):
         for record in new_records:
             title, url = record[0] or 'No Title', record[1]
             
-            # 跳过已处理的URL
-            if url in self.processed_urls:
+            # 跳过已处理和正在等待转换的URL，保存成功后下载线程才会记录为已处理
+            if url in self.url_store or self.is_converting(url):
                 continue
                 
-            # 添加到已处理集合
-            self.processed_urls.add(url)
-            
-            # 添加新行
-            row = 0  # 在表格顶部插入新记录
-            self.table.insertRow(row)
-            
-            # 设置状态
-            status_item = QTableWidgetItem("准备中")
-            status_item.setBackground(Qt.yellow)
-            self.table.setItem(row, 0, status_item)
-            
-            # 设置其他列
-            self.table.setItem(row, 1, QTableWidgetItem(title))
-            self.table.setItem(row, 2, QTableWidgetItem(url))
-            
-            # 转换时间戳
-            from ..core.utils import chrome_timestamp_to_datetime
-            visit_time = chrome_timestamp_to_datetime(record[2])
-            self.table.setItem(row, 3, QTableWidgetItem(visit_time.strftime('%Y-%m-%d %H:%M:%S')))
-            self.table.setItem(row, 4, QTableWidgetItem(str(record[3])))
+            # 在表格顶部插入新记录
+            row_id = self.model.prepend_record(title, url, record[2], record[3])
             
             # 添加到待处理列表
-            urls_to_process.append((row, title, url))
+            urls_to_process.append((row_id, title, url))
             
-        # 如果有新记录，开始处理
+        # 如果有新记录，开始处理（已有转换在进行时排队）
         if urls_to_process:
-            # 如果当前没有下载任务在运行
-            if not self.downloader or not self.downloader.is_running:
-                self.start_conversion(urls_to_process)
+            self.start_conversion(urls_to_process)
             
-            # 调整列宽并滚动到最新记录
-            self.table.resizeColumnsToContents()
+            # 滚动到最新记录
             self.table.scrollToTop()
             
     def upload_to_ragflow(self) -> None:
@@ -518,19 +564,18 @@ class ChromeHistoryViewer(QMainWindow):
             # 如果RAGFlow已启用，尝试上传新生成的文件
             if self.ragflow_manager:
                 # 查找对应的文件
-                for row in range(self.table.rowCount()):
-                    if self.table.item(row, 2).text() == url:
-                        title = self.table.item(row, 1).text()
-                        file_name = f"{get_safe_title(title, url)}.md"
-                        file_path = os.path.join(self.save_dir, file_name)
-                        
-                        if os.path.exists(file_path):
-                            try:
-                                success, message = self.ragflow_manager.upload_file(file_path)
-                                if success:
-                                    logging.info(f"文件已上传到RAGFlow: {file_name}")
-                                else:
-                                    logging.error(f"上传到RAGFlow失败: {file_name} - {message}")
-                            except Exception as e:
-                                logging.error(f"处理RAGFlow上传时出错: {str(e)}")
-                        break 
\ No newline at end of file
+                row_id = self.model.find_url(url)
+                if row_id is not None:
+                    title, _ = self.model.record(row_id)
+                    file_name = f"{get_safe_title(title, url)}.md"
+                    file_path = os.path.join(self.save_dir, file_name)
+                    
+                    if os.path.exists(file_path):
+                        try:
+                            success, message = self.ragflow_manager.upload_file(file_path)
+                            if success:
+                                logging.info(f"文件已上传到RAGFlow: {file_name}")
+                            else:
+                                logging.error(f"上传到RAGFlow失败: {file_name} - {message}")
+                        except Exception as e:
+                            logging.error(f"处理RAGFlow上传时出错: {str(e)}") 
\ No newline at end of file
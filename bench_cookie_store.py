@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import random
+import shutil
+import sqlite3
+import tempfile
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.cookie_store import CookieStore
+from test_cookie_store import create_cookies_db
+
+NUM_ROWS = 100000
+NUM_LOOKUPS = 200
+
+def build_rows(num_rows):
+    """Generate cookies spread over sites, subdomains and look-alike domains"""
+    rng = random.Random(42)
+    sites = [f"site{i}.com" for i in range(num_rows // 10)]
+    rows = []
+    for i in range(num_rows):
+        site = rng.choice(sites)
+        kind = rng.random()
+        if kind < 0.4:
+            host = f".{site}"
+        elif kind < 0.7:
+            host = f"www.{site}"
+        elif kind < 0.9:
+            host = f".app.{site}"
+        else:
+            # Domains that contain another site's name, e.g. notsite12.com
+            host = f".not{site}"
+        rows.append((host, f"c{i}", "v" * rng.randint(8, 64), rng.choice(["/", "/", "/app"]), 0, rng.random() < 0.3))
+    return rows, sites
+
+def like_lookup(cookies_path, domain):
+    """The previous implementation: copy the database and scan it with LIKE on every call"""
+    temp_cookies = cookies_path + ".copy"
+    shutil.copy2(cookies_path, temp_cookies)
+    conn = sqlite3.connect(temp_cookies)
+    try:
+        cookies = {}
+        for name, value, _ in conn.execute(
+            'SELECT name, value, host_key FROM cookies WHERE host_key LIKE ?', ('%' + domain + '%',)
+        ):
+            cookies[name] = value
+        return cookies
+    finally:
+        conn.close()
+        os.remove(temp_cookies)
+
+def cookie_bytes(cookies):
+    return sum(len(name) + len(value) + 3 for name, value in cookies.items())
+
+def main():
+    """Main function"""
+    print(f"=== Cookie Lookup Benchmark ({NUM_ROWS} rows) ===")
+    rows, sites = build_rows(NUM_ROWS)
+    rng = random.Random(7)
+    targets = [f"www.{rng.choice(sites)}" for _ in range(NUM_LOOKUPS)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "Cookies")
+        create_cookies_db(path, rows)
+        print(f"Database size: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+
+        start = time.perf_counter()
+        like_bytes = 0
+        for host in targets:
+            like_bytes += cookie_bytes(like_lookup(path, host.split('.', 1)[1]))
+        like_elapsed = time.perf_counter() - start
+
+        store = CookieStore(path)
+        start = time.perf_counter()
+        store.refresh()
+        load_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store_bytes = 0
+        for host in targets:
+            store_bytes += cookie_bytes(store.get_cookies(f"https://{host}/app/page"))
+        store_elapsed = time.perf_counter() - start
+
+    print(f"LIKE + copy:   {like_elapsed / NUM_LOOKUPS * 1000:8.3f} ms/lookup, {like_bytes / NUM_LOOKUPS:8.0f} cookie bytes/request")
+    print(f"Suffix index:  {store_elapsed / NUM_LOOKUPS * 1000:8.3f} ms/lookup, {store_bytes / NUM_LOOKUPS:8.0f} cookie bytes/request")
+    print(f"Snapshot load: {load_elapsed * 1000:8.1f} ms (once, and again only when the file changes)")
+    print(f"Speedup: {like_elapsed / max(store_elapsed, 1e-9):.0f}x")
+    return 0 if store_bytes <= like_bytes else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
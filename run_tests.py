@@ -46,7 +46,27 @@ def main():
     # Define the tests to run
     tests = [
         ("test_html_to_markdown.py", "HTML to Markdown Conversion Test"),
-        ("test_cache_extraction.py", "Cache Extraction Test")
+        ("test_cache_extraction.py", "Cache Extraction Test"),
+        ("test_cache_key.py", "Cache Key Test"),
+        ("test_simple_cache.py", "Simple Cache Parser Test"),
+        ("test_url_matcher.py", "URL Matcher Test"),
+        ("test_raw_cache_file.py", "Raw Cache File Test"),
+        ("test_cache_scanner.py", "Parallel Cache Scanner Test"),
+        ("test_cache_events.py", "Cache Event Queue Test"),
+        ("test_scan_scheduler.py", "Scan Scheduler Test"),
+        ("test_blockfile_cache.py", "Blockfile Cache Reader Test"),
+        ("test_cookie_store.py", "Cookie Store Test"),
+        ("test_http_client.py", "HTTP Client Test"),
+        ("test_async_fetcher.py", "Async Fetcher Test"),
+        ("test_retry_scheduler.py", "Retry Scheduler Test"),
+        ("test_validator_store.py", "Validator Store Test"),
+        ("test_charset.py", "Charset Resolution Test"),
+        ("test_history_reader.py", "History Reader Test"),
+        ("test_visit_poller.py", "Visit Poller Test"),
+        ("test_change_trigger.py", "Change Trigger Test"),
+        ("test_url_store.py", "Processed URL Store Test"),
+        ("test_history_model.py", "History Table Model Test"),
+        ("test_history_loader.py", "History Loader Test")
     ]
     
     # Optional: Run the full integration test if specified
@@ -0,0 +1,299 @@
+import os
+import sys
+import time
+import atexit
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Keep the cache index and other app files created by the monitor out of the real profile
+os.environ["HOME"] = tempfile.mkdtemp(prefix="async_fetcher_home_")
+atexit.register(shutil.rmtree, os.environ["HOME"], True)
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.cookie_store import CookieStore
+from ChromeHistoryViewer.core.validator_store import ValidatorStore
+from ChromeHistoryViewer.core.async_fetcher import AsyncFetcher
+from ChromeHistoryViewer.core.cache_monitor import ChromeCacheMonitor
+
+class StandInServer:
+    """Local HTTP stand-in that records how many requests it serves at the same time"""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with stand_in.lock:
+                    stand_in.active += 1
+                    stand_in.max_active = max(stand_in.max_active, stand_in.active)
+                try:
+                    time.sleep(stand_in.delay)
+                    if self.path.startswith('/missing'):
+                        body, status = b"not found", 404
+                    else:
+                        body = f"<html><body>{self.path}</body></html>".encode('utf-8')
+                        status = 200
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client cancelled the request
+                    pass
+                finally:
+                    with stand_in.lock:
+                        stand_in.active -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def make_fetcher(directory, cookie_store=None, **kwargs):
+    # A missing Cookies database means no cookies are sent; validators stay in the temporary directory
+    return AsyncFetcher(cookie_store or CookieStore(os.path.join(directory, "Cookies")),
+                        validator_store=ValidatorStore(os.path.join(directory, "validators.db")), **kwargs)
+
+def close_fetcher(fetcher):
+    fetcher.close()
+    fetcher.validator_store.close()
+
+def test_concurrency_limits():
+    """Test that requests run concurrently under global and per-host limits"""
+    print("=== Async Fetch Concurrency Test ===")
+    host_a, host_b = StandInServer(), StandInServer()
+    with tempfile.TemporaryDirectory() as directory:
+        fetcher = make_fetcher(directory, max_concurrency=6, per_host_concurrency=4)
+        try:
+            urls = [f"{host_a.base_url}/page{i}" for i in range(12)]
+            urls += [f"{host_b.base_url}/page{i}" for i in range(12)]
+            urls.append(f"{host_a.base_url}/missing")
+
+            start = time.time()
+            results = fetcher.fetch_all(urls)
+            elapsed = time.time() - start
+            print(f"Fetched {len(results)} URLs in {elapsed:.2f}s, "
+                  f"max active per host: {host_a.max_active}/{host_b.max_active}, stats: {fetcher.stats()}")
+
+            assert len(results) == len(urls)
+            assert all(results[url].ok for url in urls[:-1])
+            assert results[urls[-1]].status == 404 and not results[urls[-1]].ok
+            assert "/page3" in results[urls[3]].text
+            assert host_a.max_active <= 4 and host_b.max_active <= 4
+            assert fetcher.stats()['max_in_flight'] <= 6
+            # 25 requests at 0.2s each would take 5s one at a time
+            assert elapsed < 2.5
+        finally:
+            close_fetcher(fetcher)
+            host_a.close()
+            host_b.close()
+
+    print("Async fetch concurrency test passed")
+    return True
+
+def test_cancellation():
+    """Test that a batch stops as soon as should_continue turns false"""
+    print("\n=== Async Fetch Cancellation Test ===")
+    slow = StandInServer(delay=1.0)
+    with tempfile.TemporaryDirectory() as directory:
+        fetcher = make_fetcher(directory, max_concurrency=2, per_host_concurrency=2)
+        try:
+            deadline = time.time() + 0.3
+            start = time.time()
+            results = fetcher.fetch_all(
+                [f"{slow.base_url}/page{i}" for i in range(10)],
+                should_continue=lambda: time.time() < deadline
+            )
+            elapsed = time.time() - start
+            time.sleep(0.1)
+            print(f"Returned after {elapsed:.2f}s with {len(results)} results, stats: {fetcher.stats()}")
+            assert elapsed < 0.8 and len(results) == 0
+            assert fetcher.stats()['cancelled'] >= 2
+
+            # Non-blocking submission delivers results through the callback
+            delivered = []
+            done = threading.Event()
+            fetcher.submit(f"{slow.base_url}/callback", lambda result: (delivered.append(result), done.set()))
+            assert done.wait(5) and delivered[0].ok
+        finally:
+            close_fetcher(fetcher)
+            slow.close()
+
+    print("Async fetch cancellation test passed")
+    return True
+
+def test_streaming_limits():
+    """Test that non-HTML and oversized responses are abandoned early"""
+    print("\n=== Async Fetch Streaming Limits Test ===")
+    sent = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            chunk = b"<p>" + b"x" * 4093 + b"</p>"
+            content_type, chunks, declare_length = 'text/html; charset=utf-8', 4, True
+            if self.path == '/report.pdf':
+                content_type, chunks = 'application/pdf', 256
+            elif self.path == '/declared-huge':
+                chunks = 256
+            elif self.path == '/undeclared-huge':
+                chunks, declare_length = 256, False
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            if declare_length:
+                self.send_header('Content-Length', str(len(chunk) * chunks))
+            else:
+                self.send_header('Connection', 'close')
+            self.end_headers()
+            try:
+                for _ in range(chunks):
+                    self.wfile.write(chunk)
+                    with lock:
+                        sent[self.path] = sent.get(self.path, 0) + len(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client abandoned the body
+                pass
+
+        def handle(self):
+            try:
+                super().handle()
+            except ConnectionResetError:
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        fetcher = make_fetcher(directory, max_body_size=64 * 1024)
+        try:
+            paths = ('/page', '/report.pdf', '/declared-huge', '/undeclared-huge')
+            results = fetcher.fetch_all([f"{base_url}{path}" for path in paths])
+            stats = fetcher.stats()
+            print(f"Errors: {[results[base_url + path].error for path in paths]}, stats: {stats}")
+
+            page = results[f"{base_url}/page"]
+            assert page.ok and len(page.text) == 4 * 4100
+            for path in paths[1:]:
+                result = results[base_url + path]
+                assert not result.ok and not result.retryable and result.error
+            assert stats['aborted'] == 3
+            # The 1 MB bodies were never read in full
+            assert stats['bytes_read'] < 4 * 4100 + 2 * 64 * 1024
+            assert stats['aborted_bytes'] >= 2 * 256 * 4100
+        finally:
+            close_fetcher(fetcher)
+            server.shutdown()
+            server.server_close()
+
+    print("Async fetch streaming limits test passed")
+    return True
+
+class SlowCookieStore(CookieStore):
+    """Cookie store whose lookups block like a refresh that copies a large Cookies database"""
+
+    def get_cookies(self, url):
+        time.sleep(0.3)
+        return super().get_cookies(url)
+
+def test_blocking_work_off_loop():
+    """Test that cookie lookups do not block the event loop and a closed fetcher can be reused"""
+    print("\n=== Async Fetch Off-Loop Work Test ===")
+    server = StandInServer(delay=0.05)
+    with tempfile.TemporaryDirectory() as directory:
+        fetcher = make_fetcher(directory, SlowCookieStore(os.path.join(directory, "Cookies")),
+                               max_concurrency=8, per_host_concurrency=1)
+        try:
+            # On the event loop the 0.3s lookups would run one after another
+            urls = [f"{server.base_url}/page{i}" for i in range(4)]
+            start = time.time()
+            results = fetcher.fetch_all(urls)
+            elapsed = time.time() - start
+            print(f"4 requests with 0.3s cookie lookups took {elapsed:.2f}s")
+            assert all(results[url].ok for url in urls)
+            assert elapsed < 1.0
+
+            # Semaphores from the closed loop are not reused by the next one
+            fetcher.close()
+            fetcher.cookie_store = CookieStore(os.path.join(directory, "Cookies"))
+            urls = [f"{server.base_url}/again{i}" for i in range(4)]
+            results = fetcher.fetch_all(urls)
+            assert all(results[url].ok for url in urls)
+            assert server.max_active == 1
+        finally:
+            close_fetcher(fetcher)
+            server.close()
+
+    print("Async fetch off-loop work test passed")
+    return True
+
+def test_monitor_stop_keeps_shared_fetcher():
+    """Test that stopping the cache monitor cancels only its own requests on the shared fetcher"""
+    print("\n=== Async Fetch Shared Fetcher Test ===")
+    server = StandInServer(delay=0.5)
+    with tempfile.TemporaryDirectory() as directory:
+        fetcher = make_fetcher(directory)
+        monitor = ChromeCacheMonitor()
+        monitor.fetcher = fetcher
+        monitor.is_running = True
+        emitted = []
+        monitor.content_ready.connect(lambda url, content: emitted.append(url))
+        watched, downloaded = f"{server.base_url}/watched", f"{server.base_url}/downloaded"
+        monitor.url_patterns.add(watched)
+        try:
+            # The downloader waits on the same fetcher while the monitor is stopped
+            results = {}
+            downloader = threading.Thread(target=lambda: results.update(fetcher.fetch_all([downloaded])))
+            downloader.start()
+            monitor.fetch_in_background([watched])
+            time.sleep(0.1)
+            monitor.stop()
+            downloader.join(5)
+
+            print(f"Fetcher stats: {fetcher.stats()}")
+            assert results[downloaded].ok and monitor.fetching == {} and emitted == []
+            assert fetcher.stats()['cancelled'] == 1 and fetcher.stats()['succeeded'] == 1
+            # The fetcher is still usable after the monitor stopped
+            assert fetcher.fetch_all([f"{server.base_url}/later"])[f"{server.base_url}/later"].ok
+        finally:
+            close_fetcher(fetcher)
+            server.close()
+
+    print("Async fetch shared fetcher test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = (test_concurrency_limits() and test_cancellation() and test_streaming_limits()
+               and test_blocking_work_off_loop() and test_monitor_stop_keeps_shared_fetcher())
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+import os
+import sys
+import struct
+import tempfile
+import gzip
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.cache_key import build_cache_keys
+from ChromeHistoryViewer.core.blockfile_cache import (
+    INDEX_MAGIC, BLOCK_MAGIC, INDEX_HEADER_SIZE, INDEX_TABLE_LEN_OFFSET, BLOCK_HEADER_SIZE,
+    ADDR_INITIALIZED, ENTRY_STRUCT, ENTRY_KEY_OFFSET, RANKINGS_STRUCT,
+    BlockfileCacheReader, is_blockfile_cache, super_fast_hash
+)
+
+class BlockfileWriter:
+    """Build a synthetic blockfile cache directory laid out the way Chrome writes it"""
+
+    BLOCK_SIZES = {1: 36, 2: 256, 3: 1024}
+
+    def __init__(self, directory, table_len=16):
+        self.directory = directory
+        self.table = [0] * table_len
+        # file type -> bytearray of blocks (data_0: rankings, data_1: 256B, data_2: 1KB)
+        self.blocks = {1: bytearray(), 2: bytearray(), 3: bytearray()}
+        self.next_external = 1
+
+    def allocate(self, file_type, data):
+        block_size = self.BLOCK_SIZES[file_type]
+        num_blocks = max(1, -(-len(data) // block_size))
+        assert num_blocks <= 4
+        start = len(self.blocks[file_type]) // block_size
+        self.blocks[file_type] += data.ljust(num_blocks * block_size, b'\0')
+        return ADDR_INITIALIZED | file_type << 28 | (num_blocks - 1) << 24 | (file_type - 1) << 16 | start
+
+    def store(self, data):
+        """Small streams go to data_1/data_2, large ones to an f_XXXXXX file"""
+        if len(data) <= 4 * 256:
+            return self.allocate(2, data)
+        if len(data) <= 4 * 1024:
+            return self.allocate(3, data)
+        number = self.next_external
+        self.next_external += 1
+        with open(os.path.join(self.directory, f"f_{number:06x}"), 'wb') as f:
+            f.write(data)
+        return ADDR_INITIALIZED | number
+
+    def add_entry(self, key, raw_headers, body, state=0):
+        key_bytes = key.encode('utf-8')
+        header_bytes = b'\0'.join(h.encode('latin1') for h in raw_headers) + b'\0\0'
+        stream0 = struct.pack('<I', len(header_bytes) + 20) + b'\x00' * 20 + header_bytes
+        streams = [stream0, body]
+        addrs = [self.store(s) for s in streams]
+
+        key_hash = super_fast_hash(key_bytes)
+        bucket = key_hash & (len(self.table) - 1)
+        long_key = 0
+        inline_key = key_bytes
+        if len(key_bytes) >= 256 - ENTRY_KEY_OFFSET:
+            long_key = self.store(key_bytes + b'\0')
+            inline_key = b''
+
+        # Reserve the entry block first so the rankings node can point back at it
+        entry_addr = self.allocate(2, b'\0' * 256)
+        rankings_addr = self.allocate(1, RANKINGS_STRUCT.pack(0x1234, 0x1234, 0, 0, entry_addr, 0, 0))
+        fields = ENTRY_STRUCT.pack(
+            key_hash, self.table[bucket], rankings_addr, 0, 0, state, 0,
+            len(key_bytes), long_key, len(stream0), len(body), 0, 0,
+            addrs[0], addrs[1], 0, 0, 0, 0
+        )
+        data = (fields + inline_key).ljust(256, b'\0')
+        start = (entry_addr & 0xFFFF) * 256
+        self.blocks[2][start:start + 256] = data
+        # Newer entries are linked at the head of the bucket chain
+        self.table[bucket] = entry_addr
+        return entry_addr
+
+    def write(self):
+        header = bytearray(INDEX_HEADER_SIZE)
+        struct.pack_into('<II', header, 0, INDEX_MAGIC, 0x30000)
+        struct.pack_into('<i', header, INDEX_TABLE_LEN_OFFSET, len(self.table))
+        with open(os.path.join(self.directory, "index"), 'wb') as f:
+            f.write(bytes(header) + struct.pack(f'<{len(self.table)}I', *self.table))
+        for file_type, blocks in self.blocks.items():
+            block_header = bytearray(BLOCK_HEADER_SIZE)
+            struct.pack_into('<IIhhi', block_header, 0, BLOCK_MAGIC, 0x30000,
+                             file_type - 1, 0, self.BLOCK_SIZES[file_type])
+            with open(os.path.join(self.directory, f"data_{file_type - 1}"), 'wb') as f:
+                f.write(bytes(block_header) + bytes(blocks))
+
+def test_super_fast_hash():
+    """Test SuperFastHash against the values Chrome's own tests expect"""
+    print("=== SuperFastHash Test ===")
+    assert super_fast_hash(b"") == 0
+    assert super_fast_hash(b"hello world") == 2794219650
+    assert super_fast_hash(b"helmo world") == 1006697176
+    assert super_fast_hash(b"hello\0 world") == 2319902537
+    assert super_fast_hash(b"hello\0 worle") == 553904462
+    print("SuperFastHash test passed")
+    return True
+
+def test_find_entry():
+    """Test looking up blockfile entries by key through the index hash table"""
+    print("\n=== Blockfile Lookup Test ===")
+    headers = ["HTTP/1.1 200 OK", "Content-Type: text/html; charset=utf-8"]
+    small_url = "https://example.com/small"
+    large_url = "https://example.com/large"
+    long_url = "https://example.com/" + "long-path/" * 30
+    small_body = b"<html><body>small</body></html>"
+    large_body = ("<html><body>" + "大页面正文 " * 4000 + "</body></html>").encode('utf-8')
+
+    with tempfile.TemporaryDirectory() as directory:
+        # A tiny table forces several keys into the same bucket chain
+        writer = BlockfileWriter(directory, table_len=2)
+        for i in range(20):
+            writer.add_entry(f"https://example.com/other{i}", headers, b"<html>other</html>")
+        writer.add_entry(small_url, headers, small_body)
+        writer.add_entry(build_cache_keys(large_url)[0], headers + ["Content-Encoding: gzip"], gzip.compress(large_body))
+        writer.add_entry(large_url + "?plain", headers, large_body)
+        writer.add_entry(long_url, headers, small_body)
+        writer.add_entry("https://example.com/doomed", headers, small_body, state=2)
+        writer.add_entry("https://example.com/image.png", ["HTTP/1.1 200 OK", "Content-Type: image/png"],
+                         b"\x89PNG" + b"\x00" * 8192)
+        writer.write()
+
+        assert is_blockfile_cache(directory)
+        reader = BlockfileCacheReader(directory)
+
+        entry = reader.find_entry(small_url)
+        assert entry is not None, "entry should be found"
+        print(f"Found {entry.key} at {entry.address:#010x} ({entry.path})")
+        assert entry.url == small_url
+        assert entry.read_body() == small_body
+        assert entry.status_code() == 200 and entry.is_html() and entry.charset() == "utf-8"
+        assert entry.last_used == 0x1234
+
+        # Compressed bodies are decoded; large bodies live in external f_XXXXXX files and are read in chunks
+        entries = reader.find_entries(large_url)
+        assert len(entries) == 1
+        assert entries[0].header('content-encoding') == "gzip"
+        assert entries[0].read_decoded_body() == large_body
+        plain = reader.find_entry(large_url + "?plain")
+        assert os.path.basename(reader.address_path(plain.data_addrs[1])).startswith("f_")
+        assert len(list(plain.iter_body(chunk_size=1024))) > 1
+        assert plain.read_body() == large_body
+
+        assert reader.find_entry(long_url).read_body() == small_body
+        assert reader.find_entry("https://example.com/doomed") is None
+        assert reader.find_entry("https://example.com/missing") is None
+        assert not reader.find_entry("https://example.com/image.png").is_html()
+
+        keys = {entry.key for entry in reader.iter_entries()}
+        print(f"Iterated {len(keys)} entries")
+        assert len(keys) == 25 and small_url in keys and "https://example.com/doomed" not in keys
+
+    with tempfile.TemporaryDirectory() as directory:
+        assert not is_blockfile_cache(directory)
+
+    print("Blockfile lookup test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_super_fast_hash() and test_find_entry()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import tempfile
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.cache_events import CoalescingEventQueue
+
+QUIET = 0.05
+
+def append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+def test_coalescing():
+    """Test that repeated events for one file are merged and handed out once after the quiet period"""
+    print("=== Event Coalescing Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "0123456789abcdef_0")
+        other = os.path.join(directory, "fedcba9876543210_0")
+        queue = CoalescingEventQueue(quiet_period=QUIET)
+        for i in range(10):
+            append(path, b"x" * 100)
+            queue.put(path)
+        append(other, b"y" * 100)
+        queue.put(other)
+
+        # Still inside the quiet period
+        assert queue.pop_ready() == []
+        time.sleep(QUIET * 2)
+        assert sorted(queue.pop_ready()) == sorted([path, other])
+        assert queue.pop_ready() == []
+
+        stats = queue.stats()
+        print(f"Stats: {stats}")
+        assert stats == {'events_received': 11, 'events_coalesced': 9, 'files_unsettled': 0,
+                         'files_processed': 2, 'pending': 0}
+
+    print("Event coalescing test passed")
+    return True
+
+def test_settle_check():
+    """Test that a file whose size or mtime changed since its last event is re-timed, not processed"""
+    print("\n=== Event Settle Check Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "0123456789abcdef_0")
+        queue = CoalescingEventQueue(quiet_period=QUIET)
+        append(path, b"x" * 100)
+        queue.put(path)
+
+        # Chrome keeps writing without an event reaching us
+        append(path, b"x" * 100)
+        time.sleep(QUIET * 2)
+        assert queue.pop_ready() == []
+        assert queue.stats()['files_unsettled'] == 1 and queue.stats()['pending'] == 1
+
+        # Unchanged for another quiet period: now it is ready
+        assert queue.pop_ready() == []
+        time.sleep(QUIET * 2)
+        assert queue.pop_ready() == [path]
+
+        # Only the modification time changes
+        queue.put(path)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        time.sleep(QUIET * 2)
+        assert queue.pop_ready() == []
+        assert queue.stats()['files_unsettled'] == 2
+
+        # Deleted before it settled: dropped without being processed
+        os.remove(path)
+        time.sleep(QUIET * 2)
+        assert queue.pop_ready() == []
+
+        # Discarded on a delete event
+        append(path, b"x" * 100)
+        queue.put(path)
+        queue.discard(path)
+        time.sleep(QUIET * 2)
+        assert queue.pop_ready() == []
+
+        stats = queue.stats()
+        print(f"Stats: {stats}")
+        assert stats['files_processed'] == 1 and stats['pending'] == 0 and stats['events_received'] == 3
+
+    print("Event settle check test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_coalescing() and test_settle_check()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
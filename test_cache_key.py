@@ -0,0 +1,78 @@
+import os
+import sys
+import hashlib
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.cache_key import (
+    build_cache_keys, entry_file_name, entry_hash, normalize_cache_url, site_candidates, url_from_cache_key
+)
+
+def test_entry_file_name():
+    """Test that entry file names are the little-endian first 8 bytes of the key's SHA-1"""
+    print("=== Entry File Name Test ===")
+    key = "1/0/https://example.com/"
+    expected = int.from_bytes(hashlib.sha1(key.encode('utf-8')).digest()[:8], 'little')
+    assert entry_hash(key) == expected
+    assert entry_file_name(key) == f"{expected:016x}_0"
+    assert entry_file_name(key, 1) == f"{expected:016x}_1"
+
+    # Small hashes keep their leading zeros so the name matches the file on disk
+    names = {entry_file_name(f"1/0/https://example.com/{i}") for i in range(2000)}
+    assert len(names) == 2000
+    assert all(len(name) == len("0123456789abcdef_0") for name in names)
+    assert any(name.startswith('0') for name in names)
+
+    # Non-ASCII keys are hashed as UTF-8
+    unicode_key = "1/0/https://例子.com/页面"
+    assert entry_hash(unicode_key) == int.from_bytes(
+        hashlib.sha1(unicode_key.encode('utf-8')).digest()[:8], 'little')
+    print("Entry file name test passed")
+    return True
+
+def test_build_cache_keys():
+    """Test the candidate keys built for a URL, including partitioned (_dk_) keys"""
+    print("\n=== Build Cache Keys Test ===")
+    url = "https://news.example.co.uk/a/b?q=1#section"
+    keys = build_cache_keys(url)
+    for key in keys:
+        print(f"  {entry_file_name(key)}  {key}")
+
+    # The fragment never takes part in the key
+    assert normalize_cache_url(url) == "https://news.example.co.uk/a/b?q=1"
+    assert keys[:2] == ["1/0/https://news.example.co.uk/a/b?q=1", "https://news.example.co.uk/a/b?q=1"]
+    assert len(keys) == len(set(keys))
+
+    # Every site guess gets a same-site and a cross-site navigation key
+    sites = site_candidates(url)
+    assert sites == ["https://co.uk", "https://example.co.uk", "https://news.example.co.uk"]
+    for site in sites:
+        assert f"1/0/_dk_{site} {site} https://news.example.co.uk/a/b?q=1" in keys
+        assert f"1/0/_dk_cn_{site} {site} https://news.example.co.uk/a/b?q=1" in keys
+    assert len(keys) == 2 + 2 * len(sites)
+    assert all(url_from_cache_key(key) == "https://news.example.co.uk/a/b?q=1" for key in keys)
+
+    # Short hosts and IP addresses produce a single site
+    assert site_candidates("http://example.com/") == ["http://example.com"]
+    assert site_candidates("http://127.0.0.1:8000/page") == ["http://127.0.0.1"]
+    assert len(build_cache_keys("http://127.0.0.1:8000/page")) == 4
+    assert site_candidates("about:blank") == []
+    assert build_cache_keys("about:blank") == ["1/0/about:blank", "about:blank"]
+
+    # Different URLs map to different candidate files
+    other = {entry_file_name(key) for key in build_cache_keys("https://news.example.co.uk/a/c")}
+    assert not other & {entry_file_name(key) for key in keys}
+    print("Build cache keys test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_entry_file_name() and test_build_cache_keys()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
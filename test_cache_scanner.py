@@ -0,0 +1,104 @@
+import os
+import sys
+import tempfile
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.cache_key import build_cache_keys
+from ChromeHistoryViewer.core.cache_scanner import ParallelCacheScanner, HEAD_READ_SIZE
+from test_simple_cache import write_simple_cache_entry
+
+HEADERS = ["HTTP/1.1 200 OK", "Content-Type: text/html"]
+
+def create_cache(directory, count):
+    """Create count Simple Cache entries, a raw (non Simple Cache) file and a few tiny files"""
+    os.makedirs(os.path.join(directory, "nested"))
+    for i in range(count):
+        url = f"https://example.com/page/{i}"
+        target = directory if i % 2 else os.path.join(directory, "nested")
+        write_simple_cache_entry(target, build_cache_keys(url)[0], HEADERS, b"<html>" + url.encode() + b"</html>")
+    with open(os.path.join(directory, "raw_file"), 'wb') as f:
+        f.write(b"\0" * 200 + b"https://raw.example.com/page " + b"x" * 200)
+    for i in range(5):
+        with open(os.path.join(directory, f"tiny_{i}"), 'wb') as f:
+            f.write(b"tiny")
+
+def test_sharding():
+    """Test that the directory walk recurses, skips tiny files and cuts fixed-size shards"""
+    print("=== Cache Scanner Sharding Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        create_cache(directory, 95)
+        scanner = ParallelCacheScanner(shard_size=10, io_workers=2, process_workers=0)
+        shards = list(scanner.iter_shards([directory, os.path.join(directory, "missing")]))
+        sizes = [len(shard) for shard in shards]
+        print(f"Shard sizes: {sizes}")
+        assert sum(sizes) == 96 and sizes[:-1] == [10] * (len(sizes) - 1) and 0 < sizes[-1] <= 10
+        paths = [path for shard in shards for path, _ in shard]
+        assert len(set(paths)) == 96
+        assert not any(os.path.basename(path).startswith("tiny_") for path in paths)
+        assert sum(1 for path in paths if os.sep + "nested" + os.sep in path) == 48
+
+    print("Cache scanner sharding test passed")
+    return True
+
+def test_scan_matches_and_stats():
+    """Test that matches from Simple Cache keys and raw files are reported with correct stats"""
+    print("\n=== Cache Scanner Match Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        create_cache(directory, 95)
+        watched = ["https://example.com/page/3", "https://example.com/page/40#frag",
+                   "https://raw.example.com/page", "https://example.com/not-cached"]
+        for process_workers in (0, 2):
+            scanner = ParallelCacheScanner(shard_size=10, io_workers=2, process_workers=process_workers)
+            matches = []
+            try:
+                stats = scanner.scan([directory], watched, lambda path, url: matches.append((path, url)))
+            finally:
+                scanner.close()
+            print(f"process_workers={process_workers}: {stats.summary()}")
+            found = {url: os.path.basename(path) for path, url in matches}
+            assert set(found) == {"https://example.com/page/3", "https://example.com/page/40#frag",
+                                  "https://raw.example.com/page"}
+            assert found["https://raw.example.com/page"] == "raw_file"
+            assert stats.files == 96 and stats.matches == 3
+            assert 0 < stats.bytes_read <= 96 * HEAD_READ_SIZE
+            assert stats.elapsed > 0 and scanner.last_stats is stats
+
+    print("Cache scanner match test passed")
+    return True
+
+def test_cancellation():
+    """Test that a scan stops reading shards once should_continue() returns False"""
+    print("\n=== Cache Scanner Cancellation Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        create_cache(directory, 500)
+        scanner = ParallelCacheScanner(shard_size=10, io_workers=2, process_workers=0)
+        checks = []
+
+        def should_continue():
+            checks.append(True)
+            return len(checks) <= 1
+
+        try:
+            stats = scanner.scan([directory], ["https://example.com/page/499"], lambda path, url: None,
+                                 should_continue)
+        finally:
+            scanner.close()
+        print(f"Cancelled scan: {stats.summary()}")
+        # Only the shards already in flight (io_workers + 2) can finish
+        assert stats.files <= (2 + 2) * 10
+
+    print("Cache scanner cancellation test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_sharding() and test_scan_matches_and_stats() and test_cancellation()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
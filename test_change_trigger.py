@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import threading
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.change_trigger import ChangeTrigger
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_debounce_and_safety_poll():
+    """Test debounce from the first change and the slow safety poll with a fake clock"""
+    print("=== Change Trigger Test ===")
+    clock = FakeClock()
+    trigger = ChangeTrigger(debounce=0.3, safety_interval=60, clock=clock)
+    assert trigger.next_delay() == 60
+
+    # A burst of writes is debounced from the first one, so it cannot postpone the poll forever
+    trigger.notify()
+    for _ in range(5):
+        clock.now += 0.1
+        trigger.notify()
+    assert trigger.next_delay() == 0
+    trigger.begin_poll()
+    assert abs(trigger.next_delay() - 60) < 1e-9
+
+    # Without changes only the safety poll fires
+    clock.now += 59
+    assert abs(trigger.next_delay() - 1) < 1e-9
+    clock.now += 1
+    assert trigger.next_delay() == 0
+    trigger.begin_poll()
+
+    # A write that lands while the query is running is not lost: it is debounced into the next poll
+    clock.now += 0.1
+    trigger.notify()
+    clock.now += 0.1
+    assert abs(trigger.next_delay() - 0.2) < 1e-9
+    clock.now += 0.2
+    assert trigger.next_delay() == 0
+    trigger.begin_poll()
+    assert abs(trigger.next_delay() - 60) < 1e-9
+    print(f"Stats: {trigger.stats()}")
+    assert trigger.stats() == {'events': 7, 'change_polls': 2, 'safety_polls': 1}
+
+    print("Change trigger test passed")
+    return True
+
+def test_wakeup_latency():
+    """Test that a waiting poller wakes shortly after a change and stops promptly"""
+    print("\n=== Change Trigger Wakeup Test ===")
+    trigger = ChangeTrigger(debounce=0.2, safety_interval=60)
+    woke = []
+
+    def poll_loop():
+        while trigger.wait():
+            trigger.begin_poll()
+            woke.append(time.monotonic())
+
+    thread = threading.Thread(target=poll_loop, daemon=True)
+    thread.start()
+    time.sleep(0.3)
+    assert woke == [], "nothing changed, so the poller stays asleep"
+
+    changed = time.monotonic()
+    trigger.notify()
+    time.sleep(0.5)
+    assert len(woke) == 1
+    latency = woke[0] - changed
+    print(f"Change-to-poll latency: {latency * 1000:.0f} ms")
+    assert 0.2 <= latency < 1.0
+
+    start = time.monotonic()
+    trigger.stop()
+    thread.join(2)
+    assert not thread.is_alive() and time.monotonic() - start < 0.5
+
+    print("Change trigger wakeup test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_debounce_and_safety_poll() and test_wakeup_latency()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
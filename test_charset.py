@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import codecs
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core import charset
+from ChromeHistoryViewer.core.charset import (
+    decode_html, detect_charset, meta_charset, normalize_charset, resolve_charset
+)
+
+TEXT = "中文网页的正文内容，用来测试字符集判断。" * 50
+
+def page(meta: str = '') -> str:
+    return f"<html><head>{meta}<title>测试</title></head><body><p>{TEXT}</p></body></html>"
+
+def test_resolution_order():
+    """Test that BOM, header, meta and detection are consulted in order"""
+    print("=== Charset Resolution Test ===")
+    assert normalize_charset("GB2312") == "gb18030"
+    assert normalize_charset("ISO-8859-1") == "cp1252"
+    assert normalize_charset("'UTF-8'") == "utf-8"
+    assert normalize_charset("no-such-charset") == ""
+
+    gbk_body = page('<meta charset="gbk">').encode('gbk')
+    # A BOM wins over any declaration
+    assert resolve_charset(codecs.BOM_UTF8 + page().encode('utf-8'), 'gbk') == 'utf-8'
+    assert decode_html(codecs.BOM_UTF8 + page().encode('utf-8')) == page()
+    # The header declaration wins over <meta>
+    assert resolve_charset(gbk_body, 'gb2312') == 'gb18030'
+    assert resolve_charset(page('<meta charset="utf-8">').encode('utf-8'), 'bogus') == 'utf-8'
+    # <meta charset> and the http-equiv form are both found
+    assert resolve_charset(gbk_body) == 'gb18030'
+    http_equiv = '<meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS">'
+    assert meta_charset(page(http_equiv).encode('utf-8')) == 'shift_jis'
+    # An ASCII-readable utf-16 declaration is wrong by definition
+    assert meta_charset(b'<meta charset="utf-16">') == 'utf-8'
+    assert decode_html(gbk_body) == page('<meta charset="gbk">')
+
+    # Only the beginning of the body is searched for <meta>
+    late_meta = b"<!-- " + b"x" * 8192 + b" -->" + page('<meta charset="gbk">').encode('gbk')
+    assert meta_charset(late_meta) == ''
+
+    # Undeclared utf-8 is recognised, even when the sample ends inside a character
+    utf8_body = page().encode('utf-8')
+    assert detect_charset(utf8_body) == 'utf-8'
+    assert detect_charset(utf8_body * 200) == 'utf-8'
+    if charset.charset_normalizer is not None or charset.chardet is not None:
+        detected = detect_charset(page().encode('gb18030'))
+        print(f"Detected undeclared GB18030 page as: {detected}")
+        assert page().encode('gb18030').decode(detected) == page()
+
+    print("Charset resolution test passed")
+    return True
+
+def test_bounded_detection():
+    """Test that detection time does not grow with the body size"""
+    print("\n=== Bounded Detection Test ===")
+    small = page().encode('gb18030')
+    large = small * 2000
+    timings = {}
+    for name, body in (("small", small), ("large", large)):
+        start = time.perf_counter()
+        resolve_charset(body)
+        timings[name] = time.perf_counter() - start
+    print(f"Body sizes {len(small)}/{len(large)} bytes, detection took "
+          f"{timings['small'] * 1000:.1f}/{timings['large'] * 1000:.1f} ms")
+    assert timings['large'] < max(timings['small'] * 20, 0.5)
+
+    print("Bounded detection test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_resolution_order() and test_bounded_detection()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.cookie_store import CookieStore, chrome_now
+
+def create_cookies_db(path, rows):
+    """Create a Cookies database with the columns Chrome uses"""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS cookies (
+            creation_utc INTEGER NOT NULL, host_key TEXT NOT NULL, name TEXT NOT NULL,
+            value TEXT NOT NULL, path TEXT NOT NULL, expires_utc INTEGER NOT NULL,
+            is_secure INTEGER NOT NULL, is_httponly INTEGER NOT NULL
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO cookies VALUES (0, ?, ?, ?, ?, ?, ?, 0)',
+        [(host, name, value, path, expires, secure) for host, name, value, path, expires, secure in rows]
+    )
+    conn.commit()
+    conn.close()
+
+def test_snapshot_reload():
+    """Test that the database is loaded once and reloaded only when the file changes"""
+    print("=== Cookie Snapshot Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "Cookies")
+        create_cookies_db(path, [
+            (".example.com", "sid", "abc", "/", 0, 1),
+            ("www.example.com", "lang", "zh", "/", 0, 0),
+        ])
+
+        store = CookieStore(path)
+        for _ in range(60):
+            cookies = store.get_cookies("https://www.example.com/")
+        print(f"Cookies: {cookies}, stats: {store.stats()}")
+        assert cookies == {"sid": "abc", "lang": "zh"}
+        assert store.stats()['loads'] == 1 and store.stats()['lookups'] == 60
+
+        # Changing the source file invalidates the snapshot
+        time.sleep(0.01)
+        create_cookies_db(path, [(".example.com", "token", "xyz", "/", 0, 0)])
+        assert store.get_cookies("https://www.example.com/")["token"] == "xyz"
+        assert store.stats()['loads'] == 2
+
+        os.remove(path)
+        assert store.get_cookies("https://www.example.com/") == {}
+
+    print("Cookie snapshot test passed")
+    return True
+
+def test_domain_matching():
+    """Test RFC 6265 domain, path, secure and expiry matching"""
+    print("\n=== Cookie Matching Test ===")
+    expired = chrome_now() - 1000000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "Cookies")
+        create_cookies_db(path, [
+            (".a.com", "domain", "1", "/", 0, 0),
+            ("a.com", "host_only", "1", "/", 0, 0),
+            ("nota.com", "other_site", "1", "/", 0, 0),
+            (".sub.a.com", "sub", "1", "/", 0, 0),
+            (".a.com", "secure", "1", "/", 0, 1),
+            (".a.com", "expired", "1", "/", expired, 0),
+            (".a.com", "docs", "1", "/docs", 0, 0),
+            (".a.com", "pref", "root", "/", 0, 0),
+            (".a.com", "pref", "docs", "/docs/", 0, 0),
+            ("127.0.0.1", "local", "1", "/", 0, 0),
+        ])
+        store = CookieStore(path)
+
+        cookies = store.get_cookies("https://a.com/")
+        print(f"https://a.com/: {sorted(cookies)}")
+        assert sorted(cookies) == ["domain", "host_only", "pref", "secure"]
+
+        # Subdomains get domain cookies but not host-only ones, and a.com never matches nota.com
+        cookies = store.get_cookies("http://x.sub.a.com/index.html")
+        assert sorted(cookies) == ["domain", "pref", "sub"]
+        assert "domain" not in store.get_cookies("https://nota.com/")
+
+        # Path matching: /docs matches /docs and /docs/..., not /docsearch
+        assert "docs" in store.get_cookies("https://a.com/docs")
+        assert store.get_cookies("https://a.com/docs/page")["pref"] == "docs"
+        assert "docs" not in store.get_cookies("https://a.com/docsearch")
+
+        assert store.get_cookies("http://127.0.0.1:8000/") == {"local": "1"}
+        assert store.get_cookies("not a url") == {}
+
+    print("Cookie matching test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_snapshot_reload() and test_domain_matching()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.history_reader import HistoryReader
+from ChromeHistoryViewer.core.history_loader import HistoryLoader
+from ChromeHistoryViewer.core.url_store import ProcessedUrlStore
+from ChromeHistoryViewer.ui.history_model import HistoryTableModel
+
+BASE_TIME = 13300000000000000
+NUM_URLS = 100000
+
+def create_history(path):
+    """Create a History database with NUM_URLS rows"""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE urls (
+            id INTEGER PRIMARY KEY, url TEXT, title TEXT,
+            visit_count INTEGER, last_visit_time INTEGER
+        )
+    ''')
+    conn.executemany('INSERT INTO urls (url, title, visit_count, last_visit_time) VALUES (?, ?, ?, ?)',
+                     ((f"https://example.com/{i}", f"Page {i}", 1, BASE_TIME + i * 1000000) for i in range(NUM_URLS)))
+    conn.commit()
+    conn.close()
+
+def spin(app, condition, timeout=10.0):
+    """Process events until condition() holds; return the longest time one pass kept the loop busy"""
+    deadline = time.perf_counter() + timeout
+    longest = 0.0
+    while not condition():
+        assert time.perf_counter() < deadline, "timed out waiting for the loader"
+        start = time.perf_counter()
+        app.processEvents()
+        longest = max(longest, time.perf_counter() - start)
+        time.sleep(0.001)
+    return longest
+
+def test_interrupt():
+    """Test that a running query can be aborted from another thread"""
+    print("=== History Reader Interrupt Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "History")
+        create_history(path)
+        reader = HistoryReader(path)
+        errors = []
+
+        def endless_query():
+            try:
+                reader.query('WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c')
+            except sqlite3.OperationalError as e:
+                errors.append(e)
+
+        try:
+            thread = threading.Thread(target=endless_query)
+            thread.start()
+            while reader.active is None:
+                time.sleep(0.01)
+            start = time.perf_counter()
+            reader.interrupt()
+            thread.join(5)
+            assert not thread.is_alive()
+            print(f"Query aborted {(time.perf_counter() - start) * 1000:.1f} ms after interrupt(): {errors[0]}")
+            assert len(errors) == 1 and 'interrupted' in str(errors[0])
+
+            # The reader keeps working afterwards
+            assert reader.query('SELECT COUNT(*) FROM urls') == [(NUM_URLS,)]
+            reader.interrupt()  # nothing running: no effect
+        finally:
+            reader.close()
+
+    print("History reader interrupt test passed")
+    return True
+
+def test_loader():
+    """Test that all pages stream into the model through signals without blocking the event loop"""
+    print("\n=== History Loader Test ===")
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "History")
+        create_history(path)
+        store = ProcessedUrlStore(os.path.join(directory, "processed_urls.db"))
+        model = HistoryTableModel(store)
+        pages, fetched = [], []
+        model.rows_fetched.connect(fetched.extend)
+        try:
+            loader = HistoryLoader(1, 1234, path, page_size=500)
+            loader.page_loaded.connect(lambda load_id, records: (pages.append((load_id, len(records))),
+                                                                 model.append_records(records)))
+            model.reset()
+            start = time.perf_counter()
+            loader.start()
+            assert time.perf_counter() - start < 0.05
+
+            # Every page up to the limit is read without the view asking for more
+            longest = spin(app, lambda: model.rowCount() == 1234)
+            print(f"All pages after {(time.perf_counter() - start) * 1000:.0f} ms, "
+                  f"longest event loop pass {longest * 1000:.1f} ms")
+            assert pages == [(1, 500), (1, 500), (1, 234)] and len(fetched) == 1234
+            assert model.index(0, 2).data() == f"https://example.com/{NUM_URLS - 1}"
+            assert loader.wait(5000) and not loader.is_running
+            # The access check plus a single query for all pages
+            assert loader.reader.stats()['queries'] == 2
+        finally:
+            store.close()
+
+    print("History loader test passed")
+    return True
+
+def test_cancel_and_errors():
+    """Test that a cancelled load reports nothing and a missing History reports access denied"""
+    print("\n=== History Loader Cancel Test ===")
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "History")
+        create_history(path)
+        events = []
+
+        loader = HistoryLoader(2, NUM_URLS, path, page_size=NUM_URLS)
+        for signal in (loader.page_loaded, loader.access_denied, loader.load_failed):
+            signal.connect(lambda load_id, value: events.append(load_id))
+        loader.start()
+        loader.stop()
+        assert loader.wait(5000)
+        app.processEvents()
+        assert events == [] and not loader.is_running
+
+        missing = HistoryLoader(3, 10, os.path.join(directory, "Missing"))
+        denied = []
+        missing.access_denied.connect(lambda load_id, message: denied.append((load_id, message)))
+        missing.start()
+        spin(app, lambda: denied)
+        assert denied[0][0] == 3 and "不存在" in denied[0][1]
+        assert missing.wait(5000)
+
+    print("History loader cancel test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_interrupt() and test_loader() and test_cancel_and_errors()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QTableView
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.history_reader import HistoryReader
+from ChromeHistoryViewer.core.url_store import ProcessedUrlStore
+from ChromeHistoryViewer.ui.history_model import HistoryTableModel
+
+BASE_TIME = 13300000000000000
+NUM_URLS = 100000
+
+LATEST_SQL = 'SELECT title, url, last_visit_time, visit_count FROM urls ORDER BY last_visit_time DESC, id DESC LIMIT ?'
+
+def create_history(path):
+    """Create a History database with NUM_URLS rows; every 10 rows share a visit time"""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE urls (
+            id INTEGER PRIMARY KEY, url TEXT, title TEXT,
+            visit_count INTEGER, last_visit_time INTEGER
+        )
+    ''')
+    conn.executemany('INSERT INTO urls (url, title, visit_count, last_visit_time) VALUES (?, ?, ?, ?)',
+                     ((f"https://example.com/{i}", f"Page {i}" if i % 7 else None, i % 5 + 1,
+                       BASE_TIME + (i // 10) * 1000000) for i in range(NUM_URLS)))
+    conn.commit()
+    conn.close()
+
+def test_model():
+    """Test appending streamed pages, stable row ids, in-place status updates and flat memory"""
+    print("\n=== History Table Model Test ===")
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "History")
+        create_history(path)
+        reader = HistoryReader(path)
+        store = ProcessedUrlStore(os.path.join(directory, "processed_urls.db"))
+        store.add(f"https://example.com/{NUM_URLS - 2}")
+        model = HistoryTableModel(store)
+        view = QTableView()
+        view.setModel(model)
+        fetched = []
+        model.rows_fetched.connect(fetched.extend)
+        try:
+            tracemalloc.start()
+            start = time.perf_counter()
+            model.reset()
+            reader.query_pages(LATEST_SQL, (NUM_URLS,), 500, lambda rows: model.append_records(rows) or True)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"All {NUM_URLS} records in pages of 500: {model.rowCount()} rows in "
+                  f"{elapsed * 1000:.0f} ms, peak {peak / 1024:.0f} KB")
+            assert model.rowCount() == NUM_URLS and len(fetched) == NUM_URLS
+            assert [row_id for row_id, _, _, _ in fetched] == list(range(NUM_URLS))
+            assert peak < 64 * 1024 * 1024
+
+            # Rows already processed are marked and not reported for conversion
+            assert model.index(1, 0).data() == "已存在"
+            assert model.index(0, 0).data() == "准备中"
+            assert fetched[1] == (1, f"Page {NUM_URLS - 2}", f"https://example.com/{NUM_URLS - 2}", True)
+            assert model.index(0, 3).data().startswith("20")
+
+            # Row ids stay valid when new records are inserted at the top
+            row_id = fetched[600][0]
+            new_id = model.prepend_record("New visit", "https://new.com/", BASE_TIME * 2, 1)
+            assert new_id == -1 and model.rowCount() == NUM_URLS + 1
+            assert model.index(0, 2).data() == "https://new.com/"
+            assert model.record(row_id) == (fetched[600][1], fetched[600][2])
+            assert model.find_url("https://new.com/") == -1
+
+            changes = []
+            model.dataChanged.connect(lambda top_left, bottom_right, roles: changes.append(
+                (top_left.row(), top_left.column(), bottom_right.row(), bottom_right.column())))
+            model.set_status(row_id, True, "完成(缓存)")
+            model.set_status(new_id, False, "未缓存且请求失败")
+            assert changes == [(601, 0, 601, 0), (0, 0, 0, 0)]
+            assert model.index(601, 0).data() == "完成(缓存)"
+            assert model.index(0, 0).data() == "未缓存且请求失败"
+
+            # A reset starts over with empty storage and fresh row ids
+            model.reset()
+            fetched.clear()
+            model.append_records(reader.query(LATEST_SQL, (10,)))
+            assert model.rowCount() == 10 and fetched[0][0] == 0 and model.find_url("https://new.com/") is None
+        finally:
+            store.close()
+            reader.close()
+    del view
+    app.processEvents()
+
+    print("History table model test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_model()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
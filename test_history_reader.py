@@ -0,0 +1,228 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.history_reader import HistoryReader
+
+def create_history(path, journal_mode='delete'):
+    """Create a minimal History database with the columns the viewer reads"""
+    conn = sqlite3.connect(path)
+    conn.execute(f'PRAGMA journal_mode={journal_mode}')
+    conn.execute('''
+        CREATE TABLE urls (
+            id INTEGER PRIMARY KEY, url TEXT, title TEXT,
+            visit_count INTEGER, last_visit_time INTEGER
+        )
+    ''')
+    conn.executemany('INSERT INTO urls (url, title, visit_count, last_visit_time) VALUES (?, ?, ?, ?)',
+                     [(f"https://example.com/{i}", f"Page {i}", 1, 13300000000000000 + i) for i in range(100)])
+    conn.commit()
+    return conn
+
+def lock_exclusively(conn):
+    """Hold the database the way a running Chrome does"""
+    conn.execute('PRAGMA locking_mode=EXCLUSIVE')
+    conn.execute('UPDATE urls SET visit_count = visit_count + 1 WHERE id = 1')
+    conn.commit()
+
+def make_reader(path, **kwargs):
+    reader = HistoryReader(path, busy_timeout=0.1, **kwargs)
+    reader.snapshot_path = path + '-test-snapshot'
+    return reader
+
+def test_in_place_reads():
+    """Test that an unlocked or rollback-journal History is read without copying"""
+    print("=== History Reader In-Place Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "History")
+        writer = create_history(path)
+        reader = make_reader(path)
+        try:
+            # Unlocked: the long-lived read-only connection sees new commits
+            assert reader.query('SELECT COUNT(*) FROM urls') == [(100,)]
+            writer.execute("INSERT INTO urls (url, title, visit_count, last_visit_time) VALUES ('https://new.com/', 'New', 1, 13400000000000000)")
+            writer.commit()
+            assert reader.query('SELECT MAX(last_visit_time) FROM urls') == [(13400000000000000,)]
+            assert reader.stats()['live'] == 2
+
+            # The read-only connection cannot modify History
+            try:
+                reader.query("DELETE FROM urls")
+                assert False, "writes must fail"
+            except sqlite3.OperationalError:
+                pass
+
+            # Locked by the browser: read without locking instead of copying
+            lock_exclusively(writer)
+            rows = reader.query('SELECT title FROM urls ORDER BY last_visit_time DESC LIMIT ?', (1,))
+            assert rows == [("New",)]
+            stats = reader.stats()
+            print(f"Stats: {stats}")
+            assert stats['immutable'] == 1 and stats['snapshots'] == 0 and stats['bytes_copied'] == 0
+        finally:
+            reader.close()
+            writer.close()
+
+    print("History reader in-place test passed")
+    return True
+
+def test_wal_snapshot():
+    """Test that a locked History with pending WAL frames falls back to a snapshot"""
+    print("\n=== History Reader WAL Snapshot Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "History")
+        writer = create_history(path, journal_mode='wal')
+        writer.execute('PRAGMA wal_autocheckpoint=0')
+        lock_exclusively(writer)
+        writer.execute("INSERT INTO urls (url, title, visit_count, last_visit_time) VALUES ('https://wal.com/', 'Only in WAL', 1, 13500000000000000)")
+        writer.commit()
+        assert os.path.getsize(path + '-wal') > 0
+
+        reader = make_reader(path)
+        try:
+            rows = reader.query('SELECT title FROM urls ORDER BY last_visit_time DESC LIMIT 1')
+            stats = reader.stats()
+            print(f"Rows: {rows}, stats: {stats}")
+            assert rows == [("Only in WAL",)]
+            assert stats['snapshots'] == 1 and stats['last_bytes_copied'] == stats['bytes_copied'] > 0
+            assert not any(name.startswith("History-test-snapshot") for name in os.listdir(directory))
+        finally:
+            reader.close()
+            writer.close()
+
+    print("History reader WAL snapshot test passed")
+    return True
+
+def test_remembered_lock():
+    """Test that a known lock skips the busy wait and the read-only connection is re-probed later"""
+    print("\n=== History Reader Lock State Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "History")
+        writer = create_history(path)
+        reader = make_reader(path, lock_recheck_interval=0.5)
+        reader.busy_timeout = 0.3
+        try:
+            assert reader.query('SELECT COUNT(*) FROM urls') == [(100,)]
+            live_conn = reader.conn
+            lock_exclusively(writer)
+
+            # The first query finds the lock after the busy timeout
+            start = time.perf_counter()
+            assert reader.query('SELECT COUNT(*) FROM urls') == [(100,)]
+            assert time.perf_counter() - start >= 0.25
+
+            # Later queries go straight to the lock-free read
+            start = time.perf_counter()
+            for _ in range(5):
+                assert reader.query('SELECT COUNT(*) FROM urls') == [(100,)]
+            elapsed = time.perf_counter() - start
+            stats = reader.stats()
+            print(f"5 queries while locked took {elapsed * 1000:.1f} ms, stats: {stats}")
+            assert elapsed < 0.2
+            assert stats['locked'] == 1 and stats['immutable'] == 6 and stats['live'] == 1
+            # The long-lived connection survives the lock
+            assert reader.conn is live_conn
+
+            # Once the browser lets go, the read-only connection is used again after the recheck interval
+            writer.close()
+            writer = None
+            time.sleep(0.6)
+            assert reader.query('SELECT COUNT(*) FROM urls') == [(100,)]
+            assert reader.stats()['live'] == 2 and reader.conn is live_conn
+        finally:
+            reader.close()
+            if writer is not None:
+                writer.close()
+
+    print("History reader lock state test passed")
+    return True
+
+def test_journal_snapshot():
+    """Test that a locked History in the middle of a commit is never read in place"""
+    print("\n=== History Reader Rollback Journal Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "History")
+        writer = create_history(path)
+        writer.execute('PRAGMA locking_mode=EXCLUSIVE')
+        writer.execute('PRAGMA cache_size=1')
+        # An open transaction that has already spilled pages into the database file
+        writer.execute('BEGIN')
+        writer.execute("UPDATE urls SET title = 'Uncommitted ' || title")
+        writer.executemany('INSERT INTO urls (url, title, visit_count, last_visit_time) VALUES (?, ?, ?, ?)',
+                           [(f"https://uncommitted.com/{i}", "x" * 500, 1, 13600000000000000 + i) for i in range(500)])
+        with open(path + '-journal', 'rb') as f:
+            assert f.read(8) == bytes.fromhex('d9d505f920a163d7')
+
+        reader = make_reader(path)
+        try:
+            rows = reader.query("SELECT COUNT(*), SUM(title LIKE 'Uncommitted%') FROM urls")
+            stats = reader.stats()
+            print(f"Rows: {rows}, stats: {stats}")
+            # The snapshot rolls the copied journal back to the last committed state
+            assert rows == [(100, 0)]
+            assert stats['immutable'] == 0 and stats['snapshots'] == 1
+            assert not any(name.startswith("History-test-snapshot") for name in os.listdir(directory))
+        finally:
+            reader.close()
+            writer.rollback()
+            writer.close()
+
+    print("History reader rollback journal test passed")
+    return True
+
+def test_query_pages():
+    """Test that one query is streamed in fixed-size pages, also from the lock-free fallback"""
+    print("\n=== History Reader Paged Query Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "History")
+        writer = create_history(path)
+        reader = make_reader(path)
+        sql = 'SELECT id FROM urls ORDER BY last_visit_time DESC LIMIT ?'
+        try:
+            for locked in (False, True):
+                if locked:
+                    lock_exclusively(writer)
+                pages = []
+                assert reader.query_pages(sql, (100,), 30, lambda rows: pages.append(rows) or True) == 100
+                assert [len(page) for page in pages] == [30, 30, 30, 10]
+                assert [row[0] for page in pages for row in page] == list(range(100, 0, -1))
+
+                # An exact multiple of the page size does not produce a trailing empty page
+                pages = []
+                assert reader.query_pages(sql, (60,), 30, lambda rows: pages.append(rows) or True) == 60
+                assert [len(page) for page in pages] == [30, 30]
+
+            # Stopping early, and an empty result reported once
+            pages = []
+            assert reader.query_pages(sql, (100,), 30, lambda rows: pages.append(rows) and False) == 30
+            assert len(pages) == 1
+            pages = []
+            assert reader.query_pages(sql, (0,), 30, lambda rows: pages.append(rows) or True) == 0
+            assert pages == [[]]
+
+            stats = reader.stats()
+            print(f"Stats: {stats}")
+            assert stats['queries'] == 6 and stats['live'] == 2 and stats['immutable'] == 4
+        finally:
+            reader.close()
+            writer.close()
+
+    print("History reader paged query test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = (test_in_place_reads() and test_wal_snapshot() and test_remembered_lock()
+               and test_journal_snapshot() and test_query_pages())
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
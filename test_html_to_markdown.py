@@ -1,14 +1,22 @@
 import os
 import sys
+import atexit
+import shutil
+import tempfile
 import html2text
 from pathlib import Path
 
+# Keep the validator and cookie stores opened by the downloader out of the real profile
+os.environ["HOME"] = tempfile.mkdtemp(prefix="markdown_home_")
+atexit.register(shutil.rmtree, os.environ["HOME"], True)
+
 # Add the parent directory to the path so we can import the ChromeHistoryViewer modules
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
 from ChromeHistoryViewer.core.page_downloader import WebPageDownloader
+from ChromeHistoryViewer.core.url_store import ProcessedUrlStore
 
 def test_html_to_markdown_conversion():
     """Test the HTML to Markdown conversion functionality"""
@@ -70,8 +78,10 @@ def test_html_to_markdown_conversion():
     # Test using the WebPageDownloader class
     print("\n=== WebPageDownloader Test ===")
     
-    # Create a minimal downloader instance
-    downloader = WebPageDownloader([], test_dir)
+    # Create a minimal downloader instance; saved URLs go to a temporary store, not the user's real one
+    store_dir = tempfile.TemporaryDirectory()
+    url_store = ProcessedUrlStore(os.path.join(store_dir.name, "processed_urls.db"))
+    downloader = WebPageDownloader([], test_dir, url_store=url_store)
     
     # Use the save_as_markdown method
     test_url = "https://example.com/test"
@@ -80,6 +90,7 @@ def test_html_to_markdown_conversion():
     try:
         downloader.save_as_markdown(0, test_title, test_url, sample_html, "test")
         print("Successfully saved using WebPageDownloader")
+        print(f"Marked as processed: {test_url in url_store}")
         
         # Check the file
         expected_file = os.path.join(test_dir, f"{test_title}.md")
@@ -96,6 +107,9 @@ def test_html_to_markdown_conversion():
             print(f"File not created: {expected_file}")
     except Exception as e:
         print(f"Error saving markdown: {str(e)}")
+    finally:
+        url_store.close()
+        store_dir.cleanup()
     
     print("\n=== Test Complete ===")
 
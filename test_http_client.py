@@ -0,0 +1,70 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.http_client import HttpClient
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Local stand-in server that keeps connections open and echoes the Cookie header"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = (self.headers.get('Cookie') or '').encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Set-Cookie', 'server=1; Path=/')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_connection_reuse():
+    """Test that requests to one host share keep-alive connections across threads"""
+    print("=== HTTP Connection Reuse Test ===")
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/page"
+
+    try:
+        client = HttpClient(pool_hosts=4, pool_maxsize=4, timeout=(2, 5))
+        for _ in range(20):
+            assert client.get(url).status_code == 200
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            statuses = list(pool.map(lambda _: client.get(url).status_code, range(40)))
+        assert statuses == [200] * 40
+
+        stats = client.stats()
+        print(f"Stats: {stats}")
+        assert stats['requests'] == 60
+        assert stats['connections'] <= 5, "keep-alive connections should be reused"
+        assert stats['reused'] == stats['requests'] - stats['connections']
+
+        # Per-request cookies are sent, cookies set by the server are not kept
+        assert client.get(url, cookies={'sid': 'abc'}).text == 'sid=abc'
+        assert client.get(url).text == ''
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("HTTP connection reuse test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_connection_reuse()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
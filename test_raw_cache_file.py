@@ -0,0 +1,98 @@
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+
+# Keep the cache index and other app files created by the monitor out of the real profile
+os.environ["HOME"] = tempfile.mkdtemp(prefix="raw_cache_home_")
+atexit.register(shutil.rmtree, os.environ["HOME"], True)
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.url_matcher import UrlMatcher
+from ChromeHistoryViewer.core.cache_monitor import ChromeCacheMonitor
+
+PARAGRAPH = "<p>" + "缓存正文内容 cached body text " * 60 + "</p>"
+
+def write_file(directory, name, data):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+def make_monitor(urls):
+    """A cache monitor that records emitted content and background fetches instead of requesting"""
+    monitor = ChromeCacheMonitor()
+    emitted, fetched = [], []
+    monitor.content_ready.connect(lambda url, content: emitted.append((url, content)))
+    monitor.fetch_in_background = lambda urls: fetched.extend(urls)
+    for url in urls:
+        monitor.url_patterns.add(url)
+    return monitor, emitted, fetched
+
+def test_search_file():
+    """Test matching watched URLs directly on a memory-mapped file"""
+    print("=== Raw Cache File Match Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        matcher = UrlMatcher(["https://a.example.com/x", "https://b.example.com/y", "https://c.example.com/"])
+        data = b"\x00\x01" * 5000 + b"https://a.example.com/x?q=1" + b"\xff" * 3000 + b"https://c.example.com/"
+        path = write_file(directory, "f_000001", data)
+        assert matcher.search_file(path) == {"https://a.example.com/x", "https://c.example.com/"}
+        assert matcher.search_file(path) == matcher.search(data)
+
+        # Empty files cannot be mapped and simply have no matches
+        assert matcher.search_file(write_file(directory, "empty", b"")) == set()
+
+    print("Raw cache file match test passed")
+    return True
+
+def test_extract_from_raw():
+    """Test extracting HTML from a raw cache file and decoding only the extracted part"""
+    print("\n=== Raw Cache File Extract Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        url = "https://raw.example.com/article"
+        html = f"<html><head><meta charset=\"utf-8\"></head><body>{PARAGRAPH}</body></html>"
+        path = write_file(directory, "f_000002",
+                          b"\x00" * 64 + url.encode() + b"\x00\x02\x03\xfe" + html.encode('utf-8') + b"\x00\xff" * 32)
+        monitor, emitted, fetched = make_monitor([url, "https://raw.example.com/other"])
+        monitor.process_raw_cache_file(path)
+        assert len(emitted) == 1 and emitted[0][0] == url
+        assert emitted[0][1] == html and fetched == []
+        # The URL is no longer watched, the unmatched one still is
+        assert monitor.url_patterns == {"https://raw.example.com/other"}
+
+        # Only a <body> is present: it is wrapped in a minimal document
+        url = "https://raw.example.com/body-only"
+        path = write_file(directory, "f_000003", url.encode() + b"\x00" + f"<body>{PARAGRAPH}</body>".encode('utf-8'))
+        monitor, emitted, fetched = make_monitor([url])
+        monitor.process_raw_cache_file(path)
+        assert len(emitted) == 1
+        assert emitted[0][1] == f"<html><head><title>{url}</title></head><body>{PARAGRAPH}</body></html>"
+
+        # The URL is there but no usable HTML: fall back to a direct request
+        url = "https://raw.example.com/no-html"
+        path = write_file(directory, "f_000004", b"\x00" * 100 + url.encode() + b"\x00" * 100)
+        monitor, emitted, fetched = make_monitor([url])
+        monitor.process_raw_cache_file(path)
+        assert emitted == [] and fetched == [url] and monitor.url_patterns == {url}
+
+        # Files without any watched URL produce nothing
+        monitor, emitted, fetched = make_monitor(["https://raw.example.com/unrelated"])
+        monitor.process_raw_cache_file(write_file(directory, "f_000005", html.encode('utf-8')))
+        assert emitted == [] and fetched == []
+
+    print("Raw cache file extract test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_search_file() and test_extract_from_raw()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
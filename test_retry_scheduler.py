@@ -0,0 +1,135 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.cookie_store import CookieStore
+from ChromeHistoryViewer.core.validator_store import ValidatorStore
+from ChromeHistoryViewer.core.async_fetcher import AsyncFetcher
+from ChromeHistoryViewer.core.retry_scheduler import RetryScheduler, is_retryable, parse_retry_after
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_scheduler():
+    """Test backoff, jitter, ordering and attempt limits with a fake clock"""
+    print("=== Retry Scheduler Test ===")
+    assert is_retryable(503) and is_retryable(429) and is_retryable(0, timed_out=True)
+    assert not is_retryable(404) and not is_retryable(410) and not is_retryable(403)
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+    clock = FakeClock()
+    scheduler = RetryScheduler(max_attempts=3, base_delay=1.0, max_delay=8.0, clock=clock)
+    delays = [scheduler.schedule("https://a.com/") for _ in range(3)]
+    print(f"Backoff delays: {[round(d, 2) for d in delays]}")
+    # Each delay lies in [d/2, d] for d = 1, 2, 4
+    for delay, expected in zip(delays, (1.0, 2.0, 4.0)):
+        assert expected / 2 <= delay <= expected
+    assert scheduler.schedule("https://a.com/") is None, "attempts are exhausted"
+    assert len(scheduler) == 0
+
+    # Retry-After overrides the backoff, and URLs come out in due order
+    scheduler.schedule("https://late.com/", retry_after=30)
+    scheduler.schedule("https://soon.com/", retry_after=0.5)
+    assert scheduler.pop_due() == []
+    clock.now += 1
+    assert scheduler.pop_due() == ["https://soon.com/"]
+    assert 28 < scheduler.next_delay() <= 29
+
+    # Forgotten URLs never come back
+    scheduler.forget("https://late.com/")
+    clock.now += 60
+    assert scheduler.pop_due() == [] and scheduler.next_delay() is None
+    print(f"Stats: {scheduler.stats()}")
+
+    print("Retry scheduler test passed")
+    return True
+
+def test_fetch_with_retries():
+    """Test that transient failures are retried and terminal ones are not"""
+    print("\n=== Fetch Retry Test ===")
+    hits = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            with lock:
+                hits[self.path] = hits.get(self.path, 0) + 1
+                count = hits[self.path]
+            headers = {}
+            if self.path == '/flaky' and count <= 2:
+                status = 503
+            elif self.path == '/limited' and count == 1:
+                status = 429
+                headers['Retry-After'] = '0'
+            elif self.path == '/gone':
+                status = 410
+            elif self.path == '/broken':
+                status = 500
+            else:
+                status = 200
+            body = f"<html>{self.path}</html>".encode('utf-8')
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ValidatorStore(os.path.join(directory, "validators.db"))
+        fetcher = AsyncFetcher(CookieStore(os.path.join(directory, "Cookies")), validator_store=store)
+        retries = RetryScheduler(max_attempts=2, base_delay=0.1, max_delay=0.2)
+        try:
+            urls = [f"{base_url}{path}" for path in ('/flaky', '/limited', '/gone', '/broken', '/ok')]
+            start = time.time()
+            results = fetcher.fetch_all(urls, retries=retries)
+            print(f"Finished in {time.time() - start:.2f}s, hits: {hits}, stats: {retries.stats()}")
+
+            assert results[f"{base_url}/flaky"].ok and hits['/flaky'] == 3
+            assert results[f"{base_url}/limited"].ok and hits['/limited'] == 2
+            assert results[f"{base_url}/gone"].status == 410 and hits['/gone'] == 1
+            assert results[f"{base_url}/broken"].status == 500 and hits['/broken'] == 3
+            assert results[f"{base_url}/ok"].ok and hits['/ok'] == 1
+            assert len(retries) == 0
+        finally:
+            fetcher.close()
+            store.close()
+            server.shutdown()
+            server.server_close()
+
+    print("Fetch retry test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_scheduler() and test_fetch_with_retries()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import threading
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.scan_scheduler import ScanScheduler
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_burst_coalescing():
+    """Test that a burst of requests becomes a single scan generation"""
+    print("=== Scan Burst Coalescing Test ===")
+    scans = []
+    scheduler = ScanScheduler(lambda urls: scans.append(set(urls)), coalesce_delay=0.2)
+    scheduler.start()
+    try:
+        for i in range(20):
+            scheduler.request([f"https://example.com/{i}"])
+            time.sleep(0.002)
+        wait_for(lambda: scans)
+        time.sleep(0.3)
+        assert scans == [{f"https://example.com/{i}" for i in range(20)}]
+        assert scheduler.generation == 1 and scheduler.requests_received == 20
+
+        # A later request starts the next generation
+        scheduler.request(["https://example.com/late"])
+        wait_for(lambda: len(scans) == 2)
+        assert scans[1] == {"https://example.com/late"} and scheduler.generation == 2
+    finally:
+        scheduler.stop()
+    assert not scheduler.isRunning()
+
+    print("Scan burst coalescing test passed")
+    return True
+
+def test_absorb_into_running_scan():
+    """Test that URLs requested during a scan are absorbed by it instead of starting a new one"""
+    print("\n=== Scan Absorb Test ===")
+    started = threading.Event()
+    release = threading.Event()
+    scans, absorbed = [], []
+
+    def scan(urls):
+        scans.append(set(urls))
+        started.set()
+        release.wait(5)
+        absorbed.append(scheduler.absorb())
+        if len(scans) == 1:
+            raise RuntimeError("scan failure must not stop the scheduler")
+
+    scheduler = ScanScheduler(scan, coalesce_delay=0.05)
+    scheduler.start()
+    try:
+        scheduler.request(["https://example.com/a"])
+        assert started.wait(5)
+        assert scheduler.scanning
+        scheduler.request(["https://example.com/b"])
+        scheduler.request(["https://example.com/c", "https://example.com/b"])
+        release.set()
+        wait_for(lambda: absorbed and not scheduler.scanning)
+        time.sleep(0.2)
+
+        assert scans == [{"https://example.com/a"}]
+        assert absorbed == [{"https://example.com/b", "https://example.com/c"}]
+        assert scheduler.generation == 1 and scheduler.urls_absorbed == 2
+
+        # The scheduler survived the failing scan
+        scheduler.request(["https://example.com/d"])
+        wait_for(lambda: len(scans) == 2)
+        assert scans[1] == {"https://example.com/d"}
+    finally:
+        scheduler.stop()
+
+    print("Scan absorb test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_burst_coalescing() and test_absorb_into_running_scan()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import os
+import sys
+import struct
+import hashlib
+import tempfile
+import gzip
+import zlib
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.cache_key import build_cache_keys, entry_file_name, url_from_cache_key
+from ChromeHistoryViewer.core.cache_index import CacheIndex
+from ChromeHistoryViewer.core.content_encoding import decode_body
+from ChromeHistoryViewer.core.simple_cache import (
+    HEADER_STRUCT, EOF_STRUCT, SIMPLE_INITIAL_MAGIC, SIMPLE_FINAL_MAGIC,
+    FLAG_HAS_KEY_SHA256, parse_entry_file
+)
+
+def write_simple_cache_entry(directory, key, raw_headers, body):
+    """Write a synthetic Simple Cache entry file the same way Chrome lays it out"""
+    key_bytes = key.encode('utf-8')
+    # stream 0 is a pickled HttpResponseInfo; only the \0-separated raw headers matter here
+    header_bytes = b'\0'.join(h.encode('latin1') for h in raw_headers) + b'\0\0'
+    stream0 = struct.pack('<I', len(header_bytes) + 20) + b'\x00' * 20 + header_bytes
+
+    data = HEADER_STRUCT.pack(SIMPLE_INITIAL_MAGIC, 5, len(key_bytes), 0)
+    data += key_bytes
+    data += body
+    data += EOF_STRUCT.pack(SIMPLE_FINAL_MAGIC, 0, 0, 0)
+    data += stream0
+    data += hashlib.sha256(key_bytes).digest()
+    data += EOF_STRUCT.pack(SIMPLE_FINAL_MAGIC, FLAG_HAS_KEY_SHA256, 0, len(stream0))
+
+    path = os.path.join(directory, entry_file_name(key))
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+def test_cache_keys():
+    """Test cache key generation and URL recovery"""
+    print("=== Cache Key Test ===")
+    url = "https://docs.python.org/3/library/os.html#os.walk"
+    keys = build_cache_keys(url)
+    for key in keys:
+        print(f"  {entry_file_name(key)}  {key}")
+
+    assert "1/0/_dk_https://python.org https://python.org https://docs.python.org/3/library/os.html" in keys
+    assert all(url_from_cache_key(key) == "https://docs.python.org/3/library/os.html" for key in keys)
+    assert len(entry_file_name(keys[0])) == len("0123456789abcdef_0")
+    print("Cache key test passed")
+    return True
+
+def test_parse_entry():
+    """Test parsing a synthetic Simple Cache entry"""
+    print("\n=== Simple Cache Entry Parse Test ===")
+    url = "https://example.com/article"
+    key = build_cache_keys(url)[2]
+    body = b"<!DOCTYPE html><html><body>" + "中文内容".encode('utf-8') * 200 + b"</body></html>"
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_simple_cache_entry(directory, key, [
+            "HTTP/1.1 200 OK",
+            "Content-Type: text/html; charset=utf-8",
+            "Cache-Control: max-age=60",
+        ], body)
+
+        entry = parse_entry_file(path)
+        assert entry is not None, "entry should parse"
+        print(f"Key: {entry.key}")
+        print(f"Body size: {entry.stream1_size}")
+
+        assert entry.key == key
+        assert entry.url == url
+        assert entry.read_body() == body
+        assert entry.status_code() == 200
+        assert entry.header('Content-Type') == "text/html; charset=utf-8"
+        assert entry.charset() == "utf-8"
+        assert entry.is_html()
+
+        # Non-HTML entries are recognised from stream 0 alone
+        image = parse_entry_file(write_simple_cache_entry(directory, build_cache_keys(url + ".png")[0], [
+            "HTTP/1.1 200 OK",
+            "Content-Type: image/png",
+        ], b"\x89PNG" + b"\x00" * 4096))
+        assert image.mime_type() == "image/png" and not image.is_html()
+
+        # A file that is not a cache entry must be rejected
+        junk = os.path.join(directory, "index")
+        with open(junk, 'wb') as f:
+            f.write(b"\x00" * 256)
+        assert parse_entry_file(junk) is None
+
+    print("Simple Cache entry parse test passed")
+    return True
+
+def test_cache_index():
+    """Test the persistent URL -> cache entry index"""
+    print("\n=== Cache Index Test ===")
+    headers = ["HTTP/1.1 200 OK", "Content-Type: text/html"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache_dir = os.path.join(directory, "Cache_Data")
+        os.makedirs(cache_dir)
+        urls = [f"https://example.com/page{i}" for i in range(50)]
+        for url in urls:
+            write_simple_cache_entry(cache_dir, build_cache_keys(url)[0], headers, b"<html>" + url.encode() + b"</html>")
+
+        index = CacheIndex(os.path.join(directory, "cache_index.db"))
+        updated, removed = index.refresh([cache_dir])
+        print(f"Initial refresh: updated={updated}, removed={removed}")
+        assert (updated, removed) == (50, 0)
+
+        # Unchanged files are not parsed again
+        assert index.refresh([cache_dir]) == (0, 0)
+
+        entries = index.lookup(urls[:20] + ["https://example.com/missing"])
+        print(f"Batch lookup returned {len(entries)} URLs")
+        assert len(entries) == 20
+        entry = entries[urls[3]][0]
+        assert entry.read_body() == b"<html>" + urls[3].encode() + b"</html>"
+        assert entry.header('content-type') == "text/html"
+
+        # Incremental updates from file system events
+        path = write_simple_cache_entry(cache_dir, build_cache_keys(urls[0])[0], headers, b"<html>changed, longer body</html>")
+        index.update_path(path)
+        assert index.lookup([urls[0]])[urls[0]][0].read_body() == b"<html>changed, longer body</html>"
+        os.remove(path)
+        index.update_path(path)
+        assert index.lookup([urls[0]]) == {}
+        index.close()
+
+    print("Cache index test passed")
+    return True
+
+def test_compressed_body():
+    """Test decoding of compressed cached bodies"""
+    print("\n=== Compressed Body Test ===")
+    url = "https://example.com/compressed"
+    body = ("<html><body>" + "压缩的缓存正文 " * 5000 + "</body></html>").encode('utf-8')
+
+    raw_deflate = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    encodings = {
+        "gzip": gzip.compress(body),
+        "deflate": zlib.compress(body),
+        "Deflate": raw_deflate.compress(body) + raw_deflate.flush(),
+        "gzip, deflate": zlib.compress(gzip.compress(body)),
+        "deflate, gzip": gzip.compress(zlib.compress(body)),
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        for content_encoding, stored in encodings.items():
+            path = write_simple_cache_entry(directory, build_cache_keys(url)[0], [
+                "HTTP/1.1 200 OK",
+                "Content-Type: text/html; charset=utf-8",
+                f"Content-Encoding: {content_encoding}",
+            ], stored)
+            entry = parse_entry_file(path)
+            decoded = entry.read_decoded_body()
+            print(f"{content_encoding}: stored {len(stored)} bytes, decoded {len(decoded)} bytes")
+            assert decoded == body
+
+    # 流式解码时deflate的前两个字节可能分散在空块和单字节块中
+    for stored in (encodings["deflate"], encodings["Deflate"]):
+        chunks = [b'', stored[:1], b'', stored[1:2]] + [stored[i:i + 1000] for i in range(2, len(stored), 1000)]
+        assert decode_body(chunks, "deflate") == body
+    tiny = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    assert decode_body([b'', tiny.compress(b'') + tiny.flush()], "deflate") == b''
+
+    print("Compressed body test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_cache_keys() and test_parse_entry() and test_cache_index() and test_compressed_body()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import random
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.url_matcher import UrlMatcher
+
+def test_matches_like_substring_search():
+    """Test that the matcher finds exactly the URLs a substring search would"""
+    print("=== URL Matcher Correctness Test ===")
+    random.seed(42)
+    urls = [f"https://site{i}.com/path/{random.randint(0, 999)}" for i in range(300)]
+    # Overlapping patterns exercise the failure links
+    urls += ["https://site1.com/path", "https://site1.com", "ttps://site2.com"]
+    matcher = UrlMatcher(urls)
+
+    for _ in range(200):
+        parts = []
+        for _ in range(30):
+            if random.random() < 0.1:
+                parts.append(random.choice(urls))
+            else:
+                parts.append(''.join(random.choice('htps:/.ecom') for _ in range(random.randint(1, 20))))
+        data = ''.join(parts).encode('utf-8')
+        expected = {url for url in urls if url.encode('utf-8') in data}
+        assert matcher.search(data) == expected
+
+    assert UrlMatcher([]).search(b"https://site1.com") == set()
+    print("URL matcher correctness test passed")
+    return True
+
+def test_single_pass_speed():
+    """Compare the matcher against the per-URL substring loop"""
+    print("\n=== URL Matcher Speed Test ===")
+    urls = [f"https://example{i}.com/article/{i}" for i in range(500)]
+    data = b"<div>some text https://example.org/other </div>" * 50000
+    content_str = data.decode('utf-8')
+
+    start = time.time()
+    for url in urls:
+        if url in content_str:
+            pass
+    loop_time = time.time() - start
+
+    matcher = UrlMatcher(urls)
+    start = time.time()
+    matcher.search(data)
+    matcher_time = time.time() - start
+
+    print(f"Data size: {len(data)} bytes, watched URLs: {len(urls)}")
+    print(f"Per-URL substring loop: {loop_time:.3f}s")
+    print(f"Single-pass matcher: {matcher_time:.3f}s")
+    return True
+
+def main():
+    """Main function"""
+    success = test_matches_like_substring_search() and test_single_pass_speed()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import tempfile
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.url_store import BloomFilter, ProcessedUrlStore
+
+def test_bloom_filter():
+    """Test that the Bloom filter has no false negatives and roughly the configured error rate"""
+    print("=== Bloom Filter Test ===")
+    bloom = BloomFilter(10000, 0.01)
+    for i in range(10000):
+        bloom.add(f"https://example.com/page/{i}")
+    assert all(f"https://example.com/page/{i}" in bloom for i in range(10000))
+    false_positives = sum(f"https://other.com/{i}" in bloom for i in range(10000))
+    print(f"{bloom.num_bits} bits, {bloom.num_hashes} hashes, false positive rate {false_positives / 10000:.2%}")
+    assert false_positives < 300
+
+    print("Bloom filter test passed")
+    return True
+
+def test_store():
+    """Test persistence, filter growth and TTL eviction"""
+    print("\n=== Processed URL Store Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "processed_urls.db")
+        store = ProcessedUrlStore(db_path, capacity=100)
+        try:
+            assert "https://a.com/" not in store
+            store.add("https://a.com/")
+            store.add("https://b.com/")
+            assert "https://a.com/" in store and len(store) == 2
+
+            # Adding past the capacity grows the filter instead of degrading it
+            for i in range(300):
+                store.add(f"https://many.com/{i}")
+            assert store.bloom.capacity >= 300
+            assert all(f"https://many.com/{i}" in store for i in range(300))
+            misses = sum(f"https://unseen.com/{i}" in store for i in range(1000))
+            stats = store.stats()
+            print(f"Stats: {stats}")
+            assert misses == 0 and stats['filtered'] >= 900
+        finally:
+            store.close()
+
+        # Processed URLs survive a restart
+        reopened = ProcessedUrlStore(db_path, capacity=100)
+        try:
+            assert "https://a.com/" in reopened and "https://many.com/299" in reopened
+            assert "https://b.com/" in reopened and "https://c.com/" not in reopened
+        finally:
+            reopened.close()
+
+        # Expired entries count as unprocessed until they are evicted
+        expiring = ProcessedUrlStore(db_path, ttl=0.2)
+        try:
+            expiring.add("https://fresh.com/")
+            time.sleep(0.3)
+            expiring.add("https://newest.com/")
+            assert "https://fresh.com/" not in expiring and "https://newest.com/" in expiring
+            assert expiring.evict_expired() >= 302
+            assert len(expiring) == 1
+        finally:
+            expiring.close()
+
+    print("Processed URL store test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_bloom_filter() and test_store()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Keep the cache index and other app files created by the monitor out of the real profile
+os.environ["HOME"] = tempfile.mkdtemp(prefix="validator_home_")
+atexit.register(shutil.rmtree, os.environ["HOME"], True)
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.cookie_store import CookieStore
+from ChromeHistoryViewer.core.async_fetcher import AsyncFetcher, FetchResult
+from ChromeHistoryViewer.core.cache_monitor import ChromeCacheMonitor
+from ChromeHistoryViewer.core.validator_store import ValidatorStore
+
+PAGE = "<html><body>" + "revalidated page " * 100 + "</body></html>"
+
+def test_store():
+    """Test saving validators, building conditional headers and loading bodies"""
+    print("=== Validator Store Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        store = ValidatorStore(os.path.join(directory, "validators.db"), max_body_size=4096)
+        try:
+            url = "https://docs.example.com/guide"
+            assert store.conditional_headers(url) == {}
+            assert not store.save(url, '', '', PAGE), "responses without validators are not stored"
+            assert not store.save(url, '"big"', '', "x" * 5000), "oversized bodies are not stored"
+
+            assert store.save(url, '"v1"', 'Wed, 21 Oct 2015 07:28:00 GMT', PAGE)
+            # The fragment does not change the stored entry
+            headers = store.conditional_headers(url + "#intro")
+            assert headers == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+            assert store.load_body(url) == PAGE
+
+            store.remove(url)
+            assert store.conditional_headers(url) == {} and store.load_body(url) is None
+            print(f"Stats: {store.stats()}")
+            assert store.stats()['revalidated'] == 1
+        finally:
+            store.close()
+
+    print("Validator store test passed")
+    return True
+
+def test_revalidation():
+    """Test that a refetch sends the stored ETag and reuses the body on 304"""
+    print("\n=== Conditional Fetch Test ===")
+    requests_seen = []
+    body = PAGE.encode('utf-8')
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            requests_seen.append((self.path, self.headers.get('If-None-Match')))
+            if self.path == '/changing':
+                etag = f'"v{len(requests_seen)}"'
+            else:
+                etag = '"stable"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ValidatorStore(os.path.join(directory, "validators.db"))
+        fetcher = AsyncFetcher(CookieStore(os.path.join(directory, "Cookies")), validator_store=store)
+        try:
+            stable, changing = f"{base_url}/stable", f"{base_url}/changing"
+            first = fetcher.fetch_all([stable, changing])
+            assert first[stable].ok and not first[stable].not_modified
+
+            second = fetcher.fetch_all([stable, changing])
+            print(f"Requests: {requests_seen}, fetcher: {fetcher.stats()}, store: {store.stats()}")
+            assert second[stable].ok and second[stable].not_modified
+            assert second[stable].text == PAGE
+            # A changed ETag means a full response, which replaces the stored validator
+            assert second[changing].ok and not second[changing].not_modified
+            assert ('/stable', '"stable"') in requests_seen
+            assert fetcher.stats()['not_modified'] == 1
+            assert store.stats()['bytes_saved'] == len(body)
+        finally:
+            fetcher.close()
+            store.close()
+            server.shutdown()
+            server.server_close()
+
+    print("Conditional fetch test passed")
+    return True
+
+def test_not_modified_delivery():
+    """Test that the cache monitor hands a 304 body to the downloader like any other fetched page"""
+    print("\n=== Not Modified Delivery Test ===")
+    monitor = ChromeCacheMonitor()
+    monitor.is_running = True
+    emitted = []
+    monitor.content_ready.connect(lambda url, content: emitted.append((url, content)))
+    url = "https://docs.example.com/guide"
+    monitor.url_patterns.add(url)
+
+    monitor.on_fetch_result(FetchResult(url, 200, PAGE, not_modified=True))
+    assert emitted == [(url, PAGE)]
+    assert url not in monitor.url_patterns
+
+    # A stored body that is too short is rejected the same way as a fresh one
+    monitor.url_patterns.add(url)
+    monitor.on_fetch_result(FetchResult(url, 200, "<html>short</html>", not_modified=True))
+    assert len(emitted) == 1 and url in monitor.url_patterns
+
+    print("Not modified delivery test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_store() and test_revalidation() and test_not_modified_delivery()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
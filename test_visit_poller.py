@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+
+# Add the parent directory to the path so we can import the ChromeHistoryViewer modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ChromeHistoryViewer.core.history_reader import HistoryReader
+from ChromeHistoryViewer.core.visit_poller import VisitPoller
+
+BASE_TIME = 13300000000000000
+
+def create_history(path):
+    """Create a History database with the urls and visits tables"""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE urls (
+            id INTEGER PRIMARY KEY, url TEXT, title TEXT,
+            visit_count INTEGER, last_visit_time INTEGER
+        )
+    ''')
+    conn.execute('CREATE TABLE visits (id INTEGER PRIMARY KEY, url INTEGER, visit_time INTEGER)')
+    return conn
+
+def visit(conn, url, visit_time):
+    """Record a visit the way Chrome does: one visits row, and an updated urls row"""
+    row = conn.execute('SELECT id FROM urls WHERE url = ?', (url,)).fetchone()
+    if row:
+        url_id = row[0]
+        conn.execute('UPDATE urls SET visit_count = visit_count + 1, last_visit_time = ? WHERE id = ?',
+                     (visit_time, url_id))
+    else:
+        url_id = conn.execute('INSERT INTO urls (url, title, visit_count, last_visit_time) VALUES (?, ?, 1, ?)',
+                              (url, f"Title of {url}", visit_time)).lastrowid
+    conn.execute('INSERT INTO visits (url, visit_time) VALUES (?, ?)', (url_id, visit_time))
+    conn.commit()
+
+def test_watermark_polling():
+    """Test that new visits are read by id, including ones sharing a timestamp, and restarts resume after the last saved one"""
+    print("=== Visit Poller Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        history = os.path.join(directory, "History")
+        state_path = os.path.join(directory, "state.json")
+        conn = create_history(history)
+        reader = HistoryReader(history)
+        try:
+            visit(conn, "https://old.com/", BASE_TIME)
+
+            poller = VisitPoller(reader, state_path)
+            assert poller.poll() == [], "the first poll only seeds the watermark"
+            assert json.load(open(state_path))['last_visit_id'] == 1
+
+            # Visits with the same timestamp are all delivered, in visit order
+            visit(conn, "https://a.com/", BASE_TIME + 10)
+            visit(conn, "https://b.com/", BASE_TIME + 10)
+            visit(conn, "https://old.com/", BASE_TIME + 10)
+            records = poller.poll()
+            print(f"New visits: {records}")
+            assert [record[1] for record in records] == ["https://a.com/", "https://b.com/", "https://old.com/"]
+            assert records[2] == ("Title of https://old.com/", "https://old.com/", BASE_TIME + 10, 2)
+            assert poller.poll() == []
+
+            # Nothing was saved yet, so a restart reads the same visits again
+            visit(conn, "https://c.com/", BASE_TIME + 5)
+            restarted = VisitPoller(reader, state_path)
+            assert restarted.last_visit_id == 1
+            assert [record[1] for record in restarted.poll()] == [
+                "https://a.com/", "https://b.com/", "https://old.com/", "https://c.com/"]
+
+            # The persisted watermark only passes visits whose URL has been saved
+            saved = {"https://a.com/", "https://old.com/"}
+            restarted.commit(lambda url: url in saved)
+            assert json.load(open(state_path))['last_visit_id'] == 2
+            saved.add("https://b.com/")
+            restarted.commit(lambda url: url in saved)
+            assert json.load(open(state_path))['last_visit_id'] == 4
+
+            # A new poller resumes from the persisted watermark
+            restarted = VisitPoller(reader, state_path)
+            assert restarted.last_visit_id == 4
+            assert [record[1] for record in restarted.poll()] == ["https://c.com/"]
+            restarted.commit(lambda url: True)
+            assert json.load(open(state_path))['last_visit_id'] == 5
+
+            # URLs that never get saved do not hold the watermark back forever
+            capped = VisitPoller(reader, state_path, max_pending=2)
+            for i in range(3):
+                visit(conn, f"https://failing.com/{i}", BASE_TIME + 30)
+            assert len(capped.poll()) == 3
+            capped.commit(lambda url: False)
+            assert json.load(open(state_path))['last_visit_id'] == 6 and len(capped.pending) == 2
+
+            # Clearing the history moves the watermark back
+            conn.execute('DELETE FROM visits')
+            conn.commit()
+            assert capped.poll() == [] and capped.last_visit_id == 0 and not capped.pending
+            assert json.load(open(state_path))['last_visit_id'] == 0
+            visit(conn, "https://after-clear.com/", BASE_TIME + 20)
+            assert [record[1] for record in capped.poll()] == ["https://after-clear.com/"]
+
+            # The query is a primary key range read on visits
+            plan = reader.query('''
+                EXPLAIN QUERY PLAN
+                SELECT visits.id, urls.title, urls.url, visits.visit_time, urls.visit_count
+                FROM visits JOIN urls ON urls.id = visits.url
+                WHERE visits.id > ? ORDER BY visits.id
+            ''', (0,))
+            details = " | ".join(row[-1] for row in plan)
+            print(f"Query plan: {details}")
+            assert "rowid>?" in details and "TEMP B-TREE" not in details
+        finally:
+            reader.close()
+            conn.close()
+
+    print("Visit poller test passed")
+    return True
+
+def test_state_file_checks():
+    """Test that state for another History file or a corrupt state file is ignored"""
+    print("\n=== Visit Poller State Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        history = os.path.join(directory, "History")
+        state_path = os.path.join(directory, "state.json")
+        conn = create_history(history)
+        reader = HistoryReader(history)
+        try:
+            with open(state_path, 'w') as f:
+                json.dump({'history_path': '/elsewhere/History', 'last_visit_id': 99}, f)
+            assert VisitPoller(reader, state_path).last_visit_id is None
+            with open(state_path, 'w') as f:
+                f.write('{"history_path": ')
+            assert VisitPoller(reader, state_path).last_visit_id is None
+        finally:
+            reader.close()
+            conn.close()
+
+    print("Visit poller state test passed")
+    return True
+
+def main():
+    """Main function"""
+    success = test_watermark_polling() and test_state_file_checks()
+    print("\nAll tests passed" if success else "\nTests failed")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())